@@ -1,11 +1,10 @@
+import pandas as pd
 import streamlit as st
 from fishki import data_store, ui
 
 st.set_page_config(page_title="Fishki — German Flashcards", page_icon="🐟", layout="wide")
 
-# Initialize data from CSV files into session state
-if 'decks_df' not in st.session_state or 'cards_df' not in st.session_state or 'saved_words_df' not in st.session_state:
-    st.session_state.decks_df, st.session_state.cards_df, st.session_state.saved_words_df = data_store.load_data()
+store = data_store.get_store()
 
 st.title("🐟 Fishki — German Flashcards")
 st.sidebar.header("Navigation")
@@ -22,9 +21,30 @@ st.sidebar.write("---")
 st.write("Welcome to Fishki!")
 st.write("Use the sidebar to navigate. Create a deck in **Decks** to get started.")
 
+# Search across every deck and the saved words
+query = st.text_input("🔎 Search cards and saved words", placeholder="e.g. Strasse, to run, A1")
+if query.strip():
+    hits = store.search(query)
+    if hits:
+        deck_names = {d['id']: d['name'] for d in store.get_decks()}
+        st.dataframe(
+            pd.DataFrame(
+                [
+                    (h.de, h.en, deck_names.get(h.deck_id, "") if h.kind == "card" else "Saved words")
+                    for h in hits
+                ],
+                columns=["German", "English", "Deck"],
+            ),
+            hide_index=True,
+            use_container_width=True,
+        )
+    else:
+        st.caption("No matches.")
+
 # Show some saved words stats if available
-if not st.session_state.saved_words_df.empty:
-    total_saved = len(st.session_state.saved_words_df)
-    not_reviewed = len(st.session_state.saved_words_df[st.session_state.saved_words_df["reviewed"] == False])
+saved_words_df = store.saved_words_frame()
+if not saved_words_df.empty:
+    total_saved = len(saved_words_df)
+    not_reviewed = len(saved_words_df[saved_words_df["reviewed"] == False])
     
     st.info(f"📚 You have {total_saved} saved words ({not_reviewed} not reviewed yet). Visit the **Saved Words** page to review them!")
@@ -0,0 +1,112 @@
+from __future__ import annotations
+import json
+from typing import Dict, List
+
+import pandas as pd
+
+# Columns of the review log, in file order
+REVIEW_FIELDS = ("card_id", "deck_id", "reviewed_at", "grade", "prev_interval", "new_interval", "latency_ms")
+
+# A card answered "Again" this many times is reported as a leech
+LEECH_FAILS = 8
+
+class ReviewRollups:
+    """Running aggregates of the review log.
+
+    Each batch of new log rows is folded into per-day, per-hour, per-deck,
+    per-interval and per-card counters, so the full history is only read
+    once. `cursor` records how far into the log the rollups go; the stores
+    persist the rollups and resume from it.
+    """
+
+    def __init__(self):
+        self.cursor = 0
+        self.days: Dict[str, List[int]] = {}  # day -> reviews per grade (Again..Easy)
+        self.hours: Dict[str, int] = {}  # "weekday hour" -> reviews
+        self.decks: Dict[str, Dict[str, List[int]]] = {}  # deck -> day -> [reviews, recalled]
+        self.intervals: Dict[str, List[int]] = {}  # previous interval -> [reviews, recalled]
+        self.cards: Dict[str, List[int]] = {}  # card -> [reviews, fails]
+
+    def update(self, reviews: pd.DataFrame, cursor):
+        """Fold a batch of review log rows into the counters."""
+        self.cursor = cursor
+        if reviews.empty:
+            return
+        reviewed_at = pd.to_datetime(reviews["reviewed_at"], format="ISO8601")
+        grades = reviews["grade"].astype(int)
+        recalled = (grades > 1).astype(int)
+        day = reviewed_at.dt.strftime("%Y-%m-%d")
+
+        per_day = pd.crosstab(day, grades).reindex(columns=[1, 2, 3, 4], fill_value=0)
+        for key, counts in zip(per_day.index, per_day.to_numpy().tolist()):
+            _add(self.days, key, counts)
+        slot = reviewed_at.dt.weekday.astype(str) + " " + reviewed_at.dt.hour.astype(str)
+        for key, n in slot.value_counts().items():
+            self.hours[key] = self.hours.get(key, 0) + int(n)
+        per_deck = recalled.groupby([reviews["deck_id"].astype(str), day]).agg(["size", "sum"])
+        for (deck_id, key), counts in zip(per_deck.index, per_deck.to_numpy().tolist()):
+            _add(self.decks.setdefault(deck_id, {}), key, counts)
+        per_interval = recalled.groupby(reviews["prev_interval"].astype(int).astype(str)).agg(["size", "sum"])
+        for key, counts in zip(per_interval.index, per_interval.to_numpy().tolist()):
+            _add(self.intervals, key, counts)
+        per_card = (grades == 1).astype(int).groupby(reviews["card_id"].astype(str)).agg(["size", "sum"])
+        for key, counts in zip(per_card.index, per_card.to_numpy().tolist()):
+            _add(self.cards, key, counts)
+
+    def daily(self) -> pd.DataFrame:
+        """Reviews per day and grade."""
+        df = pd.DataFrame.from_dict(self.days, orient="index", columns=["Again", "Hard", "Good", "Easy"])
+        df.index = pd.to_datetime(df.index)
+        return df.sort_index()
+
+    def hourly(self) -> pd.DataFrame:
+        """Reviews per weekday (0 = Monday) and hour of the day, in long form."""
+        rows = [(*map(int, key.split()), n) for key, n in self.hours.items()]
+        return pd.DataFrame(rows, columns=["weekday", "hour", "reviews"])
+
+    def deck_retention(self, since: str | None = None) -> pd.DataFrame:
+        """Reviews and share recalled per deck, optionally from ISO day `since` on."""
+        rows = []
+        for deck_id, days in self.decks.items():
+            reviews = recalled = 0
+            for day, (n, ok) in days.items():
+                if since is None or day >= since:
+                    reviews, recalled = reviews + n, recalled + ok
+            if reviews:
+                rows.append((deck_id, reviews, recalled / reviews))
+        return pd.DataFrame(rows, columns=["deck_id", "reviews", "retention"])
+
+    def retention_curve(self) -> pd.DataFrame:
+        """Share of reviews recalled against the interval since the previous review."""
+        df = pd.DataFrame.from_dict(self.intervals, orient="index", columns=["reviews", "recalled"])
+        df.index = df.index.astype(int)
+        df = df.sort_index()
+        df["retention"] = df["recalled"] / df["reviews"]
+        return df
+
+    def leeches(self, fails: int = LEECH_FAILS) -> pd.DataFrame:
+        """Cards answered "Again" at least `fails` times."""
+        rows = [(card_id, n, failed) for card_id, (n, failed) in self.cards.items() if failed >= fails]
+        return pd.DataFrame(rows, columns=["card_id", "reviews", "fails"]).sort_values("fails", ascending=False)
+
+    def summary(self, since: str | None = None) -> Dict[str, pd.DataFrame]:
+        return {
+            "daily": self.daily(),
+            "hourly": self.hourly(),
+            "decks": self.deck_retention(since),
+            "retention": self.retention_curve(),
+            "leeches": self.leeches(),
+        }
+
+    def to_json(self) -> str:
+        return json.dumps(self.__dict__)
+
+    @classmethod
+    def from_json(cls, text: str) -> "ReviewRollups":
+        rollups = cls()
+        rollups.__dict__.update(json.loads(text))
+        return rollups
+
+def _add(counters: dict, key: str, counts: List[int]):
+    current = counters.get(key)
+    counters[key] = counts if current is None else [a + b for a, b in zip(current, counts)]
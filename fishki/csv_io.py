@@ -1,8 +1,12 @@
 from __future__ import annotations
 import csv
+import gzip
 import io
+import os
+import tempfile
+import zipfile
 from pathlib import Path
-from typing import TYPE_CHECKING, List, Dict, Optional
+from typing import IO, TYPE_CHECKING, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
 
 if TYPE_CHECKING:
     from fishki.models import Card
@@ -10,43 +14,140 @@ if TYPE_CHECKING:
 REQUIRED_COLS = ["de","en"]
 ALL_COLS = ["de","en","example","tags","notes"]
 
+# Rows rendered into each chunk of exported CSV text
+EXPORT_CHUNK_ROWS = 1_000
+
+def iter_csv(
+    source,
+    batch_size: int = 10_000,
+    on_progress: Optional[Callable[[float], None]] = None,
+) -> Iterator[List[Dict[str, str]]]:
+    """Yield validated rows in batches, streaming from a path or an uploaded file.
+
+    `on_progress` is called with the fraction of the input consumed so far.
+    """
+    # uploaded file from streamlit is an in-memory binary buffer
+    uploaded = hasattr(source, 'getvalue')
+    raw = source if uploaded else open(source, "rb")
+    raw.seek(0, io.SEEK_END)
+    total = raw.tell()
+    raw.seek(0)
+    text = io.TextIOWrapper(raw, encoding="utf-8-sig", newline="")
+    try:
+        r = csv.DictReader(text)
+        missing = [c for c in REQUIRED_COLS if c not in (r.fieldnames or [])]
+        if missing:
+            raise ValueError(f"Missing required columns in CSV: {', '.join(missing)}")
+
+        batch = []
+        for row in r:
+            clean = {k: (row.get(k,"") or "").strip() for k in ALL_COLS}
+            if not clean["de"] or not clean["en"]:
+                continue # Skip empty rows
+            batch.append(clean)
+            if len(batch) >= batch_size:
+                yield batch
+                batch = []
+                if on_progress and total:
+                    on_progress(min(1.0, raw.tell() / total))
+        if batch:
+            yield batch
+        if on_progress:
+            on_progress(1.0)
+    finally:
+        if uploaded:
+            text.detach()  # leave the upload buffer open for the caller
+        else:
+            text.close()
+
 def read_csv(path: str) -> List[Dict[str, str]]:
-    rows = []
-    # uploaded file from streamlit is an in-memory file
-    if hasattr(path, 'getvalue'):
-        csvfile = io.StringIO(path.getvalue().decode('utf-8'))
-        r = csv.DictReader(csvfile)
-    else:
-        f = open(path, "r", encoding="utf-8-sig", newline="")
-        r = csv.DictReader(f)
-
-    missing = [c for c in REQUIRED_COLS if c not in r.fieldnames]
-    if missing:
-        raise ValueError(f"Missing required columns in CSV: {', '.join(missing)}")
-    for row in r:
-        clean = {k: (row.get(k,"") or "").strip() for k in ALL_COLS}
-        if not clean["de"] or not clean["en"]:
-            continue # Skip empty rows
-        rows.append(clean)
-    
-    if not hasattr(path, 'getvalue'):
-        f.close()
-
-    return rows
-
-def write_csv(cards: List["Card"], path: Optional[str] = None) -> str:
-    output = io.StringIO()
-    w = csv.DictWriter(output, fieldnames=ALL_COLS)
+    return [row for batch in iter_csv(path) for row in batch]
+
+def _field(row, key: str):
+    value = row.get(key, "") if isinstance(row, dict) else getattr(row, key, "")
+    return "" if value is None or value != value else value  # None / NaN
+
+def iter_csv_chunks(
+    rows: Iterable,
+    fieldnames: List[str] = ALL_COLS,
+    chunk_rows: int = EXPORT_CHUNK_ROWS,
+) -> Iterator[str]:
+    """Yield CSV text (header first) a chunk of rows at a time.
+
+    Rows may be dicts or objects with the fields as attributes.
+    """
+    buffer = io.StringIO()
+    w = csv.DictWriter(buffer, fieldnames=fieldnames)
     w.writeheader()
-    for c in cards:
-        w.writerow({k: getattr(c, k, "") or "" for k in ALL_COLS})
-    
-    content = output.getvalue()
-    
+    for n, row in enumerate(rows, 1):
+        w.writerow({k: _field(row, k) for k in fieldnames})
+        if n % chunk_rows == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue()
+
+def write_csv_stream(rows: Iterable, out: IO[bytes], fieldnames: List[str] = ALL_COLS, compress: bool = False):
+    """Stream rows as UTF-8 CSV into a binary file object, gzipped if `compress`."""
+    target = gzip.GzipFile(fileobj=out, mode="wb") if compress else out
+    text = io.TextIOWrapper(target, encoding="utf-8-sig", newline="")
+    try:
+        text.writelines(iter_csv_chunks(rows, fieldnames))
+        text.flush()
+    finally:
+        text.detach()
+        if compress:
+            target.close()  # writes the gzip trailer, leaves `out` open
+
+def write_backup(out: IO[bytes], tables: Dict[str, Tuple[List[str], Iterable]]):
+    """Write a zip archive with one `<name>.csv` member per table, streamed row chunk by row chunk."""
+    with zipfile.ZipFile(out, "w", compression=zipfile.ZIP_DEFLATED) as zf:
+        for name, (fieldnames, rows) in tables.items():
+            with zf.open(f"{name}.csv", "w", force_zip64=True) as member:
+                write_csv_stream(rows, member, fieldnames)
+
+class _TemporaryExport(io.FileIO):
+    """A read-only temporary file that removes itself when closed."""
+
+    def close(self):
+        if not self.closed:
+            super().close()
+            os.unlink(self.name)
+
+def spool(write: Callable[[IO[bytes]], None]) -> IO[bytes]:
+    """Run `write` against a temporary file and return the file, opened for reading.
+
+    The export is built on disk and handed over as a file object (which
+    st.download_button reads when the download is requested), so it is never
+    held in memory here. The file is removed when it is closed.
+    """
+    fd, path = tempfile.mkstemp(prefix="fishki-export-")
+    try:
+        with os.fdopen(fd, "wb") as out:
+            write(out)
+    except BaseException:
+        os.unlink(path)
+        raise
+    return _TemporaryExport(path)
+
+def write_csv(cards: Iterable["Card"], path: Optional[str] = None) -> str:
+    """Export cards as CSV text, also writing it to `path` if given.
+
+    Large exports should use write_csv_file, which streams to the file
+    without building the text.
+    """
+    content = "".join(iter_csv_chunks(cards))
     if path:
         p = Path(path)
         p.parent.mkdir(parents=True, exist_ok=True)
         with open(p, "w", encoding="utf-8-sig", newline="") as f:
             f.write(content)
-
     return content
+
+def write_csv_file(rows: Iterable, path: str, fieldnames: List[str] = ALL_COLS) -> str:
+    """Stream rows as CSV into the file at `path`; returns the path."""
+    p = Path(path)
+    p.parent.mkdir(parents=True, exist_ok=True)
+    with open(p, "wb") as f:
+        write_csv_stream(rows, f, fieldnames)
+    return str(p)
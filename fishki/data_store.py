@@ -1,15 +1,44 @@
 from __future__ import annotations
+import numpy as np
 import pandas as pd
 import os
-from datetime import date, datetime
-from typing import TypedDict, List
+import io
+import csv
+import json
+import functools
+import threading
+from datetime import date, datetime, timedelta
+from typing import IO, TypedDict, List, Dict, Iterable, Iterator, Set, Tuple
 import streamlit as st
 import uuid
 
+from fishki import csv_io, models, srs
+from fishki.analytics import REVIEW_FIELDS, ReviewRollups
+from fishki.indexes import AnswerPool, AnswerPools, DueIndex, TagIndex
+from fishki.search import FIELD_WEIGHTS, SearchHit, SearchIndex
+
 DATA_DIR = "data"
+DB_FILE = "fishki.db"
 DECKS_FILE = os.path.join(DATA_DIR, "decks.csv")
 CARDS_FILE = os.path.join(DATA_DIR, "cards.csv")
 SAVED_WORDS_FILE = os.path.join(DATA_DIR, "saved_words.csv")
+JOURNAL_FILE = os.path.join(DATA_DIR, "journal.jsonl")
+COMPACTING_FILE = os.path.join(DATA_DIR, "journal.compacting.jsonl")
+REVIEW_LOG_FILE = os.path.join(DATA_DIR, "review_log.csv")
+REVIEW_ROLLUPS_FILE = os.path.join(DATA_DIR, "review_rollups.json")
+TABLES = ("decks", "cards", "saved_words")
+
+# Once the journal grows past this size it is folded into fresh CSV snapshots
+JOURNAL_COMPACT_BYTES = 1_000_000
+
+# "csv" (default) or "sqlite"
+STORAGE_ENGINE = os.environ.get("FISHKI_STORAGE", "csv")
+
+# Rows converted to records at a time when streaming a table out
+EXPORT_BATCH_ROWS = 5_000
+
+# Scheduling state of a card that has never been reviewed
+NEW_CARD_SCHEDULE = models.SCHEDULE_DEFAULTS
 
 class Card(TypedDict):
     id: str
@@ -44,6 +73,132 @@ class SavedWord(TypedDict):
     created_at: str
     reviewed: bool
 
+# --- In-memory schema ---
+# Tables are loaded with compact dtypes derived from the TypedDicts above:
+# categorical ids that repeat, small ints for the SRS counters, float32 ease
+# and native datetimes. Records handed out (and everything on disk) keep the
+# ISO string form.
+
+SCHEMAS = {
+    "decks": (Deck, {"description": "str", "created_at": "datetime64[ns]"}, {"description": ""}),
+    "cards": (
+        Card,
+        {
+            "deck_id": "category",
+            "example": "str",
+            "tags": "str",
+            "notes": "str",
+            "box": "int8",
+            "ease": "float32",
+            "interval_days": "int32",
+            "reps": "int16",
+            "lapses": "int16",
+            "due_date": "datetime64[ns]",
+            "created_at": "datetime64[ns]",
+            "updated_at": "datetime64[ns]",
+        },
+        {"example": "", "tags": "", "notes": "", "box": 1, "ease": 2.5, "interval_days": 1, "reps": 0, "lapses": 0},
+    ),
+    "saved_words": (
+        SavedWord,
+        {"context": "str", "notes": "str", "source": "category", "created_at": "datetime64[ns]", "reviewed": "bool"},
+        {"context": "", "notes": "", "source": "Manual", "reviewed": False},
+    ),
+}
+
+# strftime formats used to turn datetime columns back into their stored form
+DATETIME_FORMATS = {"due_date": "%Y-%m-%d"}
+DEFAULT_DATETIME_FORMAT = "%Y-%m-%dT%H:%M:%S.%f"
+
+def apply_schema(df: pd.DataFrame, table: str) -> pd.DataFrame:
+    """Validate a table against its schema and convert it to the in-memory dtypes."""
+    typed_dict, dtypes, defaults = SCHEMAS[table]
+    columns = list(typed_dict.__annotations__)
+    missing = [c for c in columns if c not in df.columns]
+    if missing:
+        raise ValueError(f"The {table} table is missing columns: {', '.join(missing)}")
+    df = df[columns].fillna(defaults)
+    converted = {}
+    for column, dtype in dtypes.items():
+        if dtype.startswith("datetime64"):
+            converted[column] = pd.to_datetime(df[column], errors="coerce", format="ISO8601")
+        elif dtype in ("str", "category", "bool"):
+            converted[column] = df[column].astype(dtype)
+        else:
+            try:
+                converted[column] = pd.to_numeric(df[column]).astype(dtype)
+            except (ValueError, TypeError) as e:
+                raise ValueError(f"Invalid value in {table}.{column}: {e}") from e
+    return df.assign(**converted)
+
+def append_rows(df: pd.DataFrame, rows: pd.DataFrame, table: str) -> pd.DataFrame:
+    """Append rows to a table in its in-memory dtypes, converting only the new rows."""
+    new = apply_schema(rows, table)
+    for column in new.columns:
+        dtype = df[column].dtype
+        if isinstance(dtype, pd.CategoricalDtype):
+            # Both sides need the same categories for the column to stay categorical
+            added = new[column].cat.categories.difference(dtype.categories)
+            if len(added):
+                df = df.assign(**{column: df[column].cat.add_categories(added)})
+            new[column] = new[column].cat.set_categories(df[column].cat.categories)
+    return pd.concat([df, new], ignore_index=True)
+
+def add_categories(df: pd.DataFrame, updates: dict) -> pd.DataFrame:
+    """Make room in categorical columns for the new values in `updates`, so assigning them doesn't raise."""
+    for column, value in updates.items():
+        if column in df.columns and isinstance(df[column].dtype, pd.CategoricalDtype) and value not in df[column].cat.categories:
+            df[column] = df[column].cat.add_categories([value])
+    return df
+
+def _stored_form(df: pd.DataFrame) -> pd.DataFrame:
+    """Dates as ISO strings and float32 widened back."""
+    converted = {}
+    for column, dtype in df.dtypes.items():
+        if dtype == "float32":
+            converted[column] = df[column].astype("float64").round(6)
+        elif dtype.kind == "M":
+            converted[column] = df[column].dt.strftime(DATETIME_FORMATS.get(column, DEFAULT_DATETIME_FORMAT))
+    return df.assign(**converted) if converted else df
+
+def frame_records(df: pd.DataFrame) -> List[dict]:
+    """to_dict('records') with dates as ISO strings and float32 widened back."""
+    return _stored_form(df).to_dict('records')
+
+def row_record(df: pd.DataFrame, row: int) -> dict:
+    """frame_records of the single row at position `row`.
+
+    Slicing the row out as a frame costs pandas overhead per column; the
+    row read as one Series is converted value by value instead (dispatching
+    on the value's type, as the dtypes Series is itself costly to build),
+    at a cost that doesn't depend on the size of the table.
+    """
+    record = {}
+    for column, value in zip(df.columns, df.iloc[row].tolist()):
+        if isinstance(value, np.float32):
+            value = round(float(value), 6)
+        elif isinstance(value, pd.Timestamp):
+            value = value.strftime(DATETIME_FORMATS.get(column, DEFAULT_DATETIME_FORMAT))
+        elif value is pd.NaT:
+            value = np.nan
+        elif isinstance(value, np.generic):
+            value = value.item()
+        record[column] = value
+    return record
+
+def frame_columns(df: pd.DataFrame) -> Dict[str, list]:
+    """The frame's columns as lists of stored-form values, for models' from_columns."""
+    df = _stored_form(df)
+    return {column: df[column].tolist() for column in df.columns}
+
+def iter_records(df: pd.DataFrame, batch_size: int = EXPORT_BATCH_ROWS) -> Iterator[dict]:
+    """frame_records one slice at a time, so only a batch of dicts exists at once."""
+    for start in range(0, len(df), batch_size):
+        yield from frame_records(df.iloc[start:start + batch_size])
+
+def table_columns(table: str) -> List[str]:
+    return list(SCHEMAS[table][0].__annotations__)
+
 def _ensure_data_files_exist():
     os.makedirs(DATA_DIR, exist_ok=True)
     if not os.path.exists(DECKS_FILE):
@@ -59,28 +214,297 @@ def _ensure_data_files_exist():
             SAVED_WORDS_FILE, index=False
         )
 
-@st.cache_data(ttl=10) # Short TTL to allow for re-reading after changes
+# --- Journal ---
+# Every mutation below appends one record to an in-memory buffer; save_data
+# flushes the buffer to JOURNAL_FILE with a single append. The CSV files are
+# snapshots that the journal is replayed on top of, and are only rewritten by
+# the background compaction. Records are idempotent (adds are upserts by id),
+# so replaying a journal onto a snapshot that already contains it is harmless.
+
+_journal_lock = threading.Lock()  # guards the buffer, appends and rotation
+_snapshot_lock = threading.Lock()  # guards swapping snapshots during compaction
+_pending_records: list[dict] = []
+_compaction_thread: threading.Thread | None = None
+
+def _json_default(value):
+    if hasattr(value, "item"):  # numpy scalars
+        return value.item()
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    return str(value)
+
+def _record(op: str, table: str, record_id: str, data: dict | None = None):
+    record = {"op": op, "table": table, "id": record_id}
+    if data is not None:
+        record["data"] = data
+    with _journal_lock:
+        _pending_records.append(record)
+
+def _flush_journal():
+    global _pending_records
+    with _journal_lock:
+        if not _pending_records:
+            return
+        lines = "".join(json.dumps(r, default=_json_default) + "\n" for r in _pending_records)
+        with open(JOURNAL_FILE, "a", encoding="utf-8") as f:
+            f.write(lines)
+            f.flush()
+            os.fsync(f.fileno())
+        _pending_records = []
+
+def _read_journal_file(path: str, offset: int = 0) -> list[dict]:
+    records = []
+    if not os.path.exists(path):
+        return records
+    with open(path, "rb") as f:
+        f.seek(offset)
+        for line in f:
+            try:
+                records.append(json.loads(line))
+            except json.JSONDecodeError:
+                continue  # torn write from a crash mid-append
+    return records
+
+def _read_journal() -> list[dict]:
+    return _read_journal_file(COMPACTING_FILE) + _read_journal_file(JOURNAL_FILE)
+
+def _touched_tables(records: list[dict]) -> set[str]:
+    touched = {r["table"] for r in records}
+    if any(r["op"] == "delete_deck" for r in records):
+        touched.add("cards")
+    return touched
+
+class _Replay:
+    """One table's journal replay: only the rows the records name are read out and rebuilt."""
+
+    def __init__(self, df: pd.DataFrame):
+        self.df = df
+        self.positions = pd.Index(df["id"])
+        self.rows: dict[str, dict] = {}  # id -> current record of every touched row still present
+        self.deleted: set[str] = set()
+
+    def get(self, row_id) -> dict | None:
+        if row_id in self.rows:
+            return self.rows[row_id]
+        if row_id in self.deleted or row_id not in self.positions:
+            return None
+        record = self.rows[row_id] = row_record(self.df, self.positions.get_loc(row_id))
+        return record
+
+    def put(self, row_id, data: dict):
+        self.rows[row_id] = dict(data)
+        self.deleted.discard(row_id)
+
+    def update(self, row_id, data: dict):
+        record = self.get(row_id)
+        if record is not None:
+            record.update(data)
+
+    def delete(self, row_id):
+        self.rows.pop(row_id, None)
+        self.deleted.add(row_id)
+
+    def delete_where(self, column: str, value):
+        untouched = self.df[column].eq(value) & ~self.df["id"].isin(self.rows.keys())
+        self.deleted.update(self.df.loc[untouched, "id"])
+        for row_id in [k for k, r in self.rows.items() if r[column] == value]:
+            self.delete(row_id)
+
+    def frame(self, table: str) -> pd.DataFrame:
+        """The replayed table: rows keep their places, new rows are appended in journal order."""
+        ids = self.df["id"]
+        replaced = ids.isin(self.deleted | self.rows.keys()).to_numpy()
+        if not self.rows:
+            return self.df[~replaced].reset_index(drop=True)
+        order = np.concatenate([
+            np.flatnonzero(~replaced),
+            [self.positions.get_loc(k) if k in self.positions else len(ids) + i for i, k in enumerate(self.rows)],
+        ])
+        df = append_rows(self.df[~replaced], pd.DataFrame(list(self.rows.values()), columns=self.df.columns), table)
+        return df.iloc[np.argsort(order, kind="stable")].reset_index(drop=True)
+
+def _apply_journal(tables: dict[str, pd.DataFrame], records: list[dict]) -> dict[str, pd.DataFrame]:
+    """Replay journal records onto tables in their in-memory dtypes."""
+    if not records:
+        return tables
+    replays = {name: _Replay(tables[name]) for name in _touched_tables(records)}
+    for record in records:
+        table = replays[record["table"]]
+        op, record_id = record["op"], record["id"]
+        if op == "add":
+            table.put(record_id, record["data"])
+        elif op == "add_many":
+            for row in record["data"]:
+                table.put(row["id"], row)
+        elif op == "update":
+            table.update(record_id, record["data"])
+        elif op == "update_many":
+            for row_id in record_id:
+                table.update(row_id, record["data"])
+        elif op == "update_rows":
+            for row in record["data"]:
+                table.update(row["id"], row)
+        elif op == "delete":
+            table.delete(record_id)
+        elif op == "delete_many":
+            for row_id in record_id:
+                table.delete(row_id)
+        elif op == "delete_deck":
+            table.delete(record_id)
+            replays["cards"].delete_where("deck_id", record_id)
+    return {**tables, **{name: replay.frame(name) for name, replay in replays.items()}}
+
+def _table_files() -> dict[str, str]:
+    return {"decks": DECKS_FILE, "cards": CARDS_FILE, "saved_words": SAVED_WORDS_FILE}
+
+def _read_snapshots(names=None) -> dict[str, pd.DataFrame]:
+    paths = _table_files()
+    return {name: apply_schema(pd.read_csv(paths[name]), name) for name in (names or paths)}
+
+def _write_snapshot(df: pd.DataFrame, path: str):
+    tmp_path = path + ".tmp"
+    _stored_form(df).to_csv(tmp_path, index=False)
+    os.replace(tmp_path, path)
+
+def compact_journal():
+    """Fold the rotated journal into fresh CSV snapshots.
+
+    Only the tables the journal actually touched are rewritten.
+    """
+    if not os.path.exists(COMPACTING_FILE):
+        return
+    records = _read_journal_file(COMPACTING_FILE)
+    touched = _touched_tables(records)
+    tables = _apply_journal(_read_snapshots(touched), records) if touched else {}
+    paths = _table_files()
+    with _snapshot_lock:
+        for name, df in tables.items():
+            _write_snapshot(df, paths[name])
+        os.remove(COMPACTING_FILE)
+
+def _start_compaction():
+    global _compaction_thread
+    with _journal_lock:
+        if _compaction_thread is not None and _compaction_thread.is_alive():
+            return
+        # A leftover rotated journal (e.g. after a crash) is compacted first
+        if not os.path.exists(COMPACTING_FILE):
+            os.replace(JOURNAL_FILE, COMPACTING_FILE)
+        _compaction_thread = threading.Thread(target=compact_journal, daemon=True)
+        _compaction_thread.start()
+
+# --- Review log ---
+# Every graded card appends one row to REVIEW_LOG_FILE; rows are never
+# rewritten. Analytics read it incrementally from a byte offset (see
+# analytics.ReviewRollups), so only rows added since the last read are parsed.
+
+def review_record(
+    card_id, deck_id, grade: int, prev_interval: int, new_interval: int, latency_ms: int | None = None, reviewed_at: str | None = None
+) -> dict:
+    """A review log row, stamped with the local time (unless given) so time-of-day stats match the learner's day."""
+    return {
+        "card_id": card_id,
+        "deck_id": deck_id,
+        "reviewed_at": reviewed_at or datetime.now().isoformat(timespec="seconds"),
+        "grade": grade,
+        "prev_interval": prev_interval,
+        "new_interval": new_interval,
+        "latency_ms": latency_ms,
+    }
+
+def bulk_review_records(card_ids, deck_ids, grades, intervals: np.ndarray, days=None) -> List[dict]:
+    """review_record rows for reviews applied in bulk, with the intervals from srs.replay_reviews.
+
+    With `days` (one per review) the rows are stamped with their review day
+    rather than the current time.
+    """
+    stamps = [None] * len(card_ids) if days is None else np.broadcast_to(days, (len(card_ids),)).astype(str)
+    return [
+        review_record(card_id, deck_id, int(grade), int(prev), int(new), reviewed_at=stamp)
+        for card_id, deck_id, grade, prev, new, stamp in zip(card_ids, deck_ids, grades, *intervals, stamps)
+    ]
+
+def append_reviews(reviews: List[dict]):
+    if not reviews:
+        return
+    os.makedirs(DATA_DIR, exist_ok=True)
+    new_file = not os.path.exists(REVIEW_LOG_FILE) or os.path.getsize(REVIEW_LOG_FILE) == 0
+    with open(REVIEW_LOG_FILE, "a", encoding="utf-8", newline="") as f:
+        w = csv.DictWriter(f, fieldnames=REVIEW_FIELDS)
+        if new_file:
+            w.writeheader()
+        w.writerows(reviews)
+        f.flush()
+        os.fsync(f.fileno())
+
+def iter_review_log(offset: int = 0, batch_bytes: int = 1 << 20) -> Iterator[tuple[pd.DataFrame, int]]:
+    """Yield (rows, offset after them) batches of the review log, starting at byte `offset`.
+
+    A torn final line is left for a later call.
+    """
+    if not os.path.exists(REVIEW_LOG_FILE):
+        return
+    with open(REVIEW_LOG_FILE, "rb") as f:
+        if offset == 0:
+            header = f.readline()
+            if not header.endswith(b"\n"):
+                return
+            offset = len(header)
+        f.seek(offset)
+        while True:
+            lines = f.readlines(batch_bytes)
+            torn = bool(lines) and not lines[-1].endswith(b"\n")
+            if torn:
+                lines.pop()
+            if not lines:
+                return
+            data = b"".join(lines)
+            offset += len(data)
+            rows = pd.read_csv(io.BytesIO(data), names=list(REVIEW_FIELDS), header=None, dtype={"card_id": str, "deck_id": str})
+            yield rows, offset
+            if torn:
+                return
+
+def _load_rollups() -> ReviewRollups:
+    try:
+        with open(REVIEW_ROLLUPS_FILE, encoding="utf-8") as f:
+            return ReviewRollups.from_json(f.read())
+    except (FileNotFoundError, json.JSONDecodeError):
+        return ReviewRollups()
+
+def _save_rollups(rollups: ReviewRollups):
+    tmp_path = REVIEW_ROLLUPS_FILE + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write(rollups.to_json())
+    os.replace(tmp_path, REVIEW_ROLLUPS_FILE)
+
 def load_data():
+    """Load the collection: the CSV snapshots with the journal replayed on top."""
     _ensure_data_files_exist()
-    decks_df = pd.read_csv(DECKS_FILE)
-    cards_df = pd.read_csv(CARDS_FILE)
-    saved_words_df = pd.read_csv(SAVED_WORDS_FILE)
-    return decks_df, cards_df, saved_words_df
-
-def save_data(decks_df: pd.DataFrame, cards_df: pd.DataFrame, saved_words_df: pd.DataFrame = None):
-    decks_df.to_csv(DECKS_FILE, index=False)
-    cards_df.to_csv(CARDS_FILE, index=False)
-    if saved_words_df is not None:
-        saved_words_df.to_csv(SAVED_WORDS_FILE, index=False)
-    st.cache_data.clear()
+    with _snapshot_lock:
+        tables = _read_snapshots()
+        with _journal_lock:
+            records = _read_journal()
+    tables = _apply_journal(tables, records)
+    return tuple(tables[name] for name in TABLES)
+
+def save_data():
+    """Persist pending mutations by appending them to the journal.
+
+    Only the records of tables that were modified are written; the snapshots
+    are rewritten by compaction.
+    """
+    _flush_journal()
+    if os.path.exists(JOURNAL_FILE) and os.path.getsize(JOURNAL_FILE) > JOURNAL_COMPACT_BYTES:
+        _start_compaction()
 
 def get_decks(decks_df: pd.DataFrame) -> List[Deck]:
-    return decks_df.to_dict('records')
+    return frame_records(decks_df)
 
 def get_cards(cards_df: pd.DataFrame, deck_id: str | None = None) -> List[Card]:
     if deck_id:
-        return cards_df[cards_df["deck_id"] == deck_id].to_dict('records')
-    return cards_df.to_dict('records')
+        return frame_records(cards_df[cards_df["deck_id"] == deck_id])
+    return frame_records(cards_df)
 
 def add_deck(decks_df: pd.DataFrame, name: str, description: str) -> pd.DataFrame:
     new_deck = {
@@ -89,7 +513,8 @@ def add_deck(decks_df: pd.DataFrame, name: str, description: str) -> pd.DataFram
         "description": description,
         "created_at": datetime.utcnow().isoformat()
     }
-    return pd.concat([decks_df, pd.DataFrame([new_deck])], ignore_index=True)
+    _record("add", "decks", new_deck["id"], new_deck)
+    return append_rows(decks_df, pd.DataFrame([new_deck]), "decks")
 
 def add_card(cards_df: pd.DataFrame, card_data: dict) -> pd.DataFrame:
     new_card = {
@@ -109,42 +534,87 @@ def add_card(cards_df: pd.DataFrame, card_data: dict) -> pd.DataFrame:
         "created_at": datetime.utcnow().isoformat(),
         "updated_at": datetime.utcnow().isoformat(),
     }
-    return pd.concat([cards_df, pd.DataFrame([new_card])], ignore_index=True)
+    _record("add", "cards", new_card["id"], new_card)
+    return append_rows(cards_df, pd.DataFrame([new_card]), "cards")
 
-def update_card(cards_df: pd.DataFrame, card_id: str, updates: dict) -> pd.DataFrame:
-    idx = cards_df.index[cards_df['id'] == card_id]
-    if not idx.empty:
-        for key, value in updates.items():
-            cards_df.loc[idx, key] = value
-        cards_df.loc[idx, 'updated_at'] = datetime.utcnow().isoformat()
+def add_cards(cards_df: pd.DataFrame, cards_data: Iterable[dict]) -> pd.DataFrame:
+    """Append many cards in one pass, with fresh ids and default SRS state."""
+    new_df = pd.DataFrame(list(cards_data), columns=["deck_id", "de", "en", "example", "tags", "notes"])
+    if new_df.empty:
+        return cards_df
+    now = datetime.utcnow().isoformat()
+    new_df[["example", "tags", "notes"]] = new_df[["example", "tags", "notes"]].fillna("")
+    new_df = new_df.assign(
+        id=[str(uuid.uuid4()) for _ in range(len(new_df))],
+        box=1,
+        ease=2.5,
+        interval_days=1,
+        reps=0,
+        lapses=0,
+        due_date=date.today().isoformat(),
+        created_at=now,
+        updated_at=now,
+    )[list(Card.__annotations__)]
+    _record("add_many", "cards", None, new_df.to_dict('records'))
+    return append_rows(cards_df, new_df, "cards")
+
+def update_card(cards_df: pd.DataFrame, card_id: str, updates: dict, row: int | None = None) -> pd.DataFrame:
+    """Update one card in place; pass its row position to skip the id scan."""
+    if row is None:
+        idx = cards_df.index[cards_df['id'] == card_id]
+        if idx.empty:
+            return cards_df
+        row = cards_df.index.get_loc(idx[0])
+    updates = {**updates, "updated_at": datetime.utcnow().isoformat()}
+    cards_df = add_categories(cards_df, updates)
+    for column, value in updates.items():
+        if column in cards_df.columns:
+            cards_df.iat[row, cards_df.columns.get_loc(column)] = value
+    _record("update", "cards", card_id, updates)
+    return cards_df
+
+def update_cards(cards_df: pd.DataFrame, rows: np.ndarray, values: Dict[str, object]) -> pd.DataFrame:
+    """Update the cards at the given row positions in place, one column at a time.
+
+    Each value is either one value for every row or an array with a value per row.
+    """
+    values = {**values, "updated_at": pd.Timestamp(datetime.utcnow())}
+    for column, value in values.items():
+        dtype = cards_df[column].dtype
+        if isinstance(value, np.ndarray) and not isinstance(dtype, pd.CategoricalDtype):
+            value = value.astype(dtype)
+        cards_df.iloc[rows, cards_df.columns.get_loc(column)] = value
+    _record("update_rows", "cards", None, frame_records(cards_df.iloc[rows][["id", *values]]))
     return cards_df
 
 def delete_deck(decks_df: pd.DataFrame, cards_df: pd.DataFrame, deck_id: str) -> tuple[pd.DataFrame, pd.DataFrame]:
     decks_df = decks_df[decks_df["id"] != deck_id]
     cards_df = cards_df[cards_df["deck_id"] != deck_id]
+    _record("delete_deck", "decks", deck_id)
     return decks_df, cards_df
 
 def delete_card(cards_df: pd.DataFrame, card_id: str) -> pd.DataFrame:
+    _record("delete", "cards", card_id)
     return cards_df[cards_df["id"] != card_id]
 
 def get_due_cards(cards_df: pd.DataFrame, deck_id: str) -> List[Card]:
     today_str = date.today().isoformat()
     due_df = cards_df[(cards_df["deck_id"] == deck_id) & (cards_df["due_date"] <= today_str)]
-    return due_df.to_dict('records')
+    return frame_records(due_df)
 
 def get_new_cards(cards_df: pd.DataFrame, deck_id: str) -> List[Card]:
     new_df = cards_df[(cards_df["deck_id"] == deck_id) & (cards_df["reps"] == 0)]
-    return new_df.to_dict('records')
+    return frame_records(new_df)
 
 # Saved Words Functions
 def get_saved_words(saved_words_df: pd.DataFrame, reviewed_only: bool = None) -> List[SavedWord]:
     """Get saved words, optionally filtered by review status."""
     if reviewed_only is None:
-        return saved_words_df.to_dict('records')
+        return frame_records(saved_words_df)
     elif reviewed_only:
-        return saved_words_df[saved_words_df["reviewed"] == True].to_dict('records')
+        return frame_records(saved_words_df[saved_words_df["reviewed"] == True])
     else:
-        return saved_words_df[saved_words_df["reviewed"] == False].to_dict('records')
+        return frame_records(saved_words_df[saved_words_df["reviewed"] == False])
 
 def add_saved_word(saved_words_df: pd.DataFrame, word_data: dict) -> pd.DataFrame:
     """Add a new saved word."""
@@ -158,20 +628,497 @@ def add_saved_word(saved_words_df: pd.DataFrame, word_data: dict) -> pd.DataFram
         "created_at": datetime.utcnow().isoformat(),
         "reviewed": False
     }
-    return pd.concat([saved_words_df, pd.DataFrame([new_word])], ignore_index=True)
+    _record("add", "saved_words", new_word["id"], new_word)
+    return append_rows(saved_words_df, pd.DataFrame([new_word]), "saved_words")
+
+def add_saved_words(saved_words_df: pd.DataFrame, words_data: Iterable[dict]) -> pd.DataFrame:
+    """Add many saved words in one pass."""
+    new_df = pd.DataFrame(list(words_data), columns=["german", "english", "context", "notes", "source"])
+    if new_df.empty:
+        return saved_words_df
+    new_df[["german", "english", "context", "notes"]] = new_df[["german", "english", "context", "notes"]].fillna("")
+    new_df["source"] = new_df["source"].fillna("Manual")
+    new_df = new_df.assign(
+        id=[str(uuid.uuid4()) for _ in range(len(new_df))],
+        created_at=datetime.utcnow().isoformat(),
+        reviewed=False,
+    )[list(SavedWord.__annotations__)]
+    _record("add_many", "saved_words", None, new_df.to_dict('records'))
+    return append_rows(saved_words_df, new_df, "saved_words")
 
 def update_saved_word(saved_words_df: pd.DataFrame, word_id: str, updates: dict) -> pd.DataFrame:
     """Update a saved word."""
     idx = saved_words_df.index[saved_words_df['id'] == word_id]
     if not idx.empty:
+        saved_words_df = add_categories(saved_words_df, updates)
         for key, value in updates.items():
             saved_words_df.loc[idx, key] = value
+        _record("update", "saved_words", word_id, updates)
     return saved_words_df
 
 def delete_saved_word(saved_words_df: pd.DataFrame, word_id: str) -> pd.DataFrame:
     """Delete a saved word."""
+    _record("delete", "saved_words", word_id)
     return saved_words_df[saved_words_df["id"] != word_id]
 
 def mark_word_reviewed(saved_words_df: pd.DataFrame, word_id: str) -> pd.DataFrame:
     """Mark a word as reviewed."""
     return update_saved_word(saved_words_df, word_id, {"reviewed": True})
+
+def mark_words_reviewed(saved_words_df: pd.DataFrame, word_ids: Iterable[str]) -> pd.DataFrame:
+    """Mark several words as reviewed in one pass."""
+    word_ids = list(word_ids)
+    saved_words_df.loc[saved_words_df["id"].isin(word_ids), "reviewed"] = True
+    _record("update_many", "saved_words", word_ids, {"reviewed": True})
+    return saved_words_df
+
+def delete_saved_words(saved_words_df: pd.DataFrame, word_ids: Iterable[str]) -> pd.DataFrame:
+    """Delete several saved words in one pass."""
+    word_ids = list(word_ids)
+    _record("delete_many", "saved_words", word_ids)
+    return saved_words_df[~saved_words_df["id"].isin(word_ids)]
+
+
+# --- Storage engines ---
+# Pages talk to a store object rather than to the DataFrames directly so the
+# backing engine can be swapped. CsvStore keeps whole tables in pandas and
+# persists through the journal; fishki.sqlite_store.SQLiteStore answers the
+# same calls with indexed queries against fishki.db. One store is shared by
+# every session of the process (see get_store).
+
+def _locked(method):
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self._lock:
+            return method(self, *args, **kwargs)
+    return wrapper
+
+class CsvStore:
+    """CSV storage engine backed by the DataFrame functions above.
+
+    Each table carries a version counter that mutations bump, so a save only
+    writes tables that changed since the last one. Calls are serialized on a
+    lock, and the frames handed out by *_frame() are read-only views that are
+    only re-copied when their table's version moves.
+    """
+
+    def __init__(self):
+        self.decks_df, self.cards_df, self.saved_words_df = load_data()
+        self.versions = dict.fromkeys(TABLES, 0)
+        self._saved_versions = dict(self.versions)
+        self._views: dict[str, tuple[int, pd.DataFrame]] = {}
+        self._lock = threading.RLock()
+        self._pending_reviews: list[dict] = []
+        self._rollups: ReviewRollups | None = None
+        self._answer_pools = AnswerPools(self._build_answer_pool)
+        self._search: SearchIndex | None = None  # built by the first search
+        self._reindex_cards()
+        self._due_index = DueIndex.from_frame(self.cards_df)
+        cards = self.cards_df
+        self._tag_index = TagIndex.from_columns(cards["id"], cards["deck_id"], cards["tags"])
+
+    def _reindex_cards(self):
+        # card id -> row position in cards_df; appends extend it, deletes rebuild it
+        self._card_rows = {card_id: row for row, card_id in enumerate(self.cards_df["id"])}
+
+    def _build_answer_pool(self, deck_id: str) -> AnswerPool:
+        cards = self.cards_df[self.cards_df["deck_id"] == deck_id]
+        return AnswerPool(cards["id"].tolist(), cards["de"].tolist(), cards["en"].tolist())
+
+    def _rows_to_cards(self, card_ids: List[str]) -> List[Card]:
+        rows = [self._card_rows[card_id] for card_id in card_ids]
+        return frame_records(self.cards_df.iloc[rows])
+
+    def _touch(self, *tables: str):
+        for table in tables:
+            self.versions[table] += 1
+
+    def _view(self, table: str) -> pd.DataFrame:
+        version, view = self._views.get(table, (None, None))
+        if version != self.versions[table]:
+            view = getattr(self, f"{table}_df").copy()
+            self._views[table] = (self.versions[table], view)
+        return view
+
+    def iter_rows(self, table: str, deck_id: str | None = None) -> Iterator[dict]:
+        """Stream a table's records in batches; `deck_id` narrows the cards table to one deck."""
+        with self._lock:
+            df = self._view(table)
+        if deck_id is not None:
+            df = df[df["deck_id"] == deck_id]
+        return iter_records(df)
+
+    @_locked
+    def dirty_tables(self) -> set[str]:
+        return {t for t in TABLES if self.versions[t] != self._saved_versions[t]}
+
+    @_locked
+    def get_decks(self) -> List[Deck]:
+        return get_decks(self.decks_df)
+
+    @_locked
+    def get_cards(self, deck_id: str | None = None) -> List[Card]:
+        return get_cards(self.cards_df, deck_id)
+
+    @_locked
+    def get_card(self, card_id: str) -> Card | None:
+        row = self._card_rows.get(card_id)
+        if row is None:
+            return None
+        return row_record(self.cards_df, row)
+
+    @_locked
+    def get_due_cards(self, deck_id: str, days: int = 0) -> List[Card]:
+        """Cards due today, or within the next `days` days."""
+        until = (date.today() + timedelta(days=days)).isoformat()
+        return self._rows_to_cards(self._due_index.due_ids(deck_id, until))
+
+    @_locked
+    def due_counts(self, days: int, deck_id: str | None = None) -> Dict[str, int]:
+        """Cards due per day over the next `days` days, with overdue cards counted today."""
+        today = date.today()
+        return self._due_index.counts(today.isoformat(), (today + timedelta(days=days)).isoformat(), deck_id)
+
+    @_locked
+    def next_due_date(self, deck_id: str | None = None) -> str | None:
+        return self._due_index.next_due(deck_id)
+
+    @_locked
+    def get_new_cards(self, deck_id: str) -> List[Card]:
+        return get_new_cards(self.cards_df, deck_id)
+
+    @_locked
+    def due_queue(self, deck_id: str | None, days: int = 0, tags: str | None = None) -> List[models.Card]:
+        """get_due_cards as models.Card records.
+
+        `deck_id` None queues every deck; `tags` is a tag filter such as "verb AND A1".
+        """
+        until = (date.today() + timedelta(days=days)).isoformat()
+        card_ids = self._due_index.due_ids(deck_id, until)
+        if tags:
+            tagged = self._tag_index.select(tags, deck_id)
+            card_ids = [card_id for card_id in card_ids if card_id in tagged]
+        rows = [self._card_rows[card_id] for card_id in card_ids]
+        return models.Card.from_columns(frame_columns(self.cards_df.iloc[rows]))
+
+    def due_stream(self, deck_id: str, days: int = 0, tags: str | None = None) -> Iterator[Tuple[str, str]]:
+        """(due date, card id) of the deck's due cards, most overdue first, read from the due index on demand."""
+        until = (date.today() + timedelta(days=days)).isoformat()
+        with self._lock:
+            tagged = self._tag_index.select(tags, deck_id) if tags else None
+            due = self._due_index.iter_due(deck_id, until)
+        while True:
+            with self._lock:
+                item = next(due, None)
+            if item is None:
+                return
+            if tagged is None or item[1] in tagged:
+                yield item
+
+    @_locked
+    def new_queue(self, deck_id: str | None, tags: str | None = None) -> List[models.Card]:
+        """get_new_cards as models.Card records, narrowed like due_queue."""
+        df = self.cards_df
+        if tags:
+            df = df.iloc[sorted(self._card_rows[card_id] for card_id in self._tag_index.select(tags, deck_id))]
+        elif deck_id is not None:
+            df = df[df["deck_id"] == deck_id]
+        return models.Card.from_columns(frame_columns(df[df["reps"] == 0]))
+
+    @_locked
+    def tag_counts(self, deck_id: str | None = None) -> Dict[str, int]:
+        """Cards per tag in the deck, or in the whole collection."""
+        return self._tag_index.counts(deck_id)
+
+    @_locked
+    def tagged_card_ids(self, tags: str, deck_id: str | None = None) -> Set[str]:
+        """Ids of the cards matching a tag filter such as "verb AND A1"; raises ValueError on a malformed filter."""
+        return self._tag_index.select(tags, deck_id)
+
+    @_locked
+    def cards_frame(self) -> pd.DataFrame:
+        return self._view("cards")
+
+    @_locked
+    def search(self, query: str, limit: int = 50) -> List[SearchHit]:
+        """Cards and saved words matching every word of the query (as prefixes), best first."""
+        if self._search is None:
+            self._search = SearchIndex.build(frame_records(self.cards_df), frame_records(self.saved_words_df))
+        return self._search.search(query, limit)
+
+    def _index_rows(self, kind: str, df: pd.DataFrame, rows, removed_ids=()):
+        # Keeps a built search index in step with a table change; `rows` is a position or anything iloc takes
+        if self._search is not None:
+            records = [row_record(df, rows)] if isinstance(rows, int) else frame_records(df.iloc[rows])
+            self._search.update(kind, records, removed_ids)
+
+    @_locked
+    def answer_pool(self, deck_id: str) -> AnswerPool:
+        """The deck's quiz answers, kept until one of its cards is added, edited or deleted."""
+        return self._answer_pools.get(deck_id)
+
+    @_locked
+    def add_deck(self, name: str, description: str) -> str:
+        self.decks_df = add_deck(self.decks_df, name, description)
+        self._touch("decks")
+        return self.decks_df.iloc[-1]["id"]
+
+    @_locked
+    def delete_deck(self, deck_id: str):
+        self.decks_df, self.cards_df = delete_deck(self.decks_df, self.cards_df, deck_id)
+        self._reindex_cards()
+        self._due_index.drop_deck(deck_id)
+        self._answer_pools.invalidate(deck_id)
+        self._tag_index.remove_deck(deck_id)
+        if self._search is not None:
+            self._search.remove_deck(deck_id)
+        self._touch("decks", "cards")
+
+    @_locked
+    def add_card(self, card_data: dict) -> str:
+        self.cards_df = add_card(self.cards_df, card_data)
+        card = self.cards_df.iloc[-1]
+        card_id = card["id"]
+        self._card_rows[card_id] = len(self.cards_df) - 1
+        self._due_index.add(card["deck_id"], card_id, card["due_date"])
+        self._answer_pools.add(card["deck_id"], [card_id], [card["de"]], [card["en"]])
+        self._tag_index.add(card_id, card["deck_id"], card["tags"])
+        self._index_rows("card", self.cards_df, len(self.cards_df) - 1)
+        self._touch("cards")
+        return card_id
+
+    @_locked
+    def add_cards(self, cards_data: Iterable[dict]) -> int:
+        start = len(self.cards_df)
+        self.cards_df = add_cards(self.cards_df, cards_data)
+        new = self.cards_df.iloc[start:]
+        for row, (card_id, deck_id, due, tags) in enumerate(zip(new["id"], new["deck_id"], new["due_date"], new["tags"]), start):
+            self._card_rows[card_id] = row
+            self._due_index.add(deck_id, card_id, due)
+            self._tag_index.add(card_id, deck_id, tags)
+        for deck_id, cards in new.groupby("deck_id", observed=True):
+            self._answer_pools.add(deck_id, cards["id"], cards["de"], cards["en"])
+        self._index_rows("card", self.cards_df, slice(start, None))
+        if len(new):
+            self._touch("cards")
+        return len(new)
+
+    @_locked
+    def update_card(self, card_id: str, updates: dict):
+        row = self._card_rows.get(card_id)
+        if row is None:
+            return
+        old_due = self.cards_df.iat[row, self.cards_df.columns.get_loc("due_date")]
+        old_deck_id = self.cards_df.iat[row, self.cards_df.columns.get_loc("deck_id")]
+        self.cards_df = update_card(self.cards_df, card_id, updates, row=row)
+        if updates.keys() & {"due_date", "deck_id"}:
+            # The card leaves its old deck's bucket even when only the deck changes
+            deck_id = self.cards_df.iat[row, self.cards_df.columns.get_loc("deck_id")]
+            self._due_index.move(old_deck_id, card_id, old_due, updates.get("due_date", old_due), to_deck=deck_id)
+        if updates.keys() & {"de", "en", "deck_id"}:
+            self._answer_pools.invalidate(old_deck_id, updates.get("deck_id", old_deck_id))
+        if updates.keys() & {"deck_id", "tags"}:
+            columns = [self.cards_df.columns.get_loc(c) for c in ("deck_id", "tags")]
+            self._tag_index.add(card_id, *(self.cards_df.iat[row, column] for column in columns))
+        if updates.keys() & {"deck_id", *FIELD_WEIGHTS["card"]}:
+            self._index_rows("card", self.cards_df, row)
+        self._touch("cards")
+
+    def _update_rows(self, rows: np.ndarray, values: Dict[str, object]):
+        if len(rows):
+            self.cards_df = update_cards(self.cards_df, rows, values)
+            self._due_index = DueIndex.from_frame(self.cards_df)
+            self._touch("cards")
+
+    @_locked
+    def reset_deck(self, deck_id: str) -> int:
+        """Forget the review history of every card in the deck; they become new cards due today."""
+        rows = np.flatnonzero((self.cards_df["deck_id"] == deck_id).to_numpy())
+        self._update_rows(rows, {**NEW_CARD_SCHEDULE, "due_date": pd.Timestamp(date.today())})
+        return len(rows)
+
+    @_locked
+    def postpone_overdue(self, days: int, deck_id: str | None = None) -> int:
+        """Push the due date of every overdue card back by `days` days."""
+        due = self.cards_df["due_date"]
+        overdue = due < pd.Timestamp(date.today())
+        if deck_id is not None:
+            overdue &= self.cards_df["deck_id"] == deck_id
+        rows = np.flatnonzero(overdue.to_numpy())
+        self._update_rows(rows, {"due_date": (due.iloc[rows] + pd.Timedelta(days=days)).to_numpy()})
+        return len(rows)
+
+    @_locked
+    def apply_reviews(self, card_ids: List[str], grades, days=None) -> int:
+        """Grade cards in bulk, e.g. from an imported review history.
+
+        Reviews are applied in order, so a card may appear several times;
+        `days` gives the day of each review (default: today). Unknown card
+        ids are skipped. Each review is logged like a single grade and
+        written by the next save_changes. Returns the number of reviews applied.
+        """
+        known = [i for i, card_id in enumerate(card_ids) if card_id in self._card_rows]
+        rows = np.array([self._card_rows[card_ids[i]] for i in known], dtype=np.int64)
+        stamped = days is not None
+        days = np.asarray(date.today() if days is None else days, dtype="datetime64[D]")
+        if days.ndim:
+            days = days[known]
+        grades = np.asarray(grades)[known]
+        unique_rows, positions = np.unique(rows, return_inverse=True)
+        cards = self.cards_df.iloc[unique_rows]
+        state = {field: cards[field].to_numpy() for field in srs.SCHEDULE_FIELDS}
+        state["ease"] = cards["ease"].astype("float64").round(6).to_numpy()  # as frame_records hands it out
+        state["due_date"] = cards["due_date"].to_numpy()
+        intervals = np.empty((2, len(rows)), dtype=np.int64)
+        self._update_rows(unique_rows, srs.replay_reviews(state, positions, grades, days, intervals))
+        deck_ids = cards["deck_id"].to_numpy()[positions]
+        self._pending_reviews += bulk_review_records(
+            [card_ids[i] for i in known], deck_ids, grades, intervals, days if stamped else None
+        )
+        return len(rows)
+
+    @_locked
+    def delete_card(self, card_id: str):
+        row = self._card_rows.get(card_id)
+        if row is not None:
+            deck_id = self.cards_df.iat[row, self.cards_df.columns.get_loc("deck_id")]
+            self._due_index.remove(deck_id, card_id, self.cards_df.iat[row, self.cards_df.columns.get_loc("due_date")])
+            self._answer_pools.invalidate(deck_id)
+        self.cards_df = delete_card(self.cards_df, card_id)
+        self._tag_index.remove(card_id)
+        self._index_rows("card", self.cards_df, [], [card_id])
+        self._reindex_cards()
+        self._touch("cards")
+
+    @_locked
+    def get_saved_words(self, reviewed_only: bool = None) -> List[SavedWord]:
+        return get_saved_words(self.saved_words_df, reviewed_only)
+
+    @_locked
+    def saved_words_frame(self) -> pd.DataFrame:
+        return self._view("saved_words")
+
+    @_locked
+    def add_saved_word(self, word_data: dict) -> str:
+        self.saved_words_df = add_saved_word(self.saved_words_df, word_data)
+        self._index_rows("saved_word", self.saved_words_df, len(self.saved_words_df) - 1)
+        self._touch("saved_words")
+        return self.saved_words_df.iloc[-1]["id"]
+
+    @_locked
+    def add_saved_words(self, words_data: Iterable[dict]) -> int:
+        start = len(self.saved_words_df)
+        self.saved_words_df = add_saved_words(self.saved_words_df, words_data)
+        self._index_rows("saved_word", self.saved_words_df, slice(start, None))
+        if len(self.saved_words_df) > start:
+            self._touch("saved_words")
+        return len(self.saved_words_df) - start
+
+    @_locked
+    def update_saved_word(self, word_id: str, updates: dict):
+        self.saved_words_df = update_saved_word(self.saved_words_df, word_id, updates)
+        if updates.keys() & FIELD_WEIGHTS["saved_word"].keys():
+            self._index_rows("saved_word", self.saved_words_df, np.flatnonzero((self.saved_words_df["id"] == word_id).to_numpy()))
+        self._touch("saved_words")
+
+    @_locked
+    def delete_saved_word(self, word_id: str):
+        self.saved_words_df = delete_saved_word(self.saved_words_df, word_id)
+        self._index_rows("saved_word", self.saved_words_df, [], [word_id])
+        self._touch("saved_words")
+
+    @_locked
+    def mark_word_reviewed(self, word_id: str):
+        self.saved_words_df = mark_word_reviewed(self.saved_words_df, word_id)
+        self._touch("saved_words")
+
+    @_locked
+    def mark_words_reviewed(self, word_ids: Iterable[str]):
+        self.saved_words_df = mark_words_reviewed(self.saved_words_df, word_ids)
+        self._touch("saved_words")
+
+    @_locked
+    def delete_saved_words(self, word_ids: Iterable[str]):
+        word_ids = list(word_ids)
+        self.saved_words_df = delete_saved_words(self.saved_words_df, word_ids)
+        self._index_rows("saved_word", self.saved_words_df, [], word_ids)
+        self._touch("saved_words")
+
+    @_locked
+    def log_review(self, card_id: str, deck_id: str, grade: int, prev_interval: int, new_interval: int, latency_ms: int | None = None):
+        """Record a graded card in the review log (written by the next save_changes)."""
+        self._pending_reviews.append(review_record(card_id, deck_id, grade, prev_interval, new_interval, latency_ms))
+
+    def iter_reviews(self) -> Iterator[pd.DataFrame]:
+        """The saved review log, in batches."""
+        for rows, _ in iter_review_log():
+            yield rows
+
+    @_locked
+    def review_summary(self, since: str | None = None) -> Dict[str, pd.DataFrame]:
+        """Review analytics from the rollups, after folding in log rows added since the last call."""
+        if self._rollups is None:
+            self._rollups = _load_rollups()
+        cursor = self._rollups.cursor
+        for rows, offset in iter_review_log(cursor):
+            self._rollups.update(rows, offset)
+        if self._rollups.cursor != cursor:
+            _save_rollups(self._rollups)
+        return self._rollups.summary(since)
+
+    @_locked
+    def save_changes(self) -> set[str]:
+        """Write all mutations since the last save in one batch; returns the tables written."""
+        dirty = self.dirty_tables()
+        if dirty:
+            save_data()
+            self._saved_versions = dict(self.versions)
+        if self._pending_reviews:
+            append_reviews(self._pending_reviews)
+            self._pending_reviews = []
+            dirty.add("review_log")
+        return dirty
+
+def create_store(engine: str | None = None):
+    engine = engine or STORAGE_ENGINE
+    if engine == "sqlite":
+        from fishki.sqlite_store import SQLiteStore
+        return SQLiteStore(DB_FILE)
+    if engine == "csv":
+        return CsvStore()
+    raise ValueError(f"Unknown storage engine: {engine}")
+
+def write_backup(store, out: IO[bytes]):
+    """Write the whole collection from `store` into `out` as a zip of per-table CSVs."""
+    csv_io.write_backup(out, {table: (table_columns(table), store.iter_rows(table)) for table in TABLES})
+
+def import_csv(store, source, deck_id: str, duplicates=None, on_progress=None) -> Tuple[int, int]:
+    """Add the cards of a CSV file (path or upload) to a deck; returns (imported, skipped).
+
+    The whole file is parsed once before the first card is added, so a
+    malformed row or a bad encoding anywhere in it leaves the collection
+    unchanged. With a dedup.DuplicateIndex as `duplicates`, words it already
+    holds are skipped.
+    """
+    report = on_progress or (lambda fraction: None)
+    for _ in csv_io.iter_csv(source, on_progress=lambda fraction: report(fraction / 2)):
+        pass
+    imported = skipped = 0
+    for batch in csv_io.iter_csv(source, on_progress=lambda fraction: report(0.5 + fraction / 2)):
+        if duplicates is not None:
+            batch, found = duplicates.split(batch)
+            skipped += len(found)
+        imported += store.add_cards({**card_data, "deck_id": deck_id} for card_data in batch)
+    return imported, skipped
+
+@st.cache_resource
+def _shared_store(engine: str):
+    return create_store(engine)
+
+def get_store():
+    """Return the process-wide store for the configured storage engine.
+
+    Every session gets the same object, so edits are visible to all of them
+    at once and the collection is held in memory only once.
+    """
+    return _shared_store(STORAGE_ENGINE)
@@ -0,0 +1,199 @@
+"""Duplicate and near-duplicate words across decks and saved words.
+
+Words are compared by their German side, folded with fishki.matching and
+stripped of leading articles, so "das Haus" and "Haus" share a key. Near
+duplicates are only looked for among keys that start with the same
+BLOCK_PREFIX letters: each block is scored in one multi-threaded rapidfuzz
+cdist call instead of comparing every pair of words in the collection.
+Two words with equal or near keys are only duplicates if their English
+sides agree too, which keeps "bestehen" (to pass) apart from "bestechen"
+(to bribe).
+"""
+from __future__ import annotations
+from typing import Dict, Iterable, List, NamedTuple, Tuple
+
+import numpy as np
+from rapidfuzz import fuzz, process
+
+from fishki.matching import fold, strip_leading_words, variants
+
+# fuzz.ratio at which two keys count as the same word
+NEAR_DUPLICATE_SCORE = 85
+
+# fuzz.ratio between the closest variants of two translations that agree
+TRANSLATION_SCORE = 80
+
+# Leading letters of a key that near duplicates must share
+BLOCK_PREFIX = 2
+
+class Entry(NamedTuple):
+    kind: str  # "card" or "saved_word"
+    id: object
+    deck_id: object  # None for saved words
+    de: str
+    en: str
+    reps: int = 0
+    box: int = 1
+    interval_days: int = 1
+
+class DuplicateGroup(NamedTuple):
+    entries: List[Entry]
+    exact: bool  # every entry has the same key
+
+def dedup_key(text: str) -> str:
+    return strip_leading_words(fold(text))
+
+def same_meaning(en_a: str, en_b: str) -> bool:
+    """Whether two translations agree; a missing translation agrees with anything."""
+    a, b = variants(en_a), variants(en_b)
+    if not a or not b:
+        return True
+    return process.cdist(a, b, scorer=fuzz.ratio).max() >= TRANSLATION_SCORE
+
+def collection_entries(store) -> List[Entry]:
+    """Every card and saved word of a store, streamed from store.iter_rows."""
+    entries = [
+        Entry("card", c["id"], c["deck_id"], c["de"], c["en"], int(c["reps"]), int(c["box"]), int(c["interval_days"]))
+        for c in store.iter_rows("cards")
+    ]
+    entries += [Entry("saved_word", w["id"], None, w["german"], w["english"]) for w in store.iter_rows("saved_words")]
+    return entries
+
+def _blocks(keys: Iterable[str]) -> Dict[str, List[str]]:
+    blocks: Dict[str, List[str]] = {}
+    for key in keys:
+        blocks.setdefault(key[:BLOCK_PREFIX], []).append(key)
+    return blocks
+
+def near_duplicate_keys(keys: List[str], threshold: int = NEAR_DUPLICATE_SCORE, workers: int = -1) -> List[Tuple[str, str]]:
+    """Pairs of distinct keys in the same block scoring at least `threshold`."""
+    pairs = []
+    for block in _blocks(keys).values():
+        if len(block) < 2:
+            continue
+        scores = process.cdist(block, block, scorer=fuzz.ratio, score_cutoff=threshold, dtype=np.uint8, workers=workers)
+        for i, j in zip(*np.nonzero(np.triu(scores, k=1))):
+            pairs.append((block[i], block[j]))
+    return pairs
+
+def find_duplicates(entries: List[Entry], threshold: int = NEAR_DUPLICATE_SCORE, workers: int = -1) -> List[DuplicateGroup]:
+    """Groups of entries that are the same word, largest first."""
+    by_key: Dict[str, List[int]] = {}
+    for i, entry in enumerate(entries):
+        key = dedup_key(entry.de)
+        if key:
+            by_key.setdefault(key, []).append(i)
+
+    # union-find over entries with equal or near keys whose translations agree
+    parent = list(range(len(entries)))
+    def root(i):
+        while parent[i] != i:
+            parent[i] = i = parent[parent[i]]
+        return i
+    def join(members_a, members_b):
+        for i in members_a:
+            for j in members_b:
+                if root(i) != root(j) and same_meaning(entries[i].en, entries[j].en):
+                    parent[root(i)] = root(j)
+    for members in by_key.values():
+        join(members, members)
+    for a, b in near_duplicate_keys(list(by_key), threshold, workers):
+        join(by_key[a], by_key[b])
+
+    clusters: Dict[int, List[int]] = {}
+    for members in by_key.values():
+        for i in members:
+            clusters.setdefault(root(i), []).append(i)
+    groups = [
+        DuplicateGroup([entries[i] for i in members], exact=len({dedup_key(entries[i].de) for i in members}) == 1)
+        for members in clusters.values()
+        if len(members) > 1
+    ]
+    return sorted(groups, key=lambda group: -len(group.entries))
+
+def _history(entry: Entry) -> tuple:
+    return (entry.kind == "card", entry.reps, entry.box, entry.interval_days)
+
+def merge_group(store, group: DuplicateGroup) -> Entry:
+    """Keep the entry with the best review history and delete the others.
+
+    Cards beat saved words; among cards, more reviews, then a higher box
+    and a longer interval win. Empty example, tags and notes of the kept
+    card are filled in from the deleted ones. Returns the kept entry.
+    """
+    keep = max(group.entries, key=_history)
+    if keep.kind == "card":
+        kept = store.get_card(keep.id)
+        fill = {}
+        for entry in group.entries:
+            if entry.kind == "card" and entry.id != keep.id:
+                other = store.get_card(entry.id)
+                for field in ("example", "tags", "notes"):
+                    if not (fill.get(field) or kept[field]) and other and other[field]:
+                        fill[field] = other[field]
+        if fill:
+            store.update_card(keep.id, fill)
+    for entry in group.entries:
+        if entry is keep:
+            continue
+        if entry.kind == "card":
+            store.delete_card(entry.id)
+        else:
+            store.delete_saved_word(entry.id)
+    return keep
+
+class DuplicateIndex:
+    """Keys and translations of the words already in the collection, blocked by prefix.
+
+    Checking an incoming word costs a dict lookup plus one rapidfuzz extract
+    over the word's block.
+    """
+
+    def __init__(self, words: Iterable[Tuple[str, str]] = ()):
+        self._translations: Dict[str, List[str]] = {}  # key -> English sides
+        self._blocks: Dict[str, List[str]] = {}
+        for de, en in words:
+            self.add(de, en)
+
+    def add(self, de: str, en: str = ""):
+        key = dedup_key(de)
+        if not key:
+            return
+        if key not in self._translations:
+            self._translations[key] = []
+            self._blocks.setdefault(key[:BLOCK_PREFIX], []).append(key)
+        self._translations[key].append(en)
+
+    def match(self, de: str, en: str = "", threshold: int = NEAR_DUPLICATE_SCORE) -> str | None:
+        """The existing key the word duplicates, if any."""
+        key = dedup_key(de)
+        candidates = [key] if key in self._translations else []
+        candidates += [
+            found for found, _, _ in process.extract(
+                key, self._blocks.get(key[:BLOCK_PREFIX], []), scorer=fuzz.ratio, score_cutoff=threshold, limit=5
+            )
+            if found != key
+        ]
+        for candidate in candidates:
+            if any(same_meaning(en, other) for other in self._translations[candidate]):
+                return candidate
+        return None
+
+    def split(self, rows: Iterable[dict]) -> Tuple[List[dict], List[dict]]:
+        """Split incoming card rows into new words and duplicates; new words join the index."""
+        fresh, duplicates = [], []
+        for row in rows:
+            if self.match(row["de"], row["en"]) is None:
+                self.add(row["de"], row["en"])
+                fresh.append(row)
+            else:
+                duplicates.append(row)
+        return fresh, duplicates
+
+def card_index(store) -> DuplicateIndex:
+    """A DuplicateIndex of the store's cards, for skipping duplicates on import.
+
+    Saved words are left out: a word that was only saved shouldn't keep it
+    from becoming a card.
+    """
+    return DuplicateIndex((card["de"], card["en"]) for card in store.iter_rows("cards"))
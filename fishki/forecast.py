@@ -0,0 +1,76 @@
+from __future__ import annotations
+from datetime import date
+from typing import Mapping, Sequence
+
+import numpy as np
+
+from fishki.srs import SchedulerParams, next_schedule_arrays
+
+# Chance of answering Again, Hard, Good, Easy when no history is available
+GRADE_PROBS = (0.1, 0.15, 0.6, 0.15)
+
+def estimate_grade_probs(reps, lapses) -> tuple[float, float, float, float]:
+    """Grade probabilities with the Again rate taken from the collection's lapse ratio.
+
+    Hard/Good/Easy keep the default proportions between them.
+    """
+    total_reps = int(np.sum(reps))
+    if total_reps == 0:
+        return GRADE_PROBS
+    again = float(np.clip(np.sum(lapses) / total_reps, 0.01, 0.9))
+    rest = np.asarray(GRADE_PROBS[1:]) / sum(GRADE_PROBS[1:]) * (1 - again)
+    return (again, *map(float, rest))
+
+def simulate_workload(
+    cards: Mapping[str, np.ndarray],
+    days: int,
+    grade_probs: Sequence[float] = GRADE_PROBS,
+    runs: int = 4,
+    new_per_day: int = 0,
+    today: date | None = None,
+    seed: int | None = None,
+    params: SchedulerParams | None = None,
+) -> np.ndarray:
+    """Monte-Carlo projection of the daily review load.
+
+    `cards` holds the ease, interval_days, box and due_date columns of the
+    collection. Every run grades each due card with a random grade drawn
+    from `grade_probs`, reschedules it with next_schedule and keeps going
+    until the card falls past the horizon; `new_per_day` fresh cards join
+    the collection every day. All cards of all runs are advanced together,
+    one review per round. Returns reviews per day with shape (runs, days).
+    """
+    rng = np.random.default_rng(seed)
+    today = np.datetime64(today or date.today(), "D")
+    due_date = np.asarray(cards["due_date"], dtype="datetime64[D]")
+    scheduled = ~np.isnat(due_date)
+    due = np.maximum(0, (due_date[scheduled] - today).astype(np.int64))  # overdue cards come up today
+    ease = np.asarray(cards["ease"], dtype=np.float64)[scheduled]
+    interval = np.asarray(cards["interval_days"], dtype=np.int64)[scheduled]
+    box = np.asarray(cards["box"], dtype=np.int64)[scheduled]
+
+    if new_per_day:
+        intake = np.repeat(np.arange(days), new_per_day)
+        due = np.concatenate([due, intake])
+        ease = np.concatenate([ease, np.full(len(intake), 2.5)])
+        interval = np.concatenate([interval, np.ones(len(intake), dtype=np.int64)])
+        box = np.concatenate([box, np.ones(len(intake), dtype=np.int64)])
+
+    # one copy of the collection per run
+    n = len(due)
+    run = np.repeat(np.arange(runs), n)
+    due, ease, interval, box = (np.tile(a, runs) for a in (due, ease, interval, box))
+
+    again, hard, good = np.cumsum(grade_probs)[:3] / np.sum(grade_probs)
+    counts = np.zeros(runs * days, dtype=np.int64)
+    while True:
+        live = due < days
+        run, due, ease, interval, box = run[live], due[live], ease[live], interval[live], box[live]
+        if not len(due):
+            break
+        counts += np.bincount(run * days + due, minlength=runs * days)
+        draw = rng.random(len(due))
+        grades = 1 + (draw >= again).astype(np.int8) + (draw >= hard) + (draw >= good)
+        ease, interval, box = next_schedule_arrays(ease, interval, box, grades, params)
+        due = due + interval
+    return counts.reshape(runs, days)
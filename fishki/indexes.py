@@ -0,0 +1,440 @@
+from __future__ import annotations
+import bisect
+import random
+import re
+from datetime import date
+from typing import Callable, Dict, Hashable, Iterable, Iterator, List, Sequence, Set, Tuple
+
+import numpy as np
+import pandas as pd
+from rapidfuzz import fuzz, process
+
+from fishki.utils import normalize_text
+
+# MinHash LSH layout of ConfusableIndex: a pair of strings whose bigram sets
+# have Jaccard similarity s shares a bucket with probability 1 - (1 - s**ROWS)**BANDS
+LSH_BANDS = 20
+LSH_ROWS = 2
+# Bucket-mates re-ranked with rapidfuzz per query
+LSH_CANDIDATES = 64
+
+
+def _day(value) -> str | None:
+    """ISO day for a due date given as a string, date or Timestamp."""
+    if isinstance(value, str):
+        return value[:10]
+    if isinstance(value, date) and not pd.isna(value):
+        return value.isoformat()[:10]
+    return None
+
+
+class DueIndex:
+    """Per-deck calendar of card ids bucketed by ISO due date.
+
+    Each deck keeps a sorted list of the days that have cards due plus a set
+    of card ids per day, so due queues and per-day counts only touch the days
+    (and cards) they return.
+    """
+
+    def __init__(self):
+        self._days: Dict[str, List[str]] = {}
+        self._buckets: Dict[str, Dict[str, Set[str]]] = {}
+
+    @classmethod
+    def from_frame(cls, cards_df: pd.DataFrame) -> "DueIndex":
+        index = cls()
+        dated = cards_df[cards_df["due_date"].notna()]
+        for (deck_id, due), ids in dated.groupby(["deck_id", "due_date"], sort=True, observed=True)["id"]:
+            index._buckets.setdefault(deck_id, {})[_day(due)] = set(ids)
+        for deck_id, buckets in index._buckets.items():
+            index._days[deck_id] = sorted(buckets)
+        return index
+
+    def add(self, deck_id: str, card_id: str, due):
+        due = _day(due)
+        if due is None:
+            return
+        buckets = self._buckets.setdefault(deck_id, {})
+        if due not in buckets:
+            buckets[due] = set()
+            bisect.insort(self._days.setdefault(deck_id, []), due)
+        buckets[due].add(card_id)
+
+    def remove(self, deck_id: str, card_id: str, due):
+        due = _day(due)
+        bucket = self._buckets.get(deck_id, {}).get(due)
+        if bucket is None:
+            return
+        bucket.discard(card_id)
+        if not bucket:
+            del self._buckets[deck_id][due]
+            days = self._days[deck_id]
+            del days[bisect.bisect_left(days, due)]
+
+    def move(self, deck_id: str, card_id: str, old_due, new_due, to_deck: str | None = None):
+        """Re-bucket a card under its new due date, and under `to_deck` if it changed decks."""
+        self.remove(deck_id, card_id, old_due)
+        self.add(deck_id if to_deck is None else to_deck, card_id, new_due)
+
+    def drop_deck(self, deck_id: str):
+        self._days.pop(deck_id, None)
+        self._buckets.pop(deck_id, None)
+
+    def due_ids(self, deck_id: str | None, until: str) -> List[str]:
+        """Ids of the deck's (or the whole collection's) cards due on or before `until`."""
+        deck_ids = [deck_id] if deck_id is not None else list(self._days)
+        ids = []
+        for d in deck_ids:
+            days = self._days.get(d, [])
+            buckets = self._buckets.get(d, {})
+            ids += [card_id for day in days[:bisect.bisect_right(days, until)] for card_id in buckets[day]]
+        return ids
+
+    def iter_due(self, deck_id: str, until: str) -> Iterator[Tuple[str, str]]:
+        """(day, card id) of the deck's cards due on or before `until`, earliest first.
+
+        Each day's bucket is copied only when the iteration reaches it.
+        """
+        days = self._days.get(deck_id, [])
+        for day in days[:bisect.bisect_right(days, until)]:
+            for card_id in list(self._buckets.get(deck_id, {}).get(day, ())):
+                yield day, card_id
+
+    def counts(self, start: str, end: str, deck_id: str | None = None) -> Dict[str, int]:
+        """Cards due per day in [start, end); anything overdue is counted on `start`."""
+        counts: Dict[str, int] = {}
+        deck_ids = [deck_id] if deck_id is not None else list(self._days)
+        for d in deck_ids:
+            days = self._days.get(d, [])
+            buckets = self._buckets.get(d, {})
+            for day in days[:bisect.bisect_left(days, end)]:
+                key = max(day, start)
+                counts[key] = counts.get(key, 0) + len(buckets[day])
+        return counts
+
+    def next_due(self, deck_id: str | None = None) -> str | None:
+        """Earliest due date in the deck (or the whole collection)."""
+        deck_ids = [deck_id] if deck_id is not None else list(self._days)
+        firsts = [self._days[d][0] for d in deck_ids if self._days.get(d)]
+        return min(firsts) if firsts else None
+
+
+# AND/OR/NOT in a tag filter; a comma is an AND
+_TAG_OPERATOR = re.compile(r"\s*(,|\bAND\b|\bOR\b|\bNOT\b)\s*")
+
+
+def normalize_tag(tag: str) -> str:
+    return " ".join(tag.split()).casefold()
+
+
+def split_tags(text: str) -> List[str]:
+    """The tags of a card's comma-separated tags string, blanks dropped."""
+    return [tag.strip() for tag in (text or "").split(",") if tag.strip()]
+
+
+def parse_tag_filter(expression: str) -> List[List[Tuple[str, bool]]]:
+    """A filter such as "verb AND A1 OR noun AND NOT B2" as OR-ed clauses of (tag, negated) terms.
+
+    AND binds tighter than OR; operators are upper case so tags may contain
+    the words. Raises ValueError on a misplaced operator.
+    """
+    clauses, clause = [], []
+    negated, expect_tag = False, True
+    for i, token in enumerate(_TAG_OPERATOR.split((expression or "").strip())):
+        if i % 2 == 0:
+            if not token:
+                continue
+            if not expect_tag:
+                raise ValueError(f"Missing AND/OR before {token!r}")
+            clause.append((normalize_tag(token), negated))
+            negated, expect_tag = False, False
+        elif token == "NOT":
+            if not expect_tag:
+                raise ValueError("Missing AND/OR before NOT")
+            if negated:
+                raise ValueError("NOT must come before a tag")
+            negated = True
+        else:
+            if expect_tag:
+                raise ValueError(f"Missing tag before {'AND' if token == ',' else token}")
+            if token == "OR":
+                clauses.append(clause)
+                clause = []
+            expect_tag = True
+    if expect_tag and (clauses or clause or negated):
+        raise ValueError("The filter ends with an operator")
+    if clause:
+        clauses.append(clause)
+    return clauses
+
+
+class TagIndex:
+    """Normalized tag -> ids of the cards carrying it.
+
+    Tag filters are evaluated as set intersections and differences over the
+    index, so no card's tags string is split at query time.
+    """
+
+    def __init__(self):
+        self._cards: Dict[str, Set[Hashable]] = {}
+        self._names: Dict[str, str] = {}  # normalized tag -> spelling as first seen
+        self._card_tags: Dict[Hashable, Tuple[str, ...]] = {}
+        self._decks: Dict[Hashable, Set[Hashable]] = {}  # deck id -> card ids
+        self._deck_of: Dict[Hashable, Hashable] = {}
+
+    @classmethod
+    def from_columns(cls, card_ids: Iterable, deck_ids: Iterable, tags: Iterable[str]) -> "TagIndex":
+        index = cls()
+        for card_id, deck_id, text in zip(card_ids, deck_ids, tags):
+            index.add(card_id, deck_id, text)
+        return index
+
+    def __len__(self) -> int:
+        return len(self._cards)
+
+    def add(self, card_id: Hashable, deck_id: Hashable, tags: str):
+        """Index a card, replacing what was indexed for it before."""
+        self.remove(card_id)
+        normalized = []
+        for tag in split_tags(tags if isinstance(tags, str) else ""):
+            key = normalize_tag(tag)
+            if key not in self._cards:
+                self._cards[key] = set()
+                self._names.setdefault(key, tag)
+            self._cards[key].add(card_id)
+            normalized.append(key)
+        self._card_tags[card_id] = tuple(normalized)
+        self._decks.setdefault(deck_id, set()).add(card_id)
+        self._deck_of[card_id] = deck_id
+
+    def remove(self, card_id: Hashable):
+        for key in self._card_tags.pop(card_id, ()):
+            ids = self._cards[key]
+            ids.discard(card_id)
+            if not ids:
+                del self._cards[key]
+        if card_id in self._deck_of:
+            self._decks[self._deck_of.pop(card_id)].discard(card_id)
+
+    def remove_deck(self, deck_id: Hashable):
+        for card_id in list(self._decks.get(deck_id, ())):
+            self.remove(card_id)
+        self._decks.pop(deck_id, None)
+
+    def counts(self, deck_id: Hashable | None = None) -> Dict[str, int]:
+        """Cards per tag (by first-seen spelling) in the deck or the whole collection."""
+        scope = self._decks.get(deck_id, set()) if deck_id is not None else None
+        counts = {
+            self._names[key]: len(ids) if scope is None else len(ids & scope)
+            for key, ids in self._cards.items()
+        }
+        return {name: n for name, n in sorted(counts.items(), key=lambda item: item[0].casefold()) if n}
+
+    def select(self, expression: str, deck_id: Hashable | None = None) -> Set[Hashable]:
+        """Ids of the cards in the deck (or collection) matching a parse_tag_filter expression."""
+        scope = self._decks.get(deck_id, set()) if deck_id is not None else self._deck_of.keys()
+        selected: Set[Hashable] = set()
+        for clause in parse_tag_filter(expression):
+            wanted = sorted((self._cards.get(key, set()) for key, negated in clause if not negated), key=len)
+            ids = set(wanted[0] if wanted else scope).intersection(*wanted[1:])
+            if wanted and deck_id is not None:
+                ids &= scope
+            for key, negated in clause:
+                if negated:
+                    ids -= self._cards.get(key, set())
+            selected |= ids
+        return selected
+
+
+_HASH_PRIME = (1 << 31) - 1
+_HASH_A, _HASH_B = np.random.default_rng(0).integers(1, _HASH_PRIME, size=(2, LSH_BANDS * LSH_ROWS, 1), dtype=np.uint64)
+# Folds a band's ROWS minhashes into one bucket key
+_BAND_MIX = np.random.default_rng(1).integers(1, 1 << 63, size=LSH_ROWS, dtype=np.uint64) | np.uint64(1)
+
+
+def minhash(texts: Sequence[str], batch: int = 5_000) -> np.ndarray:
+    """MinHash signatures of the texts' character bigrams, shape (len(texts), BANDS * ROWS).
+
+    Texts are padded with a space on either side, so "" still has a bigram.
+    """
+    signatures = np.empty((len(texts), LSH_BANDS * LSH_ROWS), dtype=np.uint64)
+    for start in range(0, len(texts), batch):
+        padded = [f" {text} " for text in texts[start:start + batch]]
+        codes = np.frombuffer("".join(padded).encode("utf-32-le"), dtype=np.uint32).astype(np.uint64)
+        bigrams = (codes[:-1] * 0x110000 + codes[1:]) % _HASH_PRIME
+        lengths = np.array([len(p) for p in padded])
+        # drop the pairs that straddle two texts
+        keep = np.ones(len(bigrams), dtype=bool)
+        keep[np.cumsum(lengths)[:-1] - 1] = False
+        bigrams = bigrams[keep]
+        offsets = np.concatenate([[0], np.cumsum(lengths - 1)[:-1]])
+        permuted = (_HASH_A * bigrams + _HASH_B) % _HASH_PRIME
+        signatures[start:start + len(padded)] = np.minimum.reduceat(permuted, offsets, axis=1).T
+    return signatures
+
+
+def band_keys(signatures: np.ndarray) -> np.ndarray:
+    """One bucket key per band, shape (len(signatures), BANDS)."""
+    rows = signatures.reshape(len(signatures), LSH_BANDS, LSH_ROWS)
+    return (rows * _BAND_MIX).sum(axis=2)  # wraps around, as a hash should
+
+
+class ConfusableIndex:
+    """Nearest-neighbour index of strings by spelling, for look-alike quiz options.
+
+    Each string's character bigrams get a MinHash signature that is cut into
+    LSH_BANDS bands; strings with an identical band share a bucket. A query
+    only looks at its own buckets, keeps the LSH_CANDIDATES strings it shares
+    the most buckets with and re-ranks those with rapidfuzz, so its cost does
+    not grow with the number of strings.
+
+    Buckets are kept per band as a sorted key array with the matching
+    positions. Strings added later go to a small unsorted tail that is
+    merged in once it grows past MERGE_AT.
+    """
+
+    MERGE_AT = 1_024
+
+    def __init__(self, texts: Iterable[str] = ()):
+        self.texts: List[str] = []
+        self._keys: List[str] = []
+        self._bucket_keys = np.empty((LSH_BANDS, 0), dtype=np.uint64)
+        self._bucket_positions = np.empty((LSH_BANDS, 0), dtype=np.int64)
+        self._tail_keys = np.empty((0, LSH_BANDS), dtype=np.uint64)
+        self.add(texts)
+
+    def __len__(self) -> int:
+        return len(self.texts)
+
+    def add(self, texts: Iterable[str]):
+        texts = list(texts)
+        keys = [normalize_text(text) for text in texts]
+        self.texts += texts
+        self._keys += keys
+        self._tail_keys = np.concatenate([self._tail_keys, band_keys(minhash(keys))])
+        if len(self._tail_keys) >= self.MERGE_AT:
+            self._merge_tail()
+
+    def _merge_tail(self):
+        start = len(self.texts) - len(self._tail_keys)
+        keys = np.concatenate([self._bucket_keys, self._tail_keys.T], axis=1)
+        positions = np.concatenate(
+            [self._bucket_positions, np.broadcast_to(np.arange(start, len(self.texts)), (LSH_BANDS, len(self._tail_keys)))],
+            axis=1,
+        )
+        order = np.argsort(keys, axis=1, kind="stable")
+        self._bucket_keys = np.take_along_axis(keys, order, axis=1)
+        self._bucket_positions = np.take_along_axis(positions, order, axis=1)
+        self._tail_keys = self._tail_keys[:0]
+
+    def _bucket_mates(self, query_keys: np.ndarray) -> np.ndarray:
+        """Positions sharing a bucket with the query, once per shared band."""
+        found = []
+        for band, key in enumerate(query_keys):
+            keys = self._bucket_keys[band]
+            lo, hi = np.searchsorted(keys, key, "left"), np.searchsorted(keys, key, "right")
+            found.append(self._bucket_positions[band, lo:hi])
+        tail_rows, _ = np.nonzero(self._tail_keys == query_keys)
+        found.append(tail_rows + len(self.texts) - len(self._tail_keys))
+        return np.concatenate(found)
+
+    def similar(self, text: str, k: int = 3, exclude: Iterable[str] = ()) -> List[str]:
+        """Up to `k` distinct strings spelled most like `text`, never `text` itself."""
+        key = normalize_text(text)
+        positions, shared = np.unique(self._bucket_mates(band_keys(minhash([key]))[0]), return_counts=True)
+        top = positions[np.argsort(-shared, kind="stable")[:LSH_CANDIDATES]].tolist()
+        candidates = [self._keys[i] for i in top]
+        seen = {key, *map(normalize_text, exclude)}
+        found: List[str] = []
+        for _, _, j in process.extract(key, candidates, scorer=fuzz.ratio, limit=None):
+            if candidates[j] not in seen:
+                seen.add(candidates[j])
+                found.append(self.texts[top[j]])
+                if len(found) == k:
+                    break
+        return found
+
+
+class AnswerPool:
+    """A deck's answers (`de` and `en`) as arrays, for drawing quiz distractors.
+
+    Random distractors are drawn by position with rejection, so a draw costs
+    O(k) however large the deck is. Look-alike distractors come from a
+    ConfusableIndex per side, built on first use and extended by `add`.
+    """
+
+    def __init__(self, card_ids: Sequence, de: Sequence[str], en: Sequence[str]):
+        self.card_ids = list(card_ids)
+        self.answers = {"de": list(de), "en": list(en)}
+        self._confusables: Dict[str, ConfusableIndex] = {}
+
+    def __len__(self) -> int:
+        return len(self.card_ids)
+
+    def add(self, card_ids: Sequence, de: Sequence[str], en: Sequence[str]):
+        """Append new cards of the deck."""
+        self.card_ids += card_ids
+        for side, answers in (("de", de), ("en", en)):
+            self.answers[side] += answers
+            if side in self._confusables:
+                self._confusables[side].add(answers)
+
+    def distractors(
+        self, correct: str, side: str = "en", k: int = 3, rng: random.Random | None = None, exclude: Iterable[str] = ()
+    ) -> List[str]:
+        """Up to `k` distinct answers from the `side` column, none equal to `correct` or in `exclude`."""
+        answers = self.answers[side]
+        rng = rng or random
+        seen = {correct, *exclude}
+        picked: List[str] = []
+        if answers:
+            # A deck with only a handful of distinct answers runs out of attempts
+            for _ in range(4 * k + 16):
+                answer = answers[rng.randrange(len(answers))]
+                if answer not in seen:
+                    seen.add(answer)
+                    picked.append(answer)
+                    if len(picked) == k:
+                        return picked
+        rest = [a for a in dict.fromkeys(answers) if a not in seen]
+        return picked + rng.sample(rest, min(k - len(picked), len(rest)))
+
+    def confusables(self, correct: str, side: str = "en", k: int = 3, rng: random.Random | None = None) -> List[str]:
+        """Up to `k` answers spelled like `correct`, topped up with random ones."""
+        index = self._confusables.get(side)
+        if index is None:
+            index = self._confusables[side] = ConfusableIndex(self.answers[side])
+        picked = index.similar(correct, k)
+        if len(picked) < k:
+            picked += self.distractors(correct, side, k - len(picked), rng, exclude=picked)
+        return picked
+
+
+class AnswerPools:
+    """Per-deck AnswerPool cache.
+
+    Stores `add` new cards to a cached pool and invalidate the deck when one
+    of its cards is edited or deleted.
+    """
+
+    def __init__(self, build: Callable[[Hashable], AnswerPool]):
+        self._build = build
+        self._pools: Dict[Hashable, AnswerPool] = {}
+
+    def get(self, deck_id) -> AnswerPool:
+        pool = self._pools.get(deck_id)
+        if pool is None:
+            pool = self._pools[deck_id] = self._build(deck_id)
+        return pool
+
+    def add(self, deck_id, card_ids: Sequence, de: Sequence[str], en: Sequence[str]):
+        pool = self._pools.get(deck_id)
+        if pool is not None:
+            pool.add(list(card_ids), list(de), list(en))
+
+    def invalidate(self, *deck_ids):
+        """Drop the given decks' pools, or every pool when called without arguments."""
+        if not deck_ids:
+            self._pools.clear()
+        for deck_id in deck_ids:
+            self._pools.pop(deck_id, None)
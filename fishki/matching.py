@@ -0,0 +1,80 @@
+"""Tolerant grading of typed answers.
+
+Answers and responses are folded the same way: lowercase, ä/ö/ü/ß spelled
+out as ae/oe/ue/ss, punctuation dropped. A card's answer then expands into
+variants: each comma/semicolon/slash-separated alternative, with and without
+parenthesized parts, and with and without leading articles, "to" and
+reflexive "sich". A response is folded as one string, with and without its
+leading words, and scored against all variants at once.
+"""
+from __future__ import annotations
+import functools
+import re
+from typing import Tuple
+
+from rapidfuzz import fuzz, process
+
+# Words a response may leave out (or add) at the start of an answer
+LEADING_WORDS = frozenset(
+    ("der", "die", "das", "den", "dem", "des", "ein", "eine", "einen", "einem", "einer", "eines", "sich",
+     "the", "a", "an", "to")
+)
+
+_SPELLED_OUT = str.maketrans({"ä": "ae", "ö": "oe", "ü": "ue", "ß": "ss"})
+_PUNCTUATION = re.compile(r"[^\w\s]")
+_PARENTHESIZED = re.compile(r"\([^)]*\)")
+_ALTERNATIVES = re.compile(r"[,;/]")
+
+def spell_out(text: str) -> str:
+    """Lowercase with umlauts and ß spelled out."""
+    return (text or "").lower().translate(_SPELLED_OUT)
+
+def fold(text: str) -> str:
+    """Lowercase, umlauts and ß spelled out, punctuation removed, whitespace collapsed."""
+    return " ".join(_PUNCTUATION.sub(" ", spell_out(text)).split())
+
+def strip_leading_words(folded: str) -> str:
+    """Drop leading LEADING_WORDS, keeping at least one word."""
+    words = folded.split()
+    while len(words) > 1 and words[0] in LEADING_WORDS:
+        del words[0]
+    return " ".join(words)
+
+def variants(text: str) -> Tuple[str, ...]:
+    """Every folded form of `text` that should count as the same answer."""
+    forms = {}
+    for alternative in [text, *_ALTERNATIVES.split(text or "")]:
+        for form in (_PARENTHESIZED.sub(" ", alternative), alternative):
+            folded = fold(form)
+            if folded:
+                forms[folded] = None
+                forms[strip_leading_words(folded)] = None
+    return tuple(forms)
+
+class AnswerMatcher:
+    """An answer's variants, normalized once and scored against responses with rapidfuzz."""
+    __slots__ = ("answer", "variants")
+
+    def __init__(self, answer: str):
+        self.answer = answer
+        self.variants = variants(answer)
+
+    def score(self, response: str) -> float:
+        """Best fuzz.ratio (0-100) between the response, with and without leading words, and any variant.
+
+        Only the answer is split into alternatives: a response listing several
+        guesses is scored as one string.
+        """
+        folded = fold(response)
+        if not folded or not self.variants:
+            return 0.0
+        responses = list(dict.fromkeys((folded, strip_leading_words(folded))))
+        return float(process.cdist(responses, self.variants, scorer=fuzz.ratio).max())
+
+    def matches(self, response: str, threshold: int = 85) -> bool:
+        return self.score(response) >= threshold
+
+@functools.lru_cache(maxsize=4096)
+def answer_matcher(answer: str) -> AnswerMatcher:
+    """The cached matcher for an answer, so reruns don't normalize it again."""
+    return AnswerMatcher(answer)
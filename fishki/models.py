@@ -0,0 +1,158 @@
+"""Record types for cards, decks and saved words.
+
+The classes use __slots__, so an instance is a fixed block of attribute
+references with no per-object __dict__; building a queue of thousands of
+cards costs a fraction of the equivalent dicts. Fields are declared in the
+column order of the stores' tables, which lets `from_columns` and
+`from_rows` build records positionally from columnar data or query rows.
+"""
+from __future__ import annotations
+from typing import Any, Dict, Iterable, Mapping, Sequence
+
+# Scheduling state of a card that has never been reviewed
+SCHEDULE_DEFAULTS = {"box": 1, "ease": 2.5, "interval_days": 1, "reps": 0, "lapses": 0}
+
+def _missing(value) -> bool:
+    # None, NaN (never equal to itself) and blank strings
+    return value is None or value != value or value == ""
+
+def to_int(value, default: int) -> int:
+    """int(value), or `default` when the value is missing or zero."""
+    return int(float(value)) if not _missing(value) and value != 0 else default
+
+def to_float(value, default: float) -> float:
+    """float(value), or `default` when the value is missing or zero."""
+    return float(value) if not _missing(value) and value != 0 else default
+
+def _text(value) -> str:
+    return "" if _missing(value) else value
+
+def _date(value):
+    return None if _missing(value) else value
+
+class Record:
+    """Base of the record types: conversions to and from store rows."""
+    __slots__ = ()
+    FIELDS: tuple = ()
+    ID_ARG = "id"  # __init__ parameter that takes the "id" field
+
+    @classmethod
+    def from_record(cls, record: Mapping[str, Any]):
+        return cls(**{cls.ID_ARG if name == "id" else name: record[name] for name in cls.FIELDS if name in record})
+
+    @classmethod
+    def from_records(cls, records: Iterable[Mapping[str, Any]]) -> list:
+        return [cls.from_record(record) for record in records]
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[Sequence]) -> list:
+        """Records from rows whose values are in FIELDS order (e.g. SELECT * on the table)."""
+        return [cls(*row) for row in rows]
+
+    @classmethod
+    def from_columns(cls, columns: Mapping[str, Sequence]) -> list:
+        """Records from a mapping of column name -> values (see data_store.frame_columns)."""
+        return cls.from_rows(zip(*(columns[name] for name in cls.FIELDS)))
+
+    def to_record(self) -> Dict[str, Any]:
+        return {name: getattr(self, name) for name in self.FIELDS}
+
+    def __eq__(self, other):
+        if type(other) is not type(self):
+            return NotImplemented
+        return all(getattr(self, name) == getattr(other, name) for name in self.FIELDS)
+
+    def __repr__(self):
+        fields = ", ".join(f"{name}={getattr(self, name)!r}" for name in self.FIELDS)
+        return f"{type(self).__name__}({fields})"
+
+class Card(Record):
+    FIELDS = (
+        "id", "deck_id", "de", "en", "example", "tags", "notes",
+        "box", "ease", "interval_days", "reps", "lapses",
+        "due_date", "created_at", "updated_at",
+    )
+    __slots__ = FIELDS
+    ID_ARG = "card_id"
+
+    def __init__(
+        self,
+        card_id=None,
+        deck_id=None,
+        de: str = "",
+        en: str = "",
+        example: str = "",
+        tags: str = "",
+        notes: str = "",
+        box: int = 1,
+        ease: float = 2.5,
+        interval_days: int = 1,
+        reps: int = 0,
+        lapses: int = 0,
+        due_date=None,
+        created_at=None,
+        updated_at=None,
+    ):
+        self.id = card_id
+        self.deck_id = deck_id
+        self.de = _text(de)
+        self.en = _text(en)
+        self.example = _text(example)
+        self.tags = _text(tags)
+        self.notes = _text(notes)
+        self.box = to_int(box, 1)
+        self.ease = to_float(ease, 2.5)
+        self.interval_days = to_int(interval_days, 1)
+        self.reps = to_int(reps, 0)
+        self.lapses = to_int(lapses, 0)
+        self.due_date = _date(due_date)
+        self.created_at = _date(created_at)
+        self.updated_at = _date(updated_at)
+
+    def schedule(self) -> Dict[str, Any]:
+        """The card's SRS fields in stored form, for store.update_card."""
+        due_date = self.due_date
+        return {
+            "box": self.box,
+            "ease": self.ease,
+            "interval_days": self.interval_days,
+            "reps": self.reps,
+            "lapses": self.lapses,
+            "due_date": due_date if due_date is None or isinstance(due_date, str) else due_date.isoformat(),
+        }
+
+class Deck(Record):
+    FIELDS = ("id", "name", "description", "created_at")
+    __slots__ = FIELDS
+    ID_ARG = "deck_id"
+
+    def __init__(self, deck_id=None, name: str = "", description: str = "", created_at=None):
+        self.id = deck_id
+        self.name = _text(name)
+        self.description = _text(description)
+        self.created_at = _date(created_at)
+
+class SavedWord(Record):
+    FIELDS = ("id", "german", "english", "context", "notes", "source", "created_at", "reviewed")
+    __slots__ = FIELDS
+    ID_ARG = "word_id"
+
+    def __init__(
+        self,
+        word_id=None,
+        german: str = "",
+        english: str = "",
+        context: str = "",
+        notes: str = "",
+        source: str = "Manual",
+        created_at=None,
+        reviewed: bool = False,
+    ):
+        self.id = word_id
+        self.german = _text(german)
+        self.english = _text(english)
+        self.context = _text(context)
+        self.notes = _text(notes)
+        self.source = _text(source) or "Manual"
+        self.created_at = _date(created_at)
+        self.reviewed = bool(reviewed) if not _missing(reviewed) else False
@@ -0,0 +1,190 @@
+"""Fit the scheduler's parameters to the learner's own review history.
+
+Each card's logged reviews are replayed through next_schedule with candidate
+parameters. After every review the interval the scheduler picks is taken as
+its estimate of when recall drops to TARGET_RECALL, which predicts recall at
+the next logged review as TARGET_RECALL ** (days elapsed / interval). The
+fit minimizes the squared error between that prediction and whether the
+card was actually recalled (grade above Again).
+
+Run from the project root to fit and save the profile:
+
+    python -m fishki.optimizer
+"""
+from __future__ import annotations
+import argparse
+import multiprocessing
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, NamedTuple, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from fishki.srs import DEFAULT_PARAMS, SchedulerParams, next_schedule_arrays
+
+# Recall the scheduler's intervals are assumed to aim for
+TARGET_RECALL = 0.9
+
+# Too little history gives a fit that is mostly noise
+MIN_REVIEWS = 100
+
+# (low, high) search range of each parameter
+BOUNDS = {
+    "again_ease": (-0.5, 0.0),
+    "hard_ease": (-0.4, 0.0),
+    "easy_ease": (0.0, 0.4),
+    "hard_factor": (1.0, 2.0),
+    "easy_bonus": (0.0, 1.0),
+    "min_ease": (1.1, 2.0),
+    "max_ease": (2.5, 4.0),
+}
+
+class History(NamedTuple):
+    """Review log arranged in rounds: round k holds every card's k-th review."""
+    first_interval: np.ndarray  # interval each card had before its first logged review
+    rounds: List[Tuple[np.ndarray, np.ndarray, np.ndarray]]  # (card index, grade, days since previous review)
+
+    @property
+    def scored_reviews(self) -> int:
+        return sum(len(cards) for cards, _, _ in self.rounds[1:])
+
+class FitResult(NamedTuple):
+    params: SchedulerParams
+    error: float
+    default_error: float
+    reviews: int
+
+def build_history(reviews: pd.DataFrame) -> History:
+    """Arrange review log rows (card_id, reviewed_at, grade, prev_interval) into rounds."""
+    reviews = reviews.assign(reviewed_at=pd.to_datetime(reviews["reviewed_at"], format="ISO8601"))
+    reviews = reviews.sort_values(["card_id", "reviewed_at"], kind="stable")
+    card = pd.factorize(reviews["card_id"])[0]
+    occurrence = reviews.groupby(card).cumcount().to_numpy()
+    elapsed = reviews.groupby(card)["reviewed_at"].diff().dt.total_seconds().fillna(0).to_numpy() / 86400
+    grades = reviews["grade"].to_numpy(dtype=np.int64)
+
+    first = occurrence == 0
+    first_interval = np.ones(card.max() + 1 if len(card) else 0, dtype=np.int64)
+    first_interval[card[first]] = np.maximum(1, reviews["prev_interval"].to_numpy(dtype=np.int64)[first])
+    rounds = []
+    for k in range(occurrence.max() + 1 if len(occurrence) else 0):
+        in_round = occurrence == k
+        rounds.append((card[in_round], grades[in_round], elapsed[in_round]))
+    return History(first_interval, rounds)
+
+def recall_error(params: SchedulerParams, history: History) -> float:
+    """Mean squared error between predicted and observed recall over the history."""
+    n = len(history.first_interval)
+    ease = np.full(n, 2.5)
+    interval = history.first_interval.copy()
+    box = np.ones(n, dtype=np.int64)
+    error, scored = 0.0, 0
+    for k, (cards, grades, elapsed) in enumerate(history.rounds):
+        if k:
+            predicted = TARGET_RECALL ** (elapsed / interval[cards])
+            error += float(np.sum((predicted - (grades > 1)) ** 2))
+            scored += len(cards)
+        ease[cards], interval[cards], box[cards] = next_schedule_arrays(
+            ease[cards], interval[cards], box[cards], grades, params
+        )
+    return error / scored if scored else 0.0
+
+_worker_history: History | None = None
+
+def _init_worker(history: History):
+    # Ship the history to each worker once rather than with every candidate
+    global _worker_history
+    _worker_history = history
+
+def _score(candidates: Sequence[SchedulerParams]) -> List[float]:
+    return [recall_error(params, _worker_history) for params in candidates]
+
+def _bounds() -> tuple[np.ndarray, np.ndarray]:
+    low, high = np.array([BOUNDS[name] for name in SchedulerParams._fields]).T
+    return low, high
+
+def _clip(values: np.ndarray) -> SchedulerParams:
+    values = np.clip(values, *_bounds())
+    return SchedulerParams(*map(float, np.round(values, 4)))
+
+def fit(
+    history: History,
+    start: SchedulerParams = DEFAULT_PARAMS,
+    generations: int = 12,
+    population: int = 32,
+    workers: int | None = None,
+    seed: int = 0,
+) -> FitResult:
+    """Random search around the best parameters found so far, shrinking the step each generation.
+
+    Candidates are scored in a process pool (`workers=1` scores in-process).
+    """
+    rng = np.random.default_rng(seed)
+    low, high = _bounds()
+    best = np.array(start, dtype=np.float64)
+    default_error = recall_error(DEFAULT_PARAMS, history)
+    best_error = recall_error(_clip(best), history)
+    scale = (high - low) / 4
+
+    pool = None
+    if workers == 1:
+        _init_worker(history)
+        n_batches = 1
+    else:
+        # spawn rather than fork: the Streamlit server that may call this is multi-threaded
+        pool = ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(history,),
+        )
+        n_batches = workers or os.cpu_count() or 1
+    try:
+        for _ in range(generations):
+            candidates = [_clip(best + rng.normal(0, scale)) for _ in range(population)]
+            batches = [candidates[i::n_batches] for i in range(n_batches)]
+            scores = np.empty(len(candidates))
+            for i, batch_scores in enumerate(map(_score, batches) if pool is None else pool.map(_score, batches)):
+                scores[i::n_batches] = batch_scores
+            i = int(np.argmin(scores))
+            if scores[i] < best_error:
+                best, best_error = np.array(candidates[i]), float(scores[i])
+            scale = scale * 0.7
+    finally:
+        if pool is not None:
+            pool.shutdown()
+    return FitResult(_clip(best), best_error, default_error, history.scored_reviews)
+
+def fit_store(store, **kwargs) -> FitResult | None:
+    """Fit parameters to a store's review log; None when there is too little history."""
+    reviews = [rows[["card_id", "reviewed_at", "grade", "prev_interval"]] for rows in store.iter_reviews()]
+    if not reviews:
+        return None
+    history = build_history(pd.concat(reviews, ignore_index=True))
+    if history.scored_reviews < MIN_REVIEWS:
+        return None
+    return fit(history, **kwargs)
+
+if __name__ == "__main__":
+    from fishki import data_store, srs
+
+    parser = argparse.ArgumentParser(description="Fit the scheduler to your review history and save the profile.")
+    parser.add_argument("--generations", type=int, default=12)
+    parser.add_argument("--population", type=int, default=32)
+    parser.add_argument("--workers", type=int, default=None, help="processes to use (default: one per CPU)")
+    parser.add_argument("--dry-run", action="store_true", help="report the fit without saving it")
+    args = parser.parse_args()
+
+    result = fit_store(
+        data_store.create_store(), generations=args.generations, population=args.population, workers=args.workers
+    )
+    if result is None:
+        raise SystemExit(f"Not enough review history yet: at least {MIN_REVIEWS} repeat reviews are needed.")
+    sys.stdout.write(f"Fitted on {result.reviews} reviews: error {result.default_error:.4f} (defaults) -> {result.error:.4f}\n")
+    for name, value in result.params._asdict().items():
+        sys.stdout.write(f"  {name} = {value}\n")
+    if not args.dry_run:
+        srs.save_params(result.params)
+        sys.stdout.write(f"Saved to {srs.PARAMS_FILE}\n")
@@ -0,0 +1,85 @@
+"""One review session over the due cards of many decks.
+
+Each deck contributes a stream of (due date, card id) pairs, most overdue
+first (store.due_stream). ReviewQueue keeps only the head of every stream
+in a heap, so the next card is the most overdue one across all decks and
+at most one card per deck is read ahead: a session over 40 decks starts
+after 40 small reads instead of a scan of every due card.
+"""
+from __future__ import annotations
+import heapq
+import itertools
+from datetime import date
+from typing import Dict, Hashable, Iterable, Iterator, List, Mapping, Tuple
+
+
+class ReviewQueue:
+    """Lazy k-way merge of per-deck due streams.
+
+    With `interleave` the decks take turns: every deck's n-th card comes
+    before any deck's (n+1)-th, and overdueness orders each round. A deck
+    stops contributing once `daily_cap` of its cards were reviewed today,
+    counting the `reviewed_today` reviews done before the session started.
+    """
+
+    def __init__(
+        self,
+        streams: Mapping[Hashable, Iterable[Tuple[str, Hashable]]],
+        interleave: bool = False,
+        daily_cap: int | None = None,
+        reviewed_today: Mapping[Hashable, int] | None = None,
+    ):
+        self.interleave = interleave
+        self.daily_cap = daily_cap
+        self.taken: Dict[Hashable, int] = dict(reviewed_today or {})  # deck -> cards reviewed today
+        self.served = 0
+        self._heap: List[tuple] = []
+        self._order = itertools.count()  # keeps equal keys first-in, first-out
+        for deck_id, stream in streams.items():
+            self._push(deck_id, iter(stream), 0)
+
+    def _push(self, deck_id: Hashable, stream: Iterator[Tuple[str, Hashable]], turn: int):
+        if self.daily_cap is not None and self.taken.get(deck_id, 0) >= self.daily_cap:
+            return
+        item = next(stream, None)
+        if item is None:
+            return
+        due, card_id = item
+        heapq.heappush(self._heap, (turn if self.interleave else 0, due, next(self._order), deck_id, card_id, stream))
+
+    def __iter__(self) -> "ReviewQueue":
+        return self
+
+    def __next__(self) -> Hashable:
+        """Id of the next card to review."""
+        if not self._heap:
+            raise StopIteration
+        turn, _, _, deck_id, card_id, stream = heapq.heappop(self._heap)
+        self.taken[deck_id] = self.taken.get(deck_id, 0) + 1
+        self.served += 1
+        self._push(deck_id, stream, turn + 1)
+        return card_id
+
+    def __bool__(self) -> bool:
+        return bool(self._heap)
+
+
+def review_all_decks(
+    store,
+    deck_ids: Iterable[Hashable],
+    tags: str | None = None,
+    interleave: bool = False,
+    daily_cap: int | None = None,
+) -> ReviewQueue:
+    """A ReviewQueue over the decks' due cards, optionally narrowed by a tag filter.
+
+    With a `daily_cap`, the reviews each deck already had today are read
+    from store.review_summary.
+    """
+    reviewed_today = {}
+    if daily_cap:
+        decks = store.review_summary(since=date.today().isoformat())["decks"]
+        reviews = dict(zip(decks["deck_id"], decks["reviews"]))
+        reviewed_today = {deck_id: int(reviews.get(str(deck_id), 0)) for deck_id in deck_ids}
+    streams = {deck_id: store.due_stream(deck_id, tags=tags) for deck_id in deck_ids}
+    return ReviewQueue(streams, interleave, daily_cap or None, reviewed_today)
@@ -0,0 +1,138 @@
+"""Full-text search over cards and saved words.
+
+An inverted index maps every token (text folded with fishki.matching, so
+"Straße" and "strasse" are the same token) to the documents that contain
+it. Query tokens are matched as prefixes through a sorted vocabulary, so a
+search touches the postings of the matching tokens only, never the text
+columns. Stores keep the index up to date as cards and saved words change.
+"""
+from __future__ import annotations
+import bisect
+import heapq
+import re
+from typing import Dict, Hashable, Iterable, List, Mapping, NamedTuple, Tuple
+
+from fishki.matching import LEADING_WORDS, spell_out
+
+# Field weights: a hit on the word itself ranks above one in an example
+FIELD_WEIGHTS = {
+    "card": {"de": 3, "en": 3, "tags": 2, "example": 1, "notes": 1},
+    "saved_word": {"german": 3, "english": 3, "context": 1, "notes": 1},
+}
+# Columns shown for a hit
+TITLE_FIELDS = {"card": ("de", "en"), "saved_word": ("german", "english")}
+
+# Vocabulary tokens a single query prefix may expand to
+MAX_PREFIX_TOKENS = 500
+
+_TOKEN = re.compile(r"\w+")
+
+def tokenize(text: str) -> List[str]:
+    """Folded words, as fishki.matching.fold would split them."""
+    return _TOKEN.findall(spell_out(text))
+
+class SearchHit(NamedTuple):
+    kind: str  # "card" or "saved_word"
+    id: Hashable
+    deck_id: Hashable  # None for saved words
+    de: str
+    en: str
+    score: float
+
+class SearchIndex:
+    """Inverted index from folded tokens to (kind, id) documents."""
+
+    def __init__(self):
+        self._postings: Dict[str, Dict[tuple, int]] = {}  # token -> document -> weight
+        self._vocabulary: List[str] = []  # sorted tokens, for prefix lookups
+        self._documents: Dict[tuple, tuple] = {}  # document -> (deck_id, de, en, tokens)
+
+    @classmethod
+    def build(cls, cards: Iterable[Mapping], saved_words: Iterable[Mapping]) -> "SearchIndex":
+        index = cls()
+        index.update("card", cards)
+        index.update("saved_word", saved_words)
+        return index
+
+    def __len__(self) -> int:
+        return len(self._documents)
+
+    def update(self, kind: str, records: Iterable[Mapping] = (), removed_ids: Iterable = ()):
+        """Index new or edited records and drop removed ones."""
+        for record_id in removed_ids:
+            self._remove((kind, record_id))
+        weights = FIELD_WEIGHTS[kind]
+        title = TITLE_FIELDS[kind]
+        new_tokens = []
+        for record in records:
+            document = (kind, record["id"])
+            self._remove(document)
+            token_weights: Dict[str, int] = {}
+            for field, weight in weights.items():
+                for token in tokenize(record.get(field)):
+                    if weight > token_weights.get(token, 0):
+                        token_weights[token] = weight
+            for token, weight in token_weights.items():
+                postings = self._postings.get(token)
+                if postings is None:
+                    postings = self._postings[token] = {}
+                    new_tokens.append(token)
+                postings[document] = weight
+            self._documents[document] = (
+                record.get("deck_id"), record[title[0]], record[title[1]], tuple(token_weights)
+            )
+        if len(new_tokens) > 100:
+            self._vocabulary = sorted(self._vocabulary + new_tokens)
+        else:
+            for token in new_tokens:
+                bisect.insort(self._vocabulary, token)
+
+    def remove_deck(self, deck_id):
+        for document in [d for d, (deck, *_) in self._documents.items() if d[0] == "card" and deck == deck_id]:
+            self._remove(document)
+
+    def _remove(self, document: tuple):
+        entry = self._documents.pop(document, None)
+        if entry is None:
+            return
+        for token in entry[3]:
+            postings = self._postings[token]
+            del postings[document]
+            if not postings:
+                del self._postings[token]
+                del self._vocabulary[bisect.bisect_left(self._vocabulary, token)]
+
+    def _matches(self, term: str) -> Dict[tuple, float]:
+        """Documents with a token starting with `term`; whole-token hits count double."""
+        matched: Dict[tuple, float] = {}
+        vocabulary = self._vocabulary
+        start = bisect.bisect_left(vocabulary, term)
+        for token in vocabulary[start:start + MAX_PREFIX_TOKENS]:
+            if not token.startswith(term):
+                break
+            boost = 2 if token == term else 1
+            for document, weight in self._postings[token].items():
+                if weight * boost > matched.get(document, 0):
+                    matched[document] = weight * boost
+        return matched
+
+    def search(self, query: str, limit: int = 50) -> List[SearchHit]:
+        """Documents matching every query token, best first."""
+        terms = list(dict.fromkeys(tokenize(query)))
+        # Articles and "to" would match half the collection
+        terms = [t for t in terms if t not in LEADING_WORDS] or terms
+        scores: Dict[tuple, float] | None = None
+        for term in terms:
+            matched = self._matches(term)
+            scores = matched if scores is None else {d: s + matched[d] for d, s in scores.items() if d in matched}
+            if not scores:
+                return []
+        if not scores:
+            return []
+        best: List[Tuple[tuple, float]] = heapq.nlargest(
+            limit, scores.items(), key=lambda item: (item[1], -len(self._documents[item[0]][1]))
+        )
+        return [
+            SearchHit(kind, record_id, *self._documents[(kind, record_id)][:3], score)
+            for (kind, record_id), score in best
+        ]
@@ -0,0 +1,584 @@
+from __future__ import annotations
+import itertools
+import json
+import sqlite3
+import sys
+import threading
+from datetime import date, datetime, timedelta
+from typing import Dict, Iterable, Iterator, List, Set, Tuple
+
+import numpy as np
+import pandas as pd
+
+from fishki import models, srs
+from fishki.analytics import REVIEW_FIELDS, ReviewRollups
+from fishki.indexes import AnswerPool, AnswerPools, TagIndex
+from fishki.search import FIELD_WEIGHTS, SearchHit, SearchIndex
+from fishki.data_store import (
+    EXPORT_BATCH_ROWS,
+    NEW_CARD_SCHEDULE,
+    Card,
+    Deck,
+    SavedWord,
+    apply_schema,
+    bulk_review_records,
+    frame_records,
+    review_record,
+)
+
+# Due cards read per query by due_stream
+DUE_STREAM_BATCH = 64
+
+# Mirrors the schema fishki.db ships with; the composite indexes and the
+# saved_word, review_log and review_rollup tables are additions for the
+# due/new queues, the Saved Words page and review analytics.
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS deck (
+    id INTEGER NOT NULL,
+    name VARCHAR NOT NULL,
+    description VARCHAR,
+    created_at DATETIME NOT NULL,
+    PRIMARY KEY (id),
+    UNIQUE (name)
+);
+CREATE TABLE IF NOT EXISTS card (
+    id INTEGER NOT NULL,
+    deck_id INTEGER NOT NULL,
+    de VARCHAR NOT NULL,
+    en VARCHAR NOT NULL,
+    example VARCHAR,
+    tags VARCHAR,
+    notes VARCHAR,
+    box INTEGER NOT NULL,
+    ease FLOAT NOT NULL,
+    interval_days INTEGER NOT NULL,
+    reps INTEGER NOT NULL,
+    lapses INTEGER NOT NULL,
+    due_date DATE,
+    created_at DATETIME NOT NULL,
+    updated_at DATETIME NOT NULL,
+    PRIMARY KEY (id),
+    FOREIGN KEY(deck_id) REFERENCES deck (id)
+);
+CREATE INDEX IF NOT EXISTS ix_card_due_date ON card (due_date);
+CREATE INDEX IF NOT EXISTS ix_card_box ON card (box);
+DROP INDEX IF EXISTS ix_card_tags; -- tags are looked up through fishki.indexes.TagIndex
+CREATE INDEX IF NOT EXISTS ix_card_deck_id ON card (deck_id);
+CREATE INDEX IF NOT EXISTS ix_card_deck_id_due_date ON card (deck_id, due_date);
+CREATE INDEX IF NOT EXISTS ix_card_deck_id_reps ON card (deck_id, reps);
+CREATE TABLE IF NOT EXISTS saved_word (
+    id INTEGER NOT NULL,
+    german VARCHAR NOT NULL,
+    english VARCHAR NOT NULL,
+    context VARCHAR,
+    notes VARCHAR,
+    source VARCHAR,
+    created_at DATETIME NOT NULL,
+    reviewed BOOLEAN NOT NULL,
+    PRIMARY KEY (id)
+);
+CREATE TABLE IF NOT EXISTS review_log (
+    id INTEGER NOT NULL,
+    card_id INTEGER NOT NULL,
+    deck_id INTEGER NOT NULL,
+    reviewed_at DATETIME NOT NULL,
+    grade INTEGER NOT NULL,
+    prev_interval INTEGER NOT NULL,
+    new_interval INTEGER NOT NULL,
+    latency_ms INTEGER,
+    PRIMARY KEY (id)
+);
+CREATE INDEX IF NOT EXISTS ix_review_log_card_id ON review_log (card_id);
+CREATE TABLE IF NOT EXISTS review_rollup (
+    id INTEGER NOT NULL CHECK (id = 1),
+    data TEXT NOT NULL,
+    PRIMARY KEY (id)
+);
+"""
+
+CARD_COLUMNS = [c for c in Card.__annotations__ if c != "id"]
+SAVED_WORD_COLUMNS = [c for c in SavedWord.__annotations__ if c != "id"]
+TABLE_NAMES = {"decks": "deck", "cards": "card", "saved_words": "saved_word"}
+INSERT_REVIEW = f"INSERT INTO review_log ({', '.join(REVIEW_FIELDS)}) VALUES ({', '.join('?' * len(REVIEW_FIELDS))})"
+INSERT_CARD = f"INSERT INTO card ({', '.join(CARD_COLUMNS)}) VALUES ({', '.join('?' * len(CARD_COLUMNS))})"
+INSERT_SAVED_WORD = (
+    f"INSERT INTO saved_word ({', '.join(SAVED_WORD_COLUMNS)}) VALUES ({', '.join('?' * len(SAVED_WORD_COLUMNS))})"
+)
+
+
+def _new_card_row(card_data: dict, today: str, now: str) -> tuple:
+    return (
+        card_data["deck_id"],
+        card_data["de"],
+        card_data["en"],
+        card_data.get("example", ""),
+        card_data.get("tags", ""),
+        card_data.get("notes", ""),
+        1,  # box
+        2.5,  # ease
+        1,  # interval_days
+        0,  # reps
+        0,  # lapses
+        today,
+        now,
+        now,
+    )
+
+
+def _new_saved_word_row(word_data: dict, now: str) -> tuple:
+    return (
+        word_data.get("german", ""),
+        word_data.get("english", ""),
+        word_data.get("context", ""),
+        word_data.get("notes", ""),
+        word_data.get("source", "Manual"),
+        now,
+        False,
+    )
+
+
+class SQLiteStore:
+    """SQLite storage engine: every read is an indexed query, every write a transaction."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute("PRAGMA foreign_keys=ON")
+        self.conn.executescript(SCHEMA)
+        # Streamlit reruns a session on different threads
+        self._lock = threading.Lock()
+        self._rollups: ReviewRollups | None = None
+        self._answer_pools = AnswerPools(self._build_answer_pool)
+        self._search: SearchIndex | None = None  # built by the first search
+        self._tag_index: TagIndex | None = None  # built by the first tag query
+
+    def _query(self, sql: str, params: tuple = ()) -> List[dict]:
+        with self._lock:
+            return [dict(row) for row in self.conn.execute(sql, params)]
+
+    def _write(self, sql: str, params: tuple = ()) -> int:
+        with self._lock, self.conn:
+            return self.conn.execute(sql, params).lastrowid
+
+    def get_decks(self) -> List[Deck]:
+        return self._query("SELECT * FROM deck ORDER BY id")
+
+    def get_cards(self, deck_id: int | None = None) -> List[Card]:
+        if deck_id:
+            return self._query("SELECT * FROM card WHERE deck_id = ?", (deck_id,))
+        return self._query("SELECT * FROM card")
+
+    def get_card(self, card_id: int) -> Card | None:
+        rows = self._query("SELECT * FROM card WHERE id = ?", (card_id,))
+        return rows[0] if rows else None
+
+    def get_due_cards(self, deck_id: int, days: int = 0) -> List[Card]:
+        return self._query(
+            "SELECT * FROM card WHERE deck_id = ? AND due_date <= ?",
+            (deck_id, (date.today() + timedelta(days=days)).isoformat()),
+        )
+
+    def due_counts(self, days: int, deck_id: int | None = None) -> Dict[str, int]:
+        today = date.today()
+        sql = "SELECT MAX(due_date, ?) AS day, COUNT(*) FROM card WHERE due_date < ?"
+        params = [today.isoformat(), (today + timedelta(days=days)).isoformat()]
+        if deck_id is not None:
+            sql += " AND deck_id = ?"
+            params.append(deck_id)
+        with self._lock:
+            return dict(self.conn.execute(sql + " GROUP BY day", params).fetchall())
+
+    def next_due_date(self, deck_id: int | None = None) -> str | None:
+        if deck_id is None:
+            rows = self._query("SELECT MIN(due_date) AS day FROM card")
+        else:
+            rows = self._query("SELECT MIN(due_date) AS day FROM card WHERE deck_id = ?", (deck_id,))
+        return rows[0]["day"]
+
+    def get_new_cards(self, deck_id: int) -> List[Card]:
+        return self._query("SELECT * FROM card WHERE deck_id = ? AND reps = 0", (deck_id,))
+
+    def _card_models(self, where: str, params: tuple) -> List[models.Card]:
+        # Rows go straight into the records, without a dict per row
+        sql = f"SELECT {', '.join(models.Card.FIELDS)} FROM card WHERE {where}"
+        with self._lock:
+            return models.Card.from_rows(self.conn.execute(sql, params))
+
+    def _queue(self, where: str, params: tuple, deck_id: int | None, tags: str | None) -> List[models.Card]:
+        if deck_id is not None:
+            where, params = f"deck_id = ? AND {where}", (deck_id, *params)
+        if tags:
+            # The tagged ids travel as one JSON parameter, however many there are
+            where += " AND id IN (SELECT value FROM json_each(?))"
+            params += (json.dumps(sorted(self.tagged_card_ids(tags, deck_id))),)
+        return self._card_models(where, params)
+
+    def due_queue(self, deck_id: int | None, days: int = 0, tags: str | None = None) -> List[models.Card]:
+        """get_due_cards as models.Card records.
+
+        `deck_id` None queues every deck; `tags` is a tag filter such as "verb AND A1".
+        """
+        return self._queue("due_date <= ?", ((date.today() + timedelta(days=days)).isoformat(),), deck_id, tags)
+
+    def new_queue(self, deck_id: int | None, tags: str | None = None) -> List[models.Card]:
+        """get_new_cards as models.Card records, narrowed like due_queue."""
+        return self._queue("reps = 0", (), deck_id, tags)
+
+    def due_stream(self, deck_id: int, days: int = 0, tags: str | None = None) -> Iterator[Tuple[str, int]]:
+        """(due date, card id) of the deck's due cards, most overdue first, read a batch at a time.
+
+        Batches continue after the last row read (keyset pagination on the
+        deck/due-date index), so a stream that is only partly consumed never
+        queries the rest of the deck.
+        """
+        where = "deck_id = ? AND due_date <= ? AND (due_date, id) > (?, ?)"
+        params = (deck_id, (date.today() + timedelta(days=days)).isoformat())
+        if tags:
+            where += " AND id IN (SELECT value FROM json_each(?))"
+            params += (json.dumps(sorted(self.tagged_card_ids(tags, deck_id))),)
+        last = ("", 0)
+        while True:
+            with self._lock:
+                rows = self.conn.execute(
+                    f"SELECT due_date, id FROM card WHERE {where} ORDER BY due_date, id LIMIT ?",
+                    (*params[:2], *last, *params[2:], DUE_STREAM_BATCH),
+                ).fetchall()
+            yield from map(tuple, rows)
+            if len(rows) < DUE_STREAM_BATCH:
+                return
+            last = tuple(rows[-1])
+
+    def _tags(self) -> TagIndex:
+        if self._tag_index is None:
+            with self._lock:
+                rows = self.conn.execute("SELECT id, deck_id, tags FROM card").fetchall()
+            self._tag_index = TagIndex.from_columns(*zip(*rows)) if rows else TagIndex()
+        return self._tag_index
+
+    def tag_counts(self, deck_id: int | None = None) -> Dict[str, int]:
+        """Cards per tag in the deck, or in the whole collection."""
+        return self._tags().counts(deck_id)
+
+    def tagged_card_ids(self, tags: str, deck_id: int | None = None) -> Set[int]:
+        """Ids of the cards matching a tag filter such as "verb AND A1"; raises ValueError on a malformed filter."""
+        return self._tags().select(tags, deck_id)
+
+    def cards_frame(self) -> pd.DataFrame:
+        with self._lock:
+            return apply_schema(pd.read_sql_query("SELECT * FROM card", self.conn), "cards")
+
+    def _build_answer_pool(self, deck_id: int) -> AnswerPool:
+        with self._lock:
+            rows = self.conn.execute("SELECT id, de, en FROM card WHERE deck_id = ?", (deck_id,)).fetchall()
+        return AnswerPool(*zip(*rows)) if rows else AnswerPool([], [], [])
+
+    def search(self, query: str, limit: int = 50) -> List[SearchHit]:
+        """Cards and saved words matching every word of the query (as prefixes), best first.
+
+        The index is kept in memory rather than in FTS5 so that both engines
+        fold umlauts and ß the same way.
+        """
+        if self._search is None:
+            self._search = SearchIndex.build(self.iter_rows("cards"), self.iter_rows("saved_words"))
+        return self._search.search(query, limit)
+
+    def _index_ids(self, kind: str, ids=(), removed_ids=()):
+        # Keeps a built search index in step with a table change
+        if self._search is None:
+            return
+        ids = list(ids)
+        table = "card" if kind == "card" else "saved_word"
+        rows = self._query(f"SELECT * FROM {table} WHERE id IN ({', '.join('?' * len(ids))})", tuple(ids)) if ids else []
+        self._search.update(kind, rows, removed_ids)
+
+    def answer_pool(self, deck_id: int) -> AnswerPool:
+        """The deck's quiz answers, kept until one of its cards is added, edited or deleted."""
+        return self._answer_pools.get(deck_id)
+
+    def iter_rows(self, table: str, deck_id: int | None = None) -> Iterator[dict]:
+        """Stream a table's rows in batches; `deck_id` narrows the cards table to one deck.
+
+        Reads go through their own connection, so a long export sees one
+        consistent snapshot without holding the store's lock.
+        """
+        sql, params = f"SELECT * FROM {TABLE_NAMES[table]}", ()
+        if deck_id is not None:
+            sql, params = sql + " WHERE deck_id = ?", (deck_id,)
+        conn = sqlite3.connect(self.path)
+        conn.row_factory = sqlite3.Row
+        try:
+            cursor = conn.execute(sql, params)
+            while rows := cursor.fetchmany(EXPORT_BATCH_ROWS):
+                for row in map(dict, rows):
+                    if table == "saved_words":
+                        row["reviewed"] = bool(row["reviewed"])
+                    yield row
+        finally:
+            conn.close()
+
+    def add_deck(self, name: str, description: str) -> int:
+        try:
+            return self._write(
+                "INSERT INTO deck (name, description, created_at) VALUES (?, ?, ?)",
+                (name, description, datetime.utcnow().isoformat()),
+            )
+        except sqlite3.IntegrityError as e:
+            raise ValueError(f"A deck named '{name}' already exists.") from e
+
+    def delete_deck(self, deck_id: int):
+        with self._lock, self.conn:
+            self.conn.execute("DELETE FROM card WHERE deck_id = ?", (deck_id,))
+            self.conn.execute("DELETE FROM deck WHERE id = ?", (deck_id,))
+        self._answer_pools.invalidate(deck_id)
+        if self._tag_index is not None:
+            self._tag_index.remove_deck(deck_id)
+        if self._search is not None:
+            self._search.remove_deck(deck_id)
+
+    def add_card(self, card_data: dict) -> int:
+        now = datetime.utcnow().isoformat()
+        card_id = self._write(INSERT_CARD, _new_card_row(card_data, date.today().isoformat(), now))
+        self._answer_pools.add(card_data["deck_id"], [card_id], [card_data["de"]], [card_data["en"]])
+        if self._tag_index is not None:
+            self._tag_index.add(card_id, card_data["deck_id"], card_data.get("tags", ""))
+        self._index_ids("card", [card_id])
+        return card_id
+
+    def add_cards(self, cards_data: Iterable[dict]) -> int:
+        today, now = date.today().isoformat(), datetime.utcnow().isoformat()
+        with self._lock, self.conn:
+            before = self.conn.total_changes
+            last_id = self.conn.execute("SELECT COALESCE(MAX(id), 0) FROM card").fetchone()[0]
+            self.conn.executemany(INSERT_CARD, (_new_card_row(c, today, now) for c in cards_data))
+            added = self.conn.total_changes - before
+            new = [dict(row) for row in self.conn.execute("SELECT * FROM card WHERE id > ? ORDER BY deck_id, id", (last_id,))]
+        for deck_id, rows in itertools.groupby(new, key=lambda row: row["deck_id"]):
+            rows = list(rows)
+            self._answer_pools.add(deck_id, [r["id"] for r in rows], [r["de"] for r in rows], [r["en"] for r in rows])
+        if self._tag_index is not None:
+            for row in new:
+                self._tag_index.add(row["id"], row["deck_id"], row["tags"])
+        if self._search is not None:
+            self._search.update("card", new)
+        return added
+
+    def update_card(self, card_id: int, updates: dict):
+        updates = {k: v for k, v in updates.items() if k in CARD_COLUMNS}
+        updates["updated_at"] = datetime.utcnow().isoformat()
+        assignments = ", ".join(f"{k} = ?" for k in updates)
+        self._write(f"UPDATE card SET {assignments} WHERE id = ?", (*updates.values(), card_id))
+        if updates.keys() & {"de", "en", "deck_id"}:
+            self._answer_pools.invalidate()
+        if self._tag_index is not None and updates.keys() & {"deck_id", "tags"}:
+            with self._lock:
+                row = self.conn.execute("SELECT deck_id, tags FROM card WHERE id = ?", (card_id,)).fetchone()
+            if row is not None:
+                self._tag_index.add(card_id, *row)
+        if updates.keys() & {"deck_id", *FIELD_WEIGHTS["card"]}:
+            self._index_ids("card", [card_id])
+
+    def delete_card(self, card_id: int):
+        self._write("DELETE FROM card WHERE id = ?", (card_id,))
+        self._answer_pools.invalidate()
+        if self._tag_index is not None:
+            self._tag_index.remove(card_id)
+        self._index_ids("card", removed_ids=[card_id])
+
+    def reset_deck(self, deck_id: int) -> int:
+        assignments = ", ".join(f"{k} = ?" for k in NEW_CARD_SCHEDULE)
+        with self._lock, self.conn:
+            return self.conn.execute(
+                f"UPDATE card SET {assignments}, due_date = ?, updated_at = ? WHERE deck_id = ?",
+                (*NEW_CARD_SCHEDULE.values(), date.today().isoformat(), datetime.utcnow().isoformat(), deck_id),
+            ).rowcount
+
+    def postpone_overdue(self, days: int, deck_id: int | None = None) -> int:
+        sql = "UPDATE card SET due_date = date(due_date, ?), updated_at = ? WHERE due_date < ?"
+        params = [f"{days:+d} days", datetime.utcnow().isoformat(), date.today().isoformat()]
+        if deck_id is not None:
+            sql += " AND deck_id = ?"
+            params.append(deck_id)
+        with self._lock, self.conn:
+            return self.conn.execute(sql, params).rowcount
+
+    def apply_reviews(self, card_ids: List[int], grades, days=None) -> int:
+        fields = ", ".join(srs.SCHEDULE_FIELDS)
+        with self._lock, self.conn:
+            cards = {}
+            unique_ids = list(dict.fromkeys(card_ids))
+            for start in range(0, len(unique_ids), 500):  # stay under SQLite's variable limit
+                chunk = unique_ids[start:start + 500]
+                cards.update(
+                    (row["id"], row)
+                    for row in self.conn.execute(
+                        f"SELECT id, deck_id, {fields}, due_date FROM card WHERE id IN ({', '.join('?' * len(chunk))})", chunk
+                    )
+                )
+            ids = list(cards)
+            positions = {card_id: i for i, card_id in enumerate(ids)}
+            known = [i for i, card_id in enumerate(card_ids) if card_id in positions]
+            stamped = days is not None
+            days = np.asarray(date.today() if days is None else days, dtype="datetime64[D]")
+            if days.ndim:
+                days = days[known]
+            grades = np.asarray(grades)[known]
+            intervals = np.empty((2, len(known)), dtype=np.int64)
+            state = srs.replay_reviews(
+                {field: [cards[card_id][field] for card_id in ids] for field in (*srs.SCHEDULE_FIELDS, "due_date")},
+                [positions[card_ids[i]] for i in known],
+                grades,
+                days,
+                intervals,
+            )
+            now = datetime.utcnow().isoformat()
+            self.conn.executemany(
+                f"UPDATE card SET {', '.join(f'{f} = ?' for f in srs.SCHEDULE_FIELDS)}, due_date = ?, updated_at = ? WHERE id = ?",
+                (
+                    (*(state[f][i].item() for f in srs.SCHEDULE_FIELDS), str(state["due_date"][i]), now, card_id)
+                    for i, card_id in enumerate(ids)
+                ),
+            )
+            reviewed = [card_ids[i] for i in known]
+            reviews = bulk_review_records(
+                reviewed, [cards[card_id]["deck_id"] for card_id in reviewed], grades, intervals, days if stamped else None
+            )
+            self.conn.executemany(INSERT_REVIEW, (tuple(record[k] for k in REVIEW_FIELDS) for record in reviews))
+            return len(known)
+
+    def get_saved_words(self, reviewed_only: bool = None) -> List[SavedWord]:
+        if reviewed_only is None:
+            rows = self._query("SELECT * FROM saved_word")
+        else:
+            rows = self._query("SELECT * FROM saved_word WHERE reviewed = ?", (bool(reviewed_only),))
+        for row in rows:
+            row["reviewed"] = bool(row["reviewed"])
+        return rows
+
+    def saved_words_frame(self) -> pd.DataFrame:
+        with self._lock:
+            return apply_schema(pd.read_sql_query("SELECT * FROM saved_word", self.conn), "saved_words")
+
+    def add_saved_word(self, word_data: dict) -> int:
+        word_id = self._write(INSERT_SAVED_WORD, _new_saved_word_row(word_data, datetime.utcnow().isoformat()))
+        self._index_ids("saved_word", [word_id])
+        return word_id
+
+    def add_saved_words(self, words_data: Iterable[dict]) -> int:
+        now = datetime.utcnow().isoformat()
+        with self._lock, self.conn:
+            before = self.conn.total_changes
+            last_id = self.conn.execute("SELECT COALESCE(MAX(id), 0) FROM saved_word").fetchone()[0]
+            self.conn.executemany(INSERT_SAVED_WORD, (_new_saved_word_row(w, now) for w in words_data))
+            added = self.conn.total_changes - before
+            if self._search is not None:
+                self._search.update("saved_word", map(dict, self.conn.execute("SELECT * FROM saved_word WHERE id > ?", (last_id,))))
+        return added
+
+    def update_saved_word(self, word_id: int, updates: dict):
+        updates = {k: v for k, v in updates.items() if k in SAVED_WORD_COLUMNS}
+        if not updates:
+            return
+        assignments = ", ".join(f"{k} = ?" for k in updates)
+        self._write(f"UPDATE saved_word SET {assignments} WHERE id = ?", (*updates.values(), word_id))
+        if updates.keys() & FIELD_WEIGHTS["saved_word"].keys():
+            self._index_ids("saved_word", [word_id])
+
+    def delete_saved_word(self, word_id: int):
+        self._write("DELETE FROM saved_word WHERE id = ?", (word_id,))
+        self._index_ids("saved_word", removed_ids=[word_id])
+
+    def mark_word_reviewed(self, word_id: int):
+        self.update_saved_word(word_id, {"reviewed": True})
+
+    def mark_words_reviewed(self, word_ids: Iterable[int]):
+        with self._lock, self.conn:
+            self.conn.executemany("UPDATE saved_word SET reviewed = 1 WHERE id = ?", ((i,) for i in word_ids))
+
+    def delete_saved_words(self, word_ids: Iterable[int]):
+        word_ids = list(word_ids)
+        with self._lock, self.conn:
+            self.conn.executemany("DELETE FROM saved_word WHERE id = ?", ((i,) for i in word_ids))
+        self._index_ids("saved_word", removed_ids=word_ids)
+
+    def log_review(self, card_id: int, deck_id: int, grade: int, prev_interval: int, new_interval: int, latency_ms: int | None = None):
+        record = review_record(card_id, deck_id, grade, prev_interval, new_interval, latency_ms)
+        self._write(INSERT_REVIEW, tuple(record[k] for k in REVIEW_FIELDS))
+
+    def iter_reviews(self) -> Iterator[pd.DataFrame]:
+        conn = sqlite3.connect(self.path)
+        try:
+            yield from pd.read_sql_query(
+                f"SELECT {', '.join(REVIEW_FIELDS)} FROM review_log ORDER BY id", conn, chunksize=EXPORT_BATCH_ROWS
+            )
+        finally:
+            conn.close()
+
+    def review_summary(self, since: str | None = None) -> Dict[str, pd.DataFrame]:
+        with self._lock:
+            if self._rollups is None:
+                row = self.conn.execute("SELECT data FROM review_rollup WHERE id = 1").fetchone()
+                self._rollups = ReviewRollups.from_json(row["data"]) if row else ReviewRollups()
+            cursor = self._rollups.cursor
+            while True:
+                rows = pd.read_sql_query(
+                    f"SELECT id, {', '.join(REVIEW_FIELDS)} FROM review_log WHERE id > ? ORDER BY id LIMIT ?",
+                    self.conn,
+                    params=(self._rollups.cursor, EXPORT_BATCH_ROWS),
+                )
+                if rows.empty:
+                    break
+                self._rollups.update(rows, int(rows["id"].iloc[-1]))
+            if self._rollups.cursor != cursor:
+                with self.conn:
+                    self.conn.execute("REPLACE INTO review_rollup (id, data) VALUES (1, ?)", (self._rollups.to_json(),))
+            return self._rollups.summary(since)
+
+    def save_changes(self) -> set[str]:
+        # Every write above already commits its own transaction
+        return set()
+
+    def import_frames(self, decks_df: pd.DataFrame, cards_df: pd.DataFrame, saved_words_df: pd.DataFrame):
+        """Copy CSV-engine tables into the database, mapping UUIDs to integer ids."""
+        with self._lock, self.conn:
+            deck_ids = {}
+            for deck in frame_records(decks_df):
+                cur = self.conn.execute(
+                    "INSERT INTO deck (name, description, created_at) VALUES (?, ?, ?)",
+                    (deck["name"], _none_if_nan(deck["description"]), deck["created_at"]),
+                )
+                deck_ids[deck["id"]] = cur.lastrowid
+            cards = cards_df[cards_df["deck_id"].isin(deck_ids)]
+            self.conn.executemany(
+                INSERT_CARD,
+                (
+                    tuple(deck_ids[c["deck_id"]] if k == "deck_id" else _none_if_nan(c[k]) for k in CARD_COLUMNS)
+                    for c in frame_records(cards)
+                ),
+            )
+            self.conn.executemany(
+                INSERT_SAVED_WORD,
+                (
+                    tuple(_none_if_nan(w[k]) for k in SAVED_WORD_COLUMNS)
+                    for w in frame_records(saved_words_df)
+                ),
+            )
+        self._answer_pools.invalidate()
+        self._search = None
+        self._tag_index = None
+
+
+def _none_if_nan(value):
+    if hasattr(value, "item"):  # numpy scalars
+        value = value.item()
+    return None if isinstance(value, float) and value != value else value
+
+
+if __name__ == "__main__":
+    # python -m fishki.sqlite_store: copy the CSV collection into fishki.db
+    from fishki import data_store
+    decks_df, cards_df, saved_words_df = data_store.load_data()
+    SQLiteStore(data_store.DB_FILE).import_frames(decks_df, cards_df, saved_words_df)
+    sys.stdout.write(f"Imported {len(decks_df)} decks, {len(cards_df)} cards and {len(saved_words_df)} saved words into {data_store.DB_FILE}\n")
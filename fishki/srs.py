@@ -1,37 +1,200 @@
 from __future__ import annotations
+import json
+import os
 from datetime import date, timedelta
-from typing import Literal, TYPE_CHECKING
+from typing import Callable, Dict, Literal, Mapping, NamedTuple, TYPE_CHECKING
+
+import numpy as np
 
 if TYPE_CHECKING:
     from fishki.models import Card
 
 Grade = Literal[1,2,3,4]  # Again, Hard, Good, Easy
 
+# Load balancing may move a review by this fraction of its interval (at least a day)
+INTERVAL_FUZZ = 0.05
+
+class SchedulerParams(NamedTuple):
+    """Tunable constants of next_schedule (see fishki.optimizer)."""
+    again_ease: float = -0.2  # ease change on Again
+    hard_ease: float = -0.15  # ease change on Hard
+    easy_ease: float = 0.15  # ease change on Easy
+    hard_factor: float = 1.2  # interval multiplier on Hard
+    easy_bonus: float = 0.2  # added to the ease for the interval on Easy
+    min_ease: float = 1.3
+    max_ease: float = 3.0
+
+DEFAULT_PARAMS = SchedulerParams()
+
+# The learner's fitted parameter profile; the defaults apply when it is missing
+PARAMS_FILE = os.path.join("data", "scheduler_params.json")
+
+_params_cache: dict = {}
+
+def current_params() -> SchedulerParams:
+    """The saved parameter profile, re-read only when the file changes."""
+    try:
+        mtime = os.stat(PARAMS_FILE).st_mtime_ns
+    except FileNotFoundError:
+        return DEFAULT_PARAMS
+    cached = _params_cache.get(PARAMS_FILE)
+    if cached is None or cached[0] != mtime:
+        with open(PARAMS_FILE, encoding="utf-8") as f:
+            saved = json.load(f)
+        cached = _params_cache[PARAMS_FILE] = (mtime, SchedulerParams(**{k: float(saved[k]) for k in SchedulerParams._fields if k in saved}))
+    return cached[1]
+
+def save_params(params: SchedulerParams | None):
+    """Save a parameter profile for next_schedule to use; None goes back to the defaults."""
+    if params is None:
+        if os.path.exists(PARAMS_FILE):
+            os.remove(PARAMS_FILE)
+        return
+    os.makedirs(os.path.dirname(PARAMS_FILE) or ".", exist_ok=True)
+    tmp_path = PARAMS_FILE + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(params._asdict(), f, indent=2)
+    os.replace(tmp_path, PARAMS_FILE)
+
 def clamp(x, lo, hi): 
     return max(lo, min(hi, x))
 
-def next_schedule(ease: float, interval: int, box: int, grade: Grade) -> tuple[float,int,int]:
+def next_schedule(ease: float, interval: int, box: int, grade: Grade, params: SchedulerParams | None = None) -> tuple[float,int,int]:
+    p = params or current_params()
     if grade == 1:  # Again
-        ease = clamp(ease - 0.2, 1.3, 3.0)
+        ease = clamp(ease + p.again_ease, p.min_ease, p.max_ease)
         interval = 1
         box = 1
     elif grade == 2:  # Hard
-        ease = clamp(ease - 0.15, 1.3, 3.0)
-        interval = max(1, round(max(1, interval) * 1.2))
+        ease = clamp(ease + p.hard_ease, p.min_ease, p.max_ease)
+        interval = max(1, round(max(1, interval) * p.hard_factor))
         # box does not advance on 'Hard'
     elif grade == 3:  # Good
         interval = max(1, round(max(1, interval) * ease))
         box = min(5, box + 1)
     else:  # Easy
-        ease = clamp(ease + 0.15, 1.3, 3.0)
-        interval = round(max(1, interval) * (ease + 0.2))
+        ease = clamp(ease + p.easy_ease, p.min_ease, p.max_ease)
+        interval = round(max(1, interval) * (ease + p.easy_bonus))
         box = min(5, box + 1)
     return ease, interval, box
 
-def grade_card(card: "Card", grade: Grade, today: date) -> None:
+def fuzz_range(interval: int) -> tuple[int, int]:
+    """Shortest and longest interval a review may be moved to when balancing load."""
+    if interval < 3:
+        return interval, interval
+    spread = max(1, round(interval * INTERVAL_FUZZ))
+    return interval - spread, interval + spread
+
+def balance_interval(interval: int, today: date, load: Mapping[str, int]) -> int:
+    """The interval within fuzz_range whose due day has the fewest reviews (per `load`, keyed by ISO day).
+
+    Ties go to the interval closest to the scheduled one.
+    """
+    lo, hi = fuzz_range(interval)
+    return min(
+        range(lo, hi + 1),
+        key=lambda i: (load.get((today + timedelta(days=i)).isoformat(), 0), abs(i - interval), i),
+    )
+
+def grade_card(card: "Card", grade: Grade, today: date, load: Callable[[int], Mapping[str, int]] | None = None) -> None:
+    """Grade a card in place.
+
+    With `load` (e.g. store.due_counts: days ahead -> reviews per ISO day)
+    the new due date is load-balanced with balance_interval.
+    """
     prev_box = card.box
     card.ease, card.interval_days, card.box = next_schedule(card.ease or 2.5, card.interval_days or 1, card.box or 1, grade)
+    if load is not None:
+        card.interval_days = balance_interval(card.interval_days, today, load(fuzz_range(card.interval_days)[1] + 1))
     card.due_date = today + timedelta(days=card.interval_days)
     card.reps = (card.reps or 0) + 1
     if grade == 1 and (prev_box or 1) > 1:
         card.lapses = (card.lapses or 0) + 1
+
+# --- Array counterparts ---
+# The functions below take whole columns as NumPy arrays and give, element
+# for element, the same results as next_schedule/grade_card. They back the
+# bulk operations (rescheduling, replaying imported reviews) and simulations.
+
+SCHEDULE_FIELDS = ("ease", "interval_days", "box", "reps", "lapses")
+
+def next_schedule_arrays(ease, interval, box, grade, params: SchedulerParams | None = None) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    p = params or current_params()
+    ease = np.asarray(ease, dtype=np.float64)
+    interval = np.maximum(1, np.asarray(interval, dtype=np.int64))
+    box = np.asarray(box, dtype=np.int64)
+    grade = np.asarray(grade)
+    again, hard, good = grade == 1, grade == 2, grade == 3
+
+    # Good keeps its ease unclamped; Easy is every other grade
+    step = np.where(again, p.again_ease, np.where(hard, p.hard_ease, p.easy_ease))
+    new_ease = np.where(good, ease, np.clip(ease + step, p.min_ease, p.max_ease))
+    factor = np.where(hard, p.hard_factor, np.where(good, ease, new_ease + p.easy_bonus))
+    # np.round rounds half to even, like the built-in round()
+    new_interval = np.where(again, 1, np.maximum(1, np.round(interval * factor))).astype(np.int64)
+    new_box = np.where(again, 1, np.where(hard, box, np.minimum(5, box + 1)))
+    return new_ease, new_interval, new_box
+
+def grade_cards(cards: Mapping[str, np.ndarray], grades, today) -> Dict[str, np.ndarray]:
+    """Grade many cards at once.
+
+    `cards` maps SCHEDULE_FIELDS to equal-length arrays; `today` is a date or
+    an array of days. Returns the new SCHEDULE_FIELDS plus due_date
+    (datetime64[D]).
+    """
+    grades = np.asarray(grades)
+    # `x or default` in grade_card
+    ease = np.asarray(cards["ease"], dtype=np.float64)
+    interval = np.asarray(cards["interval_days"], dtype=np.int64)
+    box = np.asarray(cards["box"], dtype=np.int64)
+    ease, interval, new_box = next_schedule_arrays(
+        np.where(ease == 0, 2.5, ease), np.where(interval == 0, 1, interval), np.where(box == 0, 1, box), grades
+    )
+    lapses = np.asarray(cards["lapses"], dtype=np.int64)
+    return {
+        "ease": ease,
+        "interval_days": interval,
+        "box": new_box,
+        "reps": np.asarray(cards["reps"], dtype=np.int64) + 1,
+        "lapses": lapses + ((grades == 1) & (np.where(box == 0, 1, box) > 1)),
+        "due_date": np.asarray(today, dtype="datetime64[D]") + interval.astype("timedelta64[D]"),
+    }
+
+def replay_reviews(cards: Mapping[str, np.ndarray], positions, grades, days, intervals: np.ndarray | None = None) -> Dict[str, np.ndarray]:
+    """Apply a sequence of reviews, in order, to a set of cards.
+
+    Review i grades card `positions[i]` (an index into the `cards` arrays) with
+    `grades[i]` on `days[i]` (or on a single shared day). A card reviewed
+    several times is graded once per round, so each round is one vectorized
+    grade_cards call. If given, `intervals` (shape (2, reviews)) receives each
+    review's interval before and after it, as the review log records them.
+    """
+    positions = np.asarray(positions, dtype=np.int64)
+    grades = np.asarray(grades)
+    days = np.broadcast_to(np.asarray(days, dtype="datetime64[D]"), positions.shape)
+    state = {
+        field: np.array(cards[field], dtype=np.float64 if field == "ease" else np.int64) for field in SCHEDULE_FIELDS
+    }
+    state["due_date"] = np.array(cards["due_date"], dtype="datetime64[D]")
+    if not len(positions):
+        return state
+
+    # how many earlier reviews of the same card precede each review
+    order = np.argsort(positions, kind="stable")
+    ordered = positions[order]
+    steps = np.arange(len(ordered))
+    starts = np.maximum.accumulate(np.where(np.r_[True, ordered[1:] != ordered[:-1]], steps, 0))
+    occurrence = np.empty_like(positions)
+    occurrence[order] = steps - starts
+
+    for round_ in range(occurrence.max() + 1):
+        batch = occurrence == round_
+        rows = positions[batch]
+        if intervals is not None:
+            intervals[0, batch] = state["interval_days"][rows]
+        graded = grade_cards({field: state[field][rows] for field in SCHEDULE_FIELDS}, grades[batch], days[batch])
+        for field, values in graded.items():
+            state[field][rows] = values
+        if intervals is not None:
+            intervals[1, batch] = state["interval_days"][rows]
+    return state
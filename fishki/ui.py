@@ -45,6 +45,42 @@ def grade_buttons():
         grade = 4
     return grade
 
+def load_balance_toggle() -> bool:
+    """Sidebar switch for load-balanced scheduling (see srs.balance_interval)."""
+    return st.sidebar.toggle(
+        "⚖️ Smooth review load",
+        key="load_balance",
+        help="Move each review by up to 5% of its interval to the day with the fewest reviews.",
+    )
+
+# The "All decks" choice of deck_select; a None option would not survive reruns
+ALL_DECKS = "__all_decks__"
+
+def deck_select(label: str, deck_options: dict):
+    """Deck picker (deck id -> name) with an "All decks" choice, for which it returns None."""
+    choice = st.selectbox(label, options=[*deck_options, ALL_DECKS], format_func=lambda x: deck_options.get(x, "All decks"))
+    return None if choice == ALL_DECKS else choice
+
+def tag_filter(store, deck_id=None, key: str = "tag_filter") -> str | None:
+    """Tag filter box such as "verb AND A1"; returns the filter, or None when it is blank."""
+    counts = store.tag_counts(deck_id)
+    if not counts:
+        return None
+    expression = st.text_input(
+        "Filter by tags",
+        key=key,
+        placeholder="e.g. verb AND A1",
+        help="Combine tags with AND, OR and NOT. Tags: " + ", ".join(f"{tag} ({n})" for tag, n in counts.items()),
+    ).strip()
+    if not expression:
+        return None
+    try:
+        store.tagged_card_ids(expression, deck_id)
+    except ValueError as e:
+        st.error(f"Invalid tag filter: {e}")
+        st.stop()
+    return expression
+
 def toast_notifications():
     if 'toast' in st.session_state:
         message, icon = st.session_state.toast
@@ -83,16 +119,9 @@ def save_word_widget(german="", english="", context="", source="Manual"):
                     }
                     
                     # Add to saved words
-                    st.session_state.saved_words_df = data_store.add_saved_word(
-                        st.session_state.saved_words_df, word_data
-                    )
-                    
-                    # Save data
-                    data_store.save_data(
-                        st.session_state.decks_df, 
-                        st.session_state.cards_df, 
-                        st.session_state.saved_words_df
-                    )
+                    store = data_store.get_store()
+                    store.add_saved_word(word_data)
+                    store.save_changes()
                     
                     set_toast(f"Word '{german_input}' saved successfully!")
                     st.rerun()
@@ -113,16 +142,9 @@ def quick_save_word_button(german="", english="", context="", source="Manual"):
             }
             
             # Add to saved words
-            st.session_state.saved_words_df = data_store.add_saved_word(
-                st.session_state.saved_words_df, word_data
-            )
-            
-            # Save data
-            data_store.save_data(
-                st.session_state.decks_df, 
-                st.session_state.cards_df, 
-                st.session_state.saved_words_df
-            )
+            store = data_store.get_store()
+            store.add_saved_word(word_data)
+            store.save_changes()
             
             set_toast(f"Word '{german}' saved quickly!")
             st.rerun()
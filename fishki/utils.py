@@ -3,12 +3,10 @@ from __future__ import annotations
 import random
 from typing import List, TYPE_CHECKING
 
-from rapidfuzz import fuzz
+from .matching import answer_matcher
 
 if TYPE_CHECKING:
-    from sqlmodel import Session
-    from .models import Card
-    from . import repo
+    from .data_store import Card
 
 def normalize_text(text: str) -> str:
     """Lowercase and remove leading/trailing whitespace."""
@@ -16,34 +14,33 @@ def normalize_text(text: str) -> str:
 
 
 def fuzzy_match(s1: str, s2: str, threshold: int = 85) -> bool:
-    """Check if two strings are similar enough based on a fuzzy ratio."""
-    return fuzz.ratio(normalize_text(s1), normalize_text(s2)) >= threshold
+    """Check if answer `s1` is close enough to the expected answer `s2`.
+
+    See fishki.matching for the articles, umlauts and alternatives it tolerates.
+    """
+    return answer_matcher(s2).matches(s1, threshold)
 
 
 def get_mcq_options(
-    session: Session,
+    store,
     correct_card: "Card",
-    deck_id: int,
+    deck_id,
     distractors: int = 3,
+    side: str = "en",
+    similar: bool = True,
 ) -> List[str]:
-    """Generate multiple-choice options with one correct answer and N distractors."""
-    # Get other cards from the same deck to use as distractors
-    all_cards_in_deck = repo.list_cards(session, deck_id)
-    
-    # Filter out the correct card
-    potential_distractors = [
-        card for card in all_cards_in_deck if card.id != correct_card.id
-    ]
-
-    # Not enough cards for distractors, just return the correct one
-    if len(potential_distractors) < distractors:
-        return [correct_card.en]
-
-    # Randomly select N distractors
-    selected_distractors = random.sample(potential_distractors, k=distractors)
-    
-    # Combine correct answer with distractors and shuffle
-    options = [d.en for d in selected_distractors] + [correct_card.en]
+    """Generate multiple-choice options with one correct answer and N distractors.
+
+    `side` is the column the answers come from ("en" or "de"). Distractors
+    come from the deck's cached answer pool, so the deck isn't scanned:
+    answers spelled like the correct one with `similar`, random ones without.
+    """
+    correct = correct_card[side]
+    pool = store.answer_pool(deck_id)
+    if similar:
+        options = pool.confusables(correct, side, distractors)
+    else:
+        options = pool.distractors(correct, side, distractors)
+    options.append(correct)
     random.shuffle(options)
-    
     return options
@@ -1,24 +1,19 @@
 import streamlit as st
 import pandas as pd
-from fishki import data_store, csv_io
+from fishki import data_store, csv_io, dedup
 from fishki.ui import set_toast, toast_notifications
 
 st.set_page_config(page_title="Manage Decks", page_icon="🗂️", layout="wide")
 
-# Initialize data from CSV files into session state
-if 'decks_df' not in st.session_state or 'cards_df' not in st.session_state or 'saved_words_df' not in st.session_state:
-    st.session_state.decks_df, st.session_state.cards_df, st.session_state.saved_words_df = data_store.load_data()
+store = data_store.get_store()
 
 st.header("Manage Decks and Cards")
 
-# Load data from session state
-decks_df = st.session_state.decks_df
-cards_df = st.session_state.cards_df
 toast_notifications()
 
 # Deck Management
 st.subheader("Decks")
-decks = data_store.get_decks(decks_df)
+decks = store.get_decks()
 deck_options = {d['id']: d['name'] for d in decks} if decks else {}
 
 col1, col2 = st.columns(2)
@@ -37,10 +32,14 @@ with col2:
             new_deck_desc = st.text_area("Description (optional)")
             if st.form_submit_button("Create Deck"):
                 if new_deck_name:
-                    st.session_state.decks_df = data_store.add_deck(decks_df, new_deck_name, new_deck_desc)
-                    data_store.save_data(st.session_state.decks_df, cards_df, st.session_state.saved_words_df)
-                    set_toast(f"Deck '{new_deck_name}' created!")
-                    st.rerun()
+                    try:
+                        store.add_deck(new_deck_name, new_deck_desc)
+                    except ValueError as e:
+                        st.error(str(e))
+                    else:
+                        store.save_changes()
+                        set_toast(f"Deck '{new_deck_name}' created!")
+                        st.rerun()
                 else:
                     st.error("Deck name is required.")
 
@@ -68,15 +67,15 @@ if st.button("Add New Card"):
                         "deck_id": selected_deck_id, "de": de, "en": en,
                         "example": example, "tags": tags, "notes": notes
                     }
-                    st.session_state.cards_df = data_store.add_card(cards_df, new_card_data)
-                    data_store.save_data(decks_df, st.session_state.cards_df, st.session_state.saved_words_df)
+                    store.add_card(new_card_data)
+                    store.save_changes()
                     set_toast("Card added successfully.")
                     st.rerun()
                 else:
                     st.error("German and English fields are required.")
 
 # Display Cards
-cards = data_store.get_cards(cards_df, deck_id=selected_deck_id)
+cards = store.get_cards(deck_id=selected_deck_id)
 if cards:
     display_df = pd.DataFrame(cards)
     st.dataframe(display_df[['de', 'en', 'example', 'tags', 'box', 'due_date']], use_container_width=True)
@@ -89,45 +88,108 @@ c1, c2, c3 = st.columns(3)
 
 with c1:
     if st.button("🗑️ Delete Current Deck", type="primary"):
-        decks_df, cards_df = data_store.delete_deck(decks_df, cards_df, selected_deck_id)
-        st.session_state.decks_df, st.session_state.cards_df = decks_df, cards_df
-        data_store.save_data(decks_df, cards_df, st.session_state.saved_words_df)
+        store.delete_deck(selected_deck_id)
+        store.save_changes()
         set_toast(f"Deck '{deck_name}' deleted.", icon="🗑️")
         st.rerun()
 
+    with st.expander("🔁 Reschedule"):
+        postpone_days = st.number_input("Days", min_value=1, max_value=365, value=1)
+        if st.button("Postpone overdue cards"):
+            postponed = store.postpone_overdue(postpone_days, deck_id=selected_deck_id)
+            store.save_changes()
+            set_toast(f"Postponed {postponed} overdue cards by {postpone_days} days.")
+            st.rerun()
+        if st.button("Reset deck progress", help="Make every card in this deck new again"):
+            reset = store.reset_deck(selected_deck_id)
+            store.save_changes()
+            set_toast(f"Reset {reset} cards in '{deck_name}'.")
+            st.rerun()
+
 with c2:
     with st.expander("📤 Export to CSV"):
-        csv_data = csv_io.write_csv(cards)
+        export_scope = st.radio("Cards to export", ["This deck", "All decks"], horizontal=True)
+        compress = st.checkbox("Compress (.csv.gz)")
+        export_deck_id = selected_deck_id if export_scope == "This deck" else None
+        base_name = f"fishki_deck_{deck_name.replace(' ','_')}" if export_deck_id else "fishki_all_decks"
+
+        def export_cards():
+            # Runs only when the button is clicked and streams the cards to a temp file
+            rows = store.iter_rows("cards", deck_id=export_deck_id)
+            fieldnames = csv_io.ALL_COLS
+            if export_deck_id is None:
+                rows = ({**card, "deck": deck_options.get(card["deck_id"], "")} for card in rows)
+                fieldnames = ["deck"] + fieldnames
+            return csv_io.spool(lambda out: csv_io.write_csv_stream(rows, out, fieldnames, compress=compress))
+
         st.download_button(
             label="Download CSV",
-            data=csv_data,
-            file_name=f"fishki_deck_{deck_name.replace(' ','_')}.csv",
-            mime="text/csv",
+            data=export_cards,
+            file_name=f"{base_name}.csv.gz" if compress else f"{base_name}.csv",
+            mime="application/gzip" if compress else "text/csv",
+        )
+        st.download_button(
+            label="Download full backup (.zip)",
+            data=lambda: csv_io.spool(lambda out: data_store.write_backup(store, out)),
+            file_name=f"fishki_backup_{pd.Timestamp.now().strftime('%Y%m%d')}.zip",
+            mime="application/zip",
+            help="Decks, cards and saved words as CSV files",
         )
 
 with c3:
     with st.expander("📥 Import from CSV"):
         uploaded_file = st.file_uploader("Choose a CSV file", type="csv", key="csv_uploader")
+        skip_duplicates = st.checkbox("Skip words already in the collection")
 
         # Check if a file has been uploaded and not yet processed
         if uploaded_file is not None and st.session_state.get('last_uploaded_file_id') != uploaded_file.file_id:
             try:
-                imported_cards = csv_io.read_csv(uploaded_file)
-                temp_cards_df = cards_df
-                for card_data in imported_cards:
-                    card_data['deck_id'] = selected_deck_id
-                    temp_cards_df = data_store.add_card(temp_cards_df, card_data)
-                
-                st.session_state.cards_df = temp_cards_df
-                data_store.save_data(decks_df, st.session_state.cards_df)
+                progress = st.progress(0.0, text="Importing cards...")
+                index = None
+                if skip_duplicates:
+                    # Every card in the collection, plus the rows imported so far
+                    index = dedup.card_index(store)
+                imported, skipped = data_store.import_csv(store, uploaded_file, selected_deck_id, index, progress.progress)
+                store.save_changes()
                 
                 # Mark this file as processed by storing its unique ID
                 st.session_state.last_uploaded_file_id = uploaded_file.file_id
                 
-                set_toast(f"Imported {len(imported_cards)} cards.")
+                set_toast(f"Imported {imported} cards." + (f" Skipped {skipped} duplicates." if skipped else ""))
                 st.rerun()
             except Exception as e:
                 st.error(f"Error during import: {e}")
                 # Reset on error to allow re-uploading the same file after fixing it
                 if 'last_uploaded_file_id' in st.session_state:
                     del st.session_state.last_uploaded_file_id
+
+# Duplicates across the whole collection
+with st.expander("🧹 Find duplicates"):
+    st.caption("Words that appear more than once across decks and saved words. Merging keeps the copy with the most review history.")
+    if st.button("Scan collection"):
+        st.session_state.duplicate_groups = dedup.find_duplicates(dedup.collection_entries(store))
+    groups = st.session_state.get("duplicate_groups")
+    if groups is not None:
+        if not groups:
+            st.success("No duplicates found.")
+        else:
+            st.write(f"{len(groups)} duplicate group(s)" + (" (showing the first 50)" if len(groups) > 50 else ""))
+        for i, group in enumerate(groups[:50]):
+            st.markdown(f"**{group.entries[0].de}**" + ("" if group.exact else " · similar spellings"))
+            st.dataframe(
+                pd.DataFrame([
+                    {
+                        "where": deck_options.get(e.deck_id, "?") if e.kind == "card" else "Saved words",
+                        "de": e.de, "en": e.en, "reps": e.reps, "box": e.box,
+                    }
+                    for e in group.entries
+                ]),
+                hide_index=True,
+                use_container_width=True,
+            )
+            if st.button("Merge", key=f"merge_duplicates_{i}"):
+                kept = dedup.merge_group(store, group)
+                store.save_changes()
+                del st.session_state.duplicate_groups
+                set_toast(f"Merged {len(group.entries)} copies of '{kept.de}'.")
+                st.rerun()
@@ -1,61 +1,41 @@
 import streamlit as st
+import time
 from datetime import date, datetime
 from fishki import data_store, ui
 from fishki.srs import grade_card
 
 st.set_page_config(page_title="Learn New Cards", page_icon="📚", layout="centered")
 
-# Initialize data from CSV files into session state
-if 'decks_df' not in st.session_state or 'cards_df' not in st.session_state or 'saved_words_df' not in st.session_state:
-    st.session_state.decks_df, st.session_state.cards_df, st.session_state.saved_words_df = data_store.load_data()
+store = data_store.get_store()
 
 st.header("📚 Learn New Cards")
 
-# Load data from session state
-decks_df = st.session_state.decks_df
-cards_df = st.session_state.cards_df
+load_balance = ui.load_balance_toggle()
 
-decks = data_store.get_decks(decks_df)
+decks = store.get_decks()
 if not decks:
     st.info("You haven't created any decks yet. Go to the 'Decks' page to create one.")
     st.stop()
 
 deck_options = {d['id']: d['name'] for d in decks}
-selected_deck_id = st.selectbox(
-    "Choose a deck to learn from:",
-    options=list(deck_options.keys()),
-    format_func=lambda x: deck_options[x]
-)
+selected_deck_id = ui.deck_select("Choose a deck to learn from:", deck_options)
+tags = ui.tag_filter(store, selected_deck_id, key="learn_tags")
 
-if not selected_deck_id:
-    st.stop()
-
-new_cards = data_store.get_new_cards(cards_df, deck_id=selected_deck_id)
+new_cards = store.new_queue(deck_id=selected_deck_id, tags=tags)
 
 if not new_cards:
-    st.success("🎉 No new cards left in this deck! Switch to Review or add more cards.")
+    st.success("🎉 No new cards left here! Switch to Review or add more cards.")
     st.stop()
 
 # Initialize session state for learning
-if "learn_idx" not in st.session_state or st.session_state.get("learn_deck_id") != selected_deck_id:
+if "learn_idx" not in st.session_state or st.session_state.get("learn_deck_id") != (selected_deck_id, tags):
     st.session_state.learn_idx = 0
-    st.session_state.learn_deck_id = selected_deck_id
+    st.session_state.learn_deck_id = (selected_deck_id, tags)
 
 idx = st.session_state.learn_idx % len(new_cards)
-card_dict = new_cards[idx]
-
-# Convert card dict to an object for compatibility with srs.grade_card
-class CardObject:
-    def __init__(self, **kwargs):
-        self.__dict__.update(kwargs)
-        # Ensure numeric types are correct
-        self.box = int(self.box) if self.box else 1
-        self.ease = float(self.ease) if self.ease else 2.5
-        self.interval_days = int(self.interval_days) if self.interval_days else 1
-        self.reps = int(self.reps) if self.reps else 0
-        self.lapses = int(self.lapses) if self.lapses else 0
-
-card = CardObject(**card_dict)
+card = new_cards[idx]
+# When the card was first shown, for the review log's answer latency
+shown_at = st.session_state.setdefault(f"shown_at_{card.id}", time.time())
 
 direction = st.radio("Direction", ["DE → EN", "EN → DE"], horizontal=True, key="learn_direction")
 front = card.de if direction == "DE → EN" else card.en
@@ -82,14 +62,12 @@ if show_answer:
     col1, col2 = st.columns(2)
 
     def grade_and_advance(grade: int):
-        grade_card(card, grade, date.today())
-        # Convert due_date back to string for saving
-        card.due_date = card.due_date.isoformat()
-        
-        st.session_state.cards_df = data_store.update_card(
-            cards_df, card.id, card.__dict__
-        )
-        data_store.save_data(decks_df, st.session_state.cards_df, st.session_state.saved_words_df)
+        prev_interval = card.interval_days
+        grade_card(card, grade, date.today(), load=store.due_counts if load_balance else None)
+        latency_ms = round((time.time() - st.session_state.pop(f"shown_at_{card.id}", shown_at)) * 1000)
+        store.log_review(card.id, card.deck_id, grade, prev_interval, card.interval_days, latency_ms)
+        store.update_card(card.id, card.schedule())
+        store.save_changes()
         st.session_state.learn_idx += 1
         st.rerun()
 
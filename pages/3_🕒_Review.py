@@ -1,75 +1,101 @@
 import streamlit as st
 import random
+import time
 from datetime import date
-from fishki import data_store, ui
+from fishki import data_store, models, queues, ui
 from fishki.srs import grade_card
 
 st.set_page_config(page_title="Review Due Cards", page_icon="🕒", layout="centered")
 
-# Initialize data from CSV files into session state
-if 'decks_df' not in st.session_state or 'cards_df' not in st.session_state or 'saved_words_df' not in st.session_state:
-    st.session_state.decks_df, st.session_state.cards_df, st.session_state.saved_words_df = data_store.load_data()
+store = data_store.get_store()
 
 st.header("🕒 Review Due Cards")
 
-# Load data from session state
-decks_df = st.session_state.decks_df
-cards_df = st.session_state.cards_df
+load_balance = ui.load_balance_toggle()
+
 ui.toast_notifications()
 
 # Deck selection
-decks = data_store.get_decks(decks_df)
+decks = store.get_decks()
 if not decks:
     st.info("No decks available. Please create a deck first.")
     st.stop()
 
 deck_options = {d['id']: d['name'] for d in decks}
-selected_deck_id = st.selectbox(
-    "Choose a deck to review:",
-    options=list(deck_options.keys()),
-    format_func=lambda x: deck_options[x]
-)
-
-if not selected_deck_id:
-    st.stop()
-
-# Load or initialize review queue
-session_key = f"review_queue_{selected_deck_id}"
-if session_key not in st.session_state or not st.session_state[session_key] or st.button("Reload queue"):
-    due_cards = data_store.get_due_cards(cards_df, deck_id=selected_deck_id)
-    random.shuffle(due_cards)
-    st.session_state[session_key] = [card['id'] for card in due_cards]
-    st.session_state.review_idx = 0
-
-queue = st.session_state.get(session_key, [])
-
-if not queue:
-    st.success("🎉 No cards are due for review in this deck today!")
+selected_deck_id = ui.deck_select("Choose a deck to review:", deck_options)
+tags = ui.tag_filter(store, selected_deck_id, key="review_tags")
+
+def no_cards_due():
+    st.success("🎉 No cards are due for review here today!")
+    next_due = store.next_due_date(selected_deck_id)
+    if next_due:
+        st.caption(f"Next review due on {next_due}.")
     st.stop()
 
-# Main review loop
-idx = st.session_state.get("review_idx", 0)
-if idx >= len(queue):
-    st.success("🎉 You've reviewed all due cards in this deck!")
-    st.session_state[session_key] = [] # Clear queue
-    st.stop()
+if selected_deck_id is None:
+    # Review all decks: the next card comes from a lazy merge of every deck's due cards
+    col1, col2 = st.columns(2)
+    interleave = col1.toggle("Interleave decks", key="review_interleave", help="Take turns between decks instead of going strictly by how overdue cards are")
+    daily_cap = col2.number_input("Daily cap per deck (0 = none)", min_value=0, value=0, step=10, key="review_daily_cap")
+    session_key = f"review_all_{tags}_{interleave}_{daily_cap}"
+    if session_key not in st.session_state or st.button("Reload queue"):
+        review_queue = queues.review_all_decks(store, deck_options, tags, interleave, daily_cap)
+        st.session_state[session_key] = (review_queue, next(review_queue, None))
+    review_queue, card_id = st.session_state[session_key]
+
+    if card_id is None:
+        if not review_queue.served:
+            no_cards_due()
+        st.success("🎉 You've reviewed all due cards here!")
+        del st.session_state[session_key] # Rebuild the queue next time
+        st.stop()
+
+    def advance():
+        st.session_state[session_key] = (review_queue, next(review_queue, None))
+
+    position = f"Card {review_queue.served}"
+    if not tags:
+        position += f" · {sum(store.due_counts(1).values())} due"
+else:
+    # Load or initialize review queue
+    session_key = f"review_queue_{selected_deck_id}_{tags}"
+    if session_key not in st.session_state or not st.session_state[session_key] or st.button("Reload queue"):
+        due_ids = [card.id for card in store.due_queue(deck_id=selected_deck_id, tags=tags)]
+        random.shuffle(due_ids)
+        st.session_state[session_key] = due_ids
+        st.session_state.review_idx = 0
+
+    queue = st.session_state.get(session_key, [])
+
+    if not queue:
+        no_cards_due()
+
+    # Main review loop
+    idx = st.session_state.get("review_idx", 0)
+    if idx >= len(queue):
+        st.success("🎉 You've reviewed all due cards here!")
+        st.session_state[session_key] = [] # Clear queue
+        st.stop()
+
+    def advance():
+        st.session_state.review_idx += 1
 
-card_id = queue[idx]
-card_dict = cards_df[cards_df['id'] == card_id].to_dict('records')[0]
+    card_id = queue[idx]
+    position = f"Card {idx + 1}/{len(queue)}"
 
-# Convert card dict to an object for compatibility with srs.grade_card
-class CardObject:
-    def __init__(self, **kwargs):
-        self.__dict__.update(kwargs)
-        self.box = int(self.box) if self.box else 1
-        self.ease = float(self.ease) if self.ease else 2.5
-        self.interval_days = int(self.interval_days) if self.interval_days else 1
-        self.reps = int(self.reps) if self.reps else 0
-        self.lapses = int(self.lapses) if self.lapses else 0
+card_dict = store.get_card(card_id)
+if card_dict is None or (card_dict["due_date"] or "")[:10] > date.today().isoformat():
+    # The card was deleted or reviewed since the queue was built
+    advance()
+    st.rerun()
 
-card = CardObject(**card_dict)
+card = models.Card.from_record(card_dict)
+# When the card was first shown, for the review log's answer latency
+shown_at = st.session_state.setdefault(f"shown_at_{card.id}", time.time())
 
-st.subheader(f"Card {idx + 1}/{len(queue)}")
+st.subheader(position)
+if selected_deck_id is None:
+    st.caption(deck_options.get(card.deck_id, ""))
 direction = st.radio("Direction", ["DE → EN", "EN → DE"], horizontal=True, key="review_direction")
 front = card.de if direction == "DE → EN" else card.en
 back = card.en if direction == "DE → EN" else card.de
@@ -93,14 +119,13 @@ if show_answer:
     
     grade = ui.grade_buttons()
     if grade > 0:
-        grade_card(card, grade, date.today())
-        card.due_date = card.due_date.isoformat()
-        
-        st.session_state.cards_df = data_store.update_card(
-            cards_df, card.id, card.__dict__
-        )
-        data_store.save_data(decks_df, st.session_state.cards_df, st.session_state.saved_words_df)
+        prev_interval = card.interval_days
+        grade_card(card, grade, date.today(), load=store.due_counts if load_balance else None)
+        latency_ms = round((time.time() - st.session_state.pop(f"shown_at_{card.id}", shown_at)) * 1000)
+        store.log_review(card.id, card.deck_id, grade, prev_interval, card.interval_days, latency_ms)
+        store.update_card(card.id, card.schedule())
+        store.save_changes()
         
         ui.set_toast(f"Next review in {card.interval_days} day(s).")
-        st.session_state.review_idx += 1
+        advance()
         st.rerun()
@@ -6,47 +6,41 @@ from fishki import data_store, utils, audio, ui
 
 st.set_page_config(page_title="Quiz Yourself", page_icon="📝", layout="centered")
 
-# Initialize data from CSV files into session state
-if 'decks_df' not in st.session_state or 'cards_df' not in st.session_state or 'saved_words_df' not in st.session_state:
-    st.session_state.decks_df, st.session_state.cards_df, st.session_state.saved_words_df = data_store.load_data()
+store = data_store.get_store()
 
 st.header("📝 Quiz Yourself")
 
-# Load data from session state
-decks_df = st.session_state.decks_df
-cards_df = st.session_state.cards_df
-
 # Deck selection
-decks = data_store.get_decks(decks_df)
+decks = store.get_decks()
 if not decks:
     st.info("No decks available. Please create a deck first.")
     st.stop()
 
 deck_options = {d['id']: d['name'] for d in decks}
-selected_deck_id = st.selectbox(
-    "Choose a deck to quiz on:",
-    options=list(deck_options.keys()),
-    format_func=lambda x: deck_options.get(x, "N/A")
-)
-
-if not selected_deck_id:
-    st.stop()
+selected_deck_id = ui.deck_select("Choose a deck to quiz on:", deck_options)
+tags = ui.tag_filter(store, selected_deck_id, key="quiz_tags")
 
 # --- Quiz Logic ---
 def setup_quiz():
-    cards = data_store.get_cards(cards_df, deck_id=selected_deck_id)
-    if len(cards) < 4:
-        st.warning("Not enough cards in this deck for a quiz (minimum 4 needed).")
+    # The quiz holds card ids; each question loads its card on demand
+    if tags:
+        card_ids = sorted(store.tagged_card_ids(tags, selected_deck_id))
+    elif selected_deck_id is not None:
+        card_ids = store.answer_pool(selected_deck_id).card_ids
+    else:
+        card_ids = [d for deck_id in deck_options for d in store.answer_pool(deck_id).card_ids]
+    if len(card_ids) < 4:
+        st.warning("Not enough cards for a quiz (minimum 4 needed).")
         st.session_state.quiz_cards = []
     else:
-        st.session_state.quiz_cards = random.sample(cards, k=len(cards))
+        st.session_state.quiz_cards = random.sample(card_ids, k=len(card_ids))
     st.session_state.quiz_idx = 0
     st.session_state.quiz_score = 0
     st.session_state.quiz_answer_submitted = None
 
-if 'quiz_cards' not in st.session_state or st.session_state.get('quiz_deck_id') != selected_deck_id:
+if 'quiz_cards' not in st.session_state or st.session_state.get('quiz_deck_id') != (selected_deck_id, tags):
     setup_quiz()
-    st.session_state.quiz_deck_id = selected_deck_id
+    st.session_state.quiz_deck_id = (selected_deck_id, tags)
 
 idx = st.session_state.get('quiz_idx', 0)
 if not st.session_state.quiz_cards:
@@ -59,7 +53,12 @@ if idx >= len(st.session_state.quiz_cards):
         st.rerun()
     st.stop()
 
-card = st.session_state.quiz_cards[idx]
+card = store.get_card(st.session_state.quiz_cards[idx])
+if card is None:
+    # The card was deleted since the quiz started
+    st.session_state.quiz_idx += 1
+    st.rerun()
+
 direction = st.radio("Direction", ["DE → EN", "EN → DE"], horizontal=True, key="quiz_direction")
 question = card['de'] if direction == "DE → EN" else card['en']
 correct_answer = card['en'] if direction == "DE → EN" else card['de']
@@ -103,21 +102,14 @@ with typing_tab:
 
 with mcq_tab:
     st.subheader(f"Question {idx+1}: Select the correct translation for '{question}'")
-    # A simple mock Card object for the MCQ generator
-    class MockCard:
-        def __init__(self, **kwargs): self.__dict__.update(kwargs)
-    
-    # We need to adapt the get_mcq_options to work with DataFrames
-    all_cards_in_deck = data_store.get_cards(cards_df, selected_deck_id)
-    potential_distractors = [c for c in all_cards_in_deck if c['id'] != card['id']]
-    
-    if len(potential_distractors) >= 3:
-        distractors = random.sample(potential_distractors, k=3)
-        options = [d['en'] for d in distractors] + [correct_answer]
-        random.shuffle(options)
-    else:
-        options = [c['en'] for c in potential_distractors] + [correct_answer]
-        random.shuffle(options)
+    similar = st.toggle("Look-alike options", value=True, key="mcq_similar", help="Pick wrong answers spelled like the right one")
+    # Keep the options stable across reruns of the same question
+    options_key = f"mcq_options_{card['id']}_{direction}_{similar}"
+    if options_key not in st.session_state:
+        st.session_state[options_key] = utils.get_mcq_options(
+            store, card, card['deck_id'], side="en" if direction == "DE → EN" else "de", similar=similar
+        )
+    options = st.session_state[options_key]
 
     for option in options:
         if st.button(option, key=f"mcq_{card['id']}_{option}", use_container_width=True):
@@ -1,19 +1,20 @@
 import streamlit as st
+import altair as alt
+import numpy as np
 import pandas as pd
 from datetime import date, timedelta
-from fishki import data_store
+from fishki import analytics, data_store, forecast, optimizer, srs
+from fishki.ui import set_toast, toast_notifications
 
 st.set_page_config(page_title="Statistics", page_icon="📊", layout="wide")
 
-# Initialize data from CSV files into session state
-if 'decks_df' not in st.session_state or 'cards_df' not in st.session_state or 'saved_words_df' not in st.session_state:
-    st.session_state.decks_df, st.session_state.cards_df, st.session_state.saved_words_df = data_store.load_data()
+store = data_store.get_store()
 
 st.header("📊 Statistics Dashboard")
 
-# Load data from session state
-decks_df = st.session_state.decks_df
-cards_df = st.session_state.cards_df
+toast_notifications()
+
+cards_df = store.cards_frame()
 
 if cards_df.empty:
     st.info("No card data available yet. Add some cards to see stats.")
@@ -21,43 +22,162 @@ if cards_df.empty:
     
 # --- Data Preparation ---
 df = cards_df.copy()
-# Convert dates, handling potential errors
-df['due_date'] = pd.to_datetime(df['due_date'], errors='coerce').dt.date
-df['created_at'] = pd.to_datetime(df['created_at'], errors='coerce').dt.date
+df['created_at'] = df['created_at'].dt.date
 today = date.today()
 
 # --- Global Stats ---
 st.subheader("Overall Progress")
 col1, col2, col3 = st.columns(3)
 col1.metric("Total Cards", len(df))
-due_today_count = len(df[df['due_date'] == today])
+due_today_count = store.due_counts(1).get(today.isoformat(), 0)
 col2.metric("Reviews Due Today", due_today_count)
 learned_today_count = len(df[df['created_at'] == today])
 col3.metric("Learned Today", learned_today_count)
 
 # --- Per-Deck Stats ---
 st.subheader("Deck Breakdown")
-deck_names = {d['id']: d['name'] for d in data_store.get_decks(decks_df)}
-df['deck_name'] = df['deck_id'].map(deck_names).fillna("Unassigned")
-
-# Ensure 'box' column is numeric
-df['box'] = pd.to_numeric(df['box'], errors='coerce').fillna(1).astype(int)
+deck_names = {d['id']: d['name'] for d in store.get_decks()}
+df['deck_name'] = df['deck_id'].astype(object).map(deck_names).fillna("Unassigned")
 
 box_counts = df.groupby('deck_name')['box'].value_counts().unstack(fill_value=0)
 st.bar_chart(box_counts)
 
 # --- Due Date Heatmap ---
 st.subheader("Upcoming Reviews (Next 30 Days)")
-future_due_dates_df = df[
-    (df['due_date'].notna()) &
-    (df['due_date'] >= today) & 
-    (df['due_date'] < today + timedelta(days=30))
-]
-
-if not future_due_dates_df.empty:
-    heatmap_data = future_due_dates_df['due_date'].value_counts().reset_index()
-    heatmap_data.columns = ['date', 'count']
-    heatmap_data = heatmap_data.sort_values('date')
+upcoming = store.due_counts(30)
+
+if upcoming:
+    heatmap_data = pd.DataFrame(sorted(upcoming.items()), columns=['date', 'count'])
     st.bar_chart(heatmap_data.set_index('date'))
 else:
     st.write("No upcoming reviews in the next 30 days.")
+
+# --- Workload Forecast ---
+st.subheader("Workload Forecast")
+
+@st.cache_data(max_entries=16, show_spinner="Simulating reviews...")
+def simulate(ease, interval_days, box, due_date, days, grade_probs, new_per_day, params, today):
+    # Keyed on the schedule columns and the day, so results are reused until the collection or the date changes
+    cards = {"ease": ease, "interval_days": interval_days, "box": box, "due_date": due_date}
+    return forecast.simulate_workload(
+        cards, days, grade_probs, new_per_day=new_per_day, today=today, seed=0, params=params
+    )
+
+col1, col2 = st.columns(2)
+horizon = col1.slider("Days ahead", min_value=30, max_value=365, value=90, step=5)
+new_per_day = col2.number_input("New cards per day", min_value=0, max_value=500, value=0)
+
+with st.expander("Grade probabilities"):
+    estimated = forecast.estimate_grade_probs(df['reps'], df['lapses'])
+    if st.toggle("Estimate from review history", value=True):
+        grade_probs = estimated
+    else:
+        cols = st.columns(4)
+        grade_probs = tuple(
+            c.number_input(label, min_value=0.0, max_value=1.0, value=round(p, 2), step=0.05)
+            for c, label, p in zip(cols, ["Again", "Hard", "Good", "Easy"], estimated)
+        )
+    if sum(grade_probs) > 0:
+        st.caption("Again {:.0%} · Hard {:.0%} · Good {:.0%} · Easy {:.0%}".format(*(p / sum(grade_probs) for p in grade_probs)))
+
+if sum(grade_probs) > 0:
+    runs = simulate(
+        df['ease'].to_numpy(), df['interval_days'].to_numpy(), df['box'].to_numpy(),
+        df['due_date'].to_numpy(), horizon, grade_probs, new_per_day, srs.current_params(), today,
+    )
+    days_index = pd.date_range(today, periods=horizon, freq="D")
+    projection = pd.DataFrame(
+        {"expected": runs.mean(axis=0), "busy day (90th pct)": np.percentile(runs, 90, axis=0)}, index=days_index
+    )
+    col1, col2 = st.columns(2)
+    col1.metric("Average Reviews / Day", f"{projection['expected'].mean():.0f}")
+    col2.metric("Peak Day", f"{projection['expected'].max():.0f}", help=str(projection['expected'].idxmax().date()))
+    st.line_chart(projection)
+else:
+    st.warning("At least one grade probability must be above zero.")
+
+# --- Review History ---
+st.subheader("Review History")
+since = (today - timedelta(days=30)).isoformat()
+summary = store.review_summary(since=since)
+daily = summary['daily']
+
+if daily.empty:
+    st.write("No reviews logged yet. Grade some cards in Learn or Review to build up a history.")
+    st.stop()
+
+recent = daily[daily.index >= pd.Timestamp(since)]
+recent_total = int(recent.to_numpy().sum())
+col1, col2, col3 = st.columns(3)
+col1.metric("Reviews (Last 30 Days)", recent_total)
+col2.metric("Retention (Last 30 Days)", f"{1 - recent['Again'].sum() / recent_total:.0%}" if recent_total else "–")
+col3.metric("Leeches", len(summary['leeches']))
+
+st.caption("Reviews per day by grade (last 90 days)")
+st.bar_chart(daily[daily.index >= pd.Timestamp(today - timedelta(days=90))])
+
+st.caption("When you review (weekday × hour)")
+weekdays = ["Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun"]
+hourly = summary['hourly'].assign(weekday=lambda d: d['weekday'].map(dict(enumerate(weekdays))))
+st.altair_chart(
+    alt.Chart(hourly).mark_rect().encode(
+        x=alt.X("hour:O", title="Hour"),
+        y=alt.Y("weekday:O", sort=weekdays, title=None),
+        color=alt.Color("reviews:Q", title="Reviews"),
+        tooltip=["weekday", "hour", "reviews"],
+    ),
+    use_container_width=True,
+)
+
+col1, col2 = st.columns(2)
+with col1:
+    st.caption("Retention by interval since the last review")
+    retention = summary['retention']
+    st.line_chart(retention.loc[retention['reviews'] >= 5, 'retention'])
+with col2:
+    st.caption("Retention per deck (last 30 days)")
+    decks = summary['decks']
+    decks['deck'] = decks['deck_id'].map({str(k): v for k, v in deck_names.items()}).fillna("Deleted deck")
+    st.dataframe(
+        decks[['deck', 'reviews', 'retention']],
+        column_config={"retention": st.column_config.ProgressColumn("Retention", min_value=0, max_value=1, format="percent")},
+        hide_index=True,
+        use_container_width=True,
+    )
+
+leeches = summary['leeches']
+if not leeches.empty:
+    st.caption(f"Leeches: cards answered \"Again\" {analytics.LEECH_FAILS} or more times")
+    leech_cards = [(store.get_card(card_id), reviews, fails) for card_id, reviews, fails in leeches.itertuples(index=False)]
+    st.dataframe(
+        pd.DataFrame(
+            [(c['de'], c['en'], deck_names.get(c['deck_id'], ""), reviews, fails) for c, reviews, fails in leech_cards if c],
+            columns=["German", "English", "Deck", "Reviews", "Again"],
+        ),
+        hide_index=True,
+        use_container_width=True,
+    )
+
+# --- Scheduler Tuning ---
+with st.expander("🧮 Tune the scheduler to your reviews"):
+    params = srs.current_params()
+    st.caption(
+        "Using your fitted parameter profile." if params != srs.DEFAULT_PARAMS else "Using the default parameters."
+    )
+    st.dataframe(pd.DataFrame({"current": params._asdict(), "default": srs.DEFAULT_PARAMS._asdict()}), use_container_width=True)
+    col1, col2 = st.columns(2)
+    if col1.button("Fit to my review history"):
+        with st.spinner("Fitting scheduler parameters..."):
+            result = optimizer.fit_store(store)
+        if result is None:
+            st.info(f"Not enough review history yet: at least {optimizer.MIN_REVIEWS} repeat reviews are needed.")
+        else:
+            srs.save_params(result.params)
+            set_toast(
+                f"Fitted on {result.reviews} reviews: recall error {result.default_error:.4f} → {result.error:.4f}."
+            )
+            st.rerun()
+    if col2.button("Reset to defaults", disabled=params == srs.DEFAULT_PARAMS):
+        srs.save_params(None)
+        set_toast("Scheduler parameters reset to the defaults.")
+        st.rerun()
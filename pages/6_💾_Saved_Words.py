@@ -1,18 +1,15 @@
 import streamlit as st
 import pandas as pd
-from fishki import data_store
+from fishki import data_store, csv_io
 from fishki.ui import set_toast, toast_notifications
 
 st.set_page_config(page_title="Saved Words", page_icon="💾", layout="wide")
 
-# Initialize data from CSV files into session state
-if 'decks_df' not in st.session_state or 'cards_df' not in st.session_state or 'saved_words_df' not in st.session_state:
-    st.session_state.decks_df, st.session_state.cards_df, st.session_state.saved_words_df = data_store.load_data()
+store = data_store.get_store()
 
 st.header("💾 Saved Words")
 
-# Load data from session state
-saved_words_df = st.session_state.saved_words_df
+saved_words_df = store.saved_words_frame()
 toast_notifications()
 
 # Add new word form
@@ -37,8 +34,8 @@ with st.expander("➕ Add New Word", expanded=False):
                     "notes": notes,
                     "source": source
                 }
-                st.session_state.saved_words_df = data_store.add_saved_word(saved_words_df, word_data)
-                data_store.save_data(st.session_state.decks_df, st.session_state.cards_df, st.session_state.saved_words_df)
+                store.add_saved_word(word_data)
+                store.save_changes()
                 set_toast(f"Word '{german}' saved successfully!")
                 st.rerun()
             else:
@@ -82,29 +79,29 @@ if not filtered_df.empty:
     col1, col2, col3 = st.columns(3)
     with col1:
         if st.button("✅ Mark All as Reviewed", help="Mark all displayed words as reviewed"):
-            for word_id in filtered_df["id"]:
-                st.session_state.saved_words_df = data_store.mark_word_reviewed(st.session_state.saved_words_df, word_id)
-            data_store.save_data(st.session_state.decks_df, st.session_state.cards_df, st.session_state.saved_words_df)
+            store.mark_words_reviewed(filtered_df["id"].tolist())
+            store.save_changes()
             set_toast("All words marked as reviewed!")
             st.rerun()
     
     with col2:
         if st.button("🗑️ Delete All Displayed", type="secondary", help="Delete all currently displayed words"):
-            for word_id in filtered_df["id"]:
-                st.session_state.saved_words_df = data_store.delete_saved_word(st.session_state.saved_words_df, word_id)
-            data_store.save_data(st.session_state.decks_df, st.session_state.cards_df, st.session_state.saved_words_df)
+            store.delete_saved_words(filtered_df["id"].tolist())
+            store.save_changes()
             set_toast("All displayed words deleted!")
             st.rerun()
     
     with col3:
-        if st.button("📤 Export to CSV", help="Download current view as CSV"):
-            csv = filtered_df.to_csv(index=False)
-            st.download_button(
-                label="Download CSV",
-                data=csv,
-                file_name=f"saved_words_{pd.Timestamp.now().strftime('%Y%m%d_%H%M%S')}.csv",
-                mime="text/csv"
-            )
+        # The CSV is only built when the button is clicked
+        st.download_button(
+            label="📤 Export to CSV",
+            data=lambda: csv_io.spool(
+                lambda out: csv_io.write_csv_stream(data_store.iter_records(filtered_df), out, list(filtered_df.columns))
+            ),
+            file_name=f"saved_words_{pd.Timestamp.now().strftime('%Y%m%d_%H%M%S')}.csv",
+            mime="text/csv",
+            help="Download current view as CSV",
+        )
     
     # Display words in a nice format
     for idx, word in filtered_df.iterrows():
@@ -128,21 +125,21 @@ if not filtered_df.empty:
             with col2:
                 if not word['reviewed']:
                     if st.button("✅", key=f"review_{word['id']}", help="Mark as reviewed"):
-                        st.session_state.saved_words_df = data_store.mark_word_reviewed(st.session_state.saved_words_df, word['id'])
-                        data_store.save_data(st.session_state.decks_df, st.session_state.cards_df, st.session_state.saved_words_df)
+                        store.mark_word_reviewed(word['id'])
+                        store.save_changes()
                         set_toast(f"'{word['german']}' marked as reviewed!")
                         st.rerun()
                 else:
                     if st.button("↩️", key=f"unreview_{word['id']}", help="Mark as not reviewed"):
-                        st.session_state.saved_words_df = data_store.update_saved_word(st.session_state.saved_words_df, word['id'], {"reviewed": False})
-                        data_store.save_data(st.session_state.decks_df, st.session_state.cards_df, st.session_state.saved_words_df)
+                        store.update_saved_word(word['id'], {"reviewed": False})
+                        store.save_changes()
                         set_toast(f"'{word['german']}' marked as not reviewed!")
                         st.rerun()
             
             with col3:
                 if st.button("🗑️", key=f"delete_{word['id']}", help="Delete word"):
-                    st.session_state.saved_words_df = data_store.delete_saved_word(st.session_state.saved_words_df, word['id'])
-                    data_store.save_data(st.session_state.decks_df, st.session_state.cards_df, st.session_state.saved_words_df)
+                    store.delete_saved_word(word['id'])
+                    store.save_changes()
                     set_toast(f"'{word['german']}' deleted!")
                     st.rerun()
             
@@ -0,0 +1,7 @@
+import pytest
+from fishki import srs
+
+@pytest.fixture(autouse=True)
+def default_scheduler_params(tmp_path, monkeypatch):
+    # A profile saved by the optimizer CLI in data/ must not change what the tests compute
+    monkeypatch.setattr(srs, "PARAMS_FILE", str(tmp_path / "scheduler_params.json"))
@@ -0,0 +1,29 @@
+import pandas as pd
+from fishki.analytics import REVIEW_FIELDS, ReviewRollups
+
+def _reviews(rows):
+    return pd.DataFrame(rows, columns=list(REVIEW_FIELDS))
+
+def test_rollups_fold_batches():
+    rollups = ReviewRollups()
+    rollups.update(_reviews([
+        ("c1", "d1", "2025-01-06T08:15:00", 1, 3, 1, 1200),
+        ("c2", "d1", "2025-01-06T08:40:00", 3, 1, 2, 800),
+    ]), 2)
+    rollups.update(_reviews([
+        ("c1", "d2", "2025-01-07T21:00:00", 4, 1, 3, None),
+    ]), 3)
+
+    assert rollups.cursor == 3
+    assert rollups.daily().to_numpy().tolist() == [[1, 0, 1, 0], [0, 0, 0, 1]]
+    assert sorted(rollups.hourly().itertuples(index=False, name=None)) == [(0, 8, 2), (1, 21, 1)]
+    assert rollups.retention_curve()["retention"].to_dict() == {1: 1.0, 3: 0.0}
+    assert rollups.deck_retention(since="2025-01-07").to_numpy().tolist() == [["d2", 1, 1.0]]
+
+def test_leeches_and_json_round_trip():
+    rollups = ReviewRollups()
+    rollups.update(_reviews([("c1", "d1", "2025-01-06T08:00:00", 1, 1, 1, 500)] * 8), 8)
+    restored = ReviewRollups.from_json(rollups.to_json())
+    assert restored.cursor == 8
+    assert restored.leeches(fails=8).to_numpy().tolist() == [["c1", 8, 8]]
+    assert restored.leeches(fails=9).empty
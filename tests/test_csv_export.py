@@ -0,0 +1,46 @@
+import gzip
+import io
+import tempfile
+import zipfile
+import pytest
+from fishki.csv_io import iter_csv_chunks, spool, write_backup, write_csv_file, write_csv_stream
+
+def test_iter_csv_chunks_streams_dict_rows():
+    rows = ({"de": f"Wort {i}", "en": f"word {i}", "tags": None} for i in range(25))
+    chunks = list(iter_csv_chunks(rows, chunk_rows=10))
+    assert len(chunks) == 3
+    assert chunks[0].startswith("de,en,example,tags,notes\r\nWort 0,word 0,,,")
+
+def test_write_csv_stream_gzip():
+    out = io.BytesIO()
+    write_csv_stream([{"de": "groß", "en": "big"}], out, compress=True)
+    assert not out.closed
+    assert gzip.decompress(out.getvalue()).decode("utf-8-sig") == "de,en,example,tags,notes\r\ngroß,big,,,\r\n"
+
+def test_write_backup_zip():
+    out = io.BytesIO()
+    write_backup(out, {"decks": (["id", "name"], [{"id": "1", "name": "A1"}]), "cards": (["de", "en"], [])})
+    with zipfile.ZipFile(out) as zf:
+        assert zf.namelist() == ["decks.csv", "cards.csv"]
+        assert zf.read("decks.csv").decode("utf-8-sig") == "id,name\r\n1,A1\r\n"
+        assert zf.read("cards.csv").decode("utf-8-sig") == "de,en\r\n"
+
+def test_write_csv_file_streams_to_the_path(tmp_path):
+    path = tmp_path / "out" / "cards.csv"
+    rows = ({"de": f"Wort {i}", "en": f"word {i}"} for i in range(3))
+    assert write_csv_file(rows, str(path)) == str(path)
+    assert path.read_text(encoding="utf-8-sig").splitlines()[1:] == ["Wort 0,word 0,,,", "Wort 1,word 1,,,", "Wort 2,word 2,,,"]
+
+def test_spool_hands_over_a_self_deleting_file(tmp_path, monkeypatch):
+    monkeypatch.setattr(tempfile, "tempdir", str(tmp_path))
+    with spool(lambda out: write_csv_stream([{"de": "groß", "en": "big"}], out)) as f:
+        assert f.read().decode("utf-8-sig").splitlines()[1] == "groß,big,,,"
+    assert list(tmp_path.iterdir()) == []
+
+    def fail(out):
+        out.write(b"partial")
+        raise RuntimeError("export failed")
+
+    with pytest.raises(RuntimeError):
+        spool(fail)
+    assert list(tmp_path.iterdir()) == []
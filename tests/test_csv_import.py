@@ -0,0 +1,18 @@
+import io
+from fishki.csv_io import iter_csv
+
+def test_iter_csv_batches_and_progress(tmp_path):
+    rows = "\n".join(f"Wort {i},word {i},,," for i in range(25))
+    file_path = tmp_path / "big.csv"
+    file_path.write_text("de,en,example,tags,notes\n" + rows + "\n", encoding="utf-8-sig")
+    progress = []
+
+    batches = list(iter_csv(str(file_path), batch_size=10, on_progress=progress.append))
+    assert [len(b) for b in batches] == [10, 10, 5]
+    assert progress == sorted(progress)
+    assert progress[-1] == 1.0
+
+def test_iter_csv_uploaded_buffer():
+    buffer = io.BytesIO("\ufeffde,en\nder Hund,dog\n".encode("utf-8"))
+    assert list(iter_csv(buffer)) == [[{"de": "der Hund", "en": "dog", "example": "", "tags": "", "notes": ""}]]
+    assert not buffer.closed
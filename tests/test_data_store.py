@@ -0,0 +1,453 @@
+import os
+import zipfile
+from datetime import date, timedelta
+import pandas as pd
+import pytest
+from fishki import data_store
+
+@pytest.fixture
+def data_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(data_store, "DATA_DIR", str(tmp_path))
+    monkeypatch.setattr(data_store, "DECKS_FILE", str(tmp_path / "decks.csv"))
+    monkeypatch.setattr(data_store, "CARDS_FILE", str(tmp_path / "cards.csv"))
+    monkeypatch.setattr(data_store, "SAVED_WORDS_FILE", str(tmp_path / "saved_words.csv"))
+    monkeypatch.setattr(data_store, "JOURNAL_FILE", str(tmp_path / "journal.jsonl"))
+    monkeypatch.setattr(data_store, "COMPACTING_FILE", str(tmp_path / "journal.compacting.jsonl"))
+    monkeypatch.setattr(data_store, "REVIEW_LOG_FILE", str(tmp_path / "review_log.csv"))
+    monkeypatch.setattr(data_store, "REVIEW_ROLLUPS_FILE", str(tmp_path / "review_rollups.json"))
+    monkeypatch.setattr(data_store, "_pending_records", [])
+    return tmp_path
+
+def test_mutations_are_journaled_not_snapshotted(data_dir):
+    decks_df, cards_df, saved_words_df = data_store.load_data()
+    snapshot = (data_dir / "cards.csv").read_text()
+
+    decks_df = data_store.add_deck(decks_df, "A1", "")
+    deck_id = decks_df.iloc[0]["id"]
+    cards_df = data_store.add_card(cards_df, {"deck_id": deck_id, "de": "der Apfel", "en": "apple"})
+    card_id = cards_df.iloc[0]["id"]
+    cards_df = data_store.update_card(cards_df, card_id, {"box": 3, "interval_days": 6})
+    data_store.save_data()
+
+    assert (data_dir / "cards.csv").read_text() == snapshot
+    assert len((data_dir / "journal.jsonl").read_text().splitlines()) == 3
+
+    _, cards_df, _ = data_store.load_data()
+    assert len(cards_df) == 1
+    assert cards_df.iloc[0]["box"] == 3
+    assert cards_df.iloc[0]["interval_days"] == 6
+
+def test_delete_deck_replays_to_cards(data_dir):
+    decks_df, cards_df, saved_words_df = data_store.load_data()
+    decks_df = data_store.add_deck(decks_df, "A1", "")
+    deck_id = decks_df.iloc[0]["id"]
+    cards_df = data_store.add_card(cards_df, {"deck_id": deck_id, "de": "trinken", "en": "to drink"})
+    decks_df, cards_df = data_store.delete_deck(decks_df, cards_df, deck_id)
+    data_store.save_data()
+
+    decks_df, cards_df, _ = data_store.load_data()
+    assert decks_df.empty
+    assert cards_df.empty
+
+def test_replay_rebuilds_only_the_journaled_rows(data_dir, monkeypatch):
+    store = data_store.CsvStore()
+    a1, a2 = store.add_deck("A1", ""), store.add_deck("A2", "")
+    store.add_cards({"deck_id": a1, "de": f"Wort {i}", "en": f"word {i}"} for i in range(4))
+    store.save_changes()
+    monkeypatch.setattr(data_store, "JOURNAL_COMPACT_BYTES", 0)
+    data_store.save_data()
+    data_store._compaction_thread.join()
+    ids = [c["id"] for c in store.get_cards()]
+
+    store.update_card(ids[1], {"box": 3})
+    store.delete_card(ids[0])
+    store.update_card(ids[3], {"deck_id": a2})
+    extra = store.add_card({"deck_id": a2, "de": "neu", "en": "new"})
+    store.delete_deck(a1)
+    monkeypatch.setattr(data_store, "JOURNAL_COMPACT_BYTES", 1_000_000)
+    store.save_changes()
+
+    def fail_frame_records(df):
+        raise AssertionError("the whole table was turned into records")
+
+    monkeypatch.setattr(data_store, "frame_records", fail_frame_records)
+    decks_df, cards_df, _ = data_store.load_data()
+    assert list(decks_df["id"]) == [a2]
+    assert list(cards_df["id"]) == [ids[3], extra]
+    assert cards_df["due_date"].dtype.kind == "M"
+
+def test_compaction_folds_journal_into_snapshots(data_dir, monkeypatch):
+    monkeypatch.setattr(data_store, "JOURNAL_COMPACT_BYTES", 0)
+    decks_df, cards_df, saved_words_df = data_store.load_data()
+    saved_words_df = data_store.add_saved_word(saved_words_df, {"german": "das Haus", "english": "the house"})
+    data_store.save_data()
+    data_store._compaction_thread.join()
+
+    assert not os.path.exists(data_store.JOURNAL_FILE)
+    assert not os.path.exists(data_store.COMPACTING_FILE)
+    assert "das Haus" in (data_dir / "saved_words.csv").read_text()
+    _, _, saved_words_df = data_store.load_data()
+    assert saved_words_df.iloc[0]["german"] == "das Haus"
+
+def test_save_changes_only_writes_dirty_tables(data_dir):
+    store = data_store.CsvStore()
+    deck_id = store.add_deck("A1", "")
+    assert store.save_changes() == {"decks"}
+
+    card_id = store.add_card({"deck_id": deck_id, "de": "der Apfel", "en": "apple"})
+    store.update_card(card_id, {"box": 2})
+    assert store.dirty_tables() == {"cards"}
+    assert store.save_changes() == {"cards"}
+    assert store.save_changes() == set()
+
+def test_compaction_skips_untouched_tables(data_dir, monkeypatch):
+    data_store.load_data()
+    decks_mtime = os.stat(data_store.DECKS_FILE).st_mtime_ns
+    monkeypatch.setattr(data_store, "JOURNAL_COMPACT_BYTES", 0)
+    store = data_store.CsvStore()
+    store.add_saved_word({"german": "das Haus", "english": "the house"})
+    store.save_changes()
+    data_store._compaction_thread.join()
+
+    assert os.stat(data_store.DECKS_FILE).st_mtime_ns == decks_mtime
+    assert "das Haus" in (data_dir / "saved_words.csv").read_text()
+
+def test_load_picks_up_replaced_snapshot(data_dir):
+    data_store.load_data()
+    (data_dir / "decks.csv").write_text("id,name,description,created_at\nd1,A1,,2025-01-01\n")
+    decks_df, _, _ = data_store.load_data()
+    assert list(decks_df["name"]) == ["A1"]
+
+def test_adds_keep_the_in_memory_dtypes(data_dir):
+    store = data_store.CsvStore()
+    def dtypes(df):  # datetime resolution aside
+        return {column: str(dtype).split("[")[0] for column, dtype in df.dtypes.items()}
+    expected = {"cards": dtypes(store.cards_df), "saved_words": dtypes(store.saved_words_df)}
+    for name in ("A1", "A2"):
+        deck_id = store.add_deck(name, "")
+        store.add_card({"deck_id": deck_id, "de": "der Apfel", "en": "apple"})
+        store.add_cards([{"deck_id": deck_id, "de": "trinken", "en": "to drink"}])
+    store.add_saved_word({"german": "das Haus", "english": "the house", "source": "Quiz"})
+    store.add_saved_words([{"german": "der Hund", "english": "the dog", "source": "Review"}])
+    assert dtypes(store.cards_df) == expected["cards"]
+    assert dtypes(store.saved_words_df) == expected["saved_words"]
+    assert set(store.cards_df["deck_id"].cat.categories) == {d["id"] for d in store.get_decks()}
+
+def test_saved_word_moves_to_a_new_source(data_dir):
+    store = data_store.CsvStore()
+    word_id = store.add_saved_word({"german": "das Haus", "english": "the house", "source": "Learn"})
+    store.update_saved_word(word_id, {"source": "NewSrc"})
+    assert store.saved_words_df["source"].dtype == "category"
+    store.save_changes()
+    assert [w["source"] for w in data_store.CsvStore().get_saved_words()] == ["NewSrc"]
+
+def test_frame_views_are_versioned(data_dir):
+    store = data_store.CsvStore()
+    deck_id = store.add_deck("A1", "")
+    first = store.cards_frame()
+    assert store.cards_frame() is first
+
+    store.add_card({"deck_id": deck_id, "de": "der Apfel", "en": "apple"})
+    second = store.cards_frame()
+    assert second is not first
+    assert first.empty
+    assert len(second) == 1
+
+def test_card_index_survives_add_and_delete(data_dir):
+    store = data_store.CsvStore()
+    deck_id = store.add_deck("A1", "")
+    first = store.add_card({"deck_id": deck_id, "de": "der Apfel", "en": "apple"})
+    second = store.add_card({"deck_id": deck_id, "de": "trinken", "en": "to drink"})
+    store.delete_card(first)
+    third = store.add_card({"deck_id": deck_id, "de": "groß", "en": "big"})
+
+    store.update_card(second, {"box": 3, "ease": 2.65})
+    assert store.get_card(first) is None
+    assert store.get_card(second)["box"] == 3
+    assert store.get_card(second)["ease"] == 2.65
+    assert store.get_card(third)["box"] == 1
+
+def test_row_record_matches_frame_records(data_dir):
+    store = data_store.CsvStore()
+    deck_id = store.add_deck("A1", "")
+    store.add_cards([{"deck_id": deck_id, "de": "der Apfel", "en": "apple"}, {"deck_id": deck_id, "de": "trinken", "en": "to drink"}])
+    store.update_card(store.get_cards()[1]["id"], {"ease": 2.65, "box": 3})
+    assert [data_store.row_record(store.cards_df, row) for row in range(2)] == data_store.frame_records(store.cards_df)
+
+def test_grading_cost_does_not_grow_with_the_table(data_dir, monkeypatch):
+    import timeit
+
+    def build(n):
+        store = data_store.CsvStore()
+        deck_id = store.add_deck(f"{n} cards", "")
+        store.add_cards({"deck_id": deck_id, "de": f"Wort {i}", "en": f"word {i}"} for i in range(n))
+        return store, store.cards_df["id"].iat[n // 2]
+
+    def grade_time(store, card_id):
+        schedule = {"box": 2, "ease": 2.6, "interval_days": 3, "reps": 1, "due_date": "2030-01-01"}
+        return min(timeit.repeat(lambda: (store.get_card(card_id), store.update_card(card_id, schedule)), number=20, repeat=5))
+
+    small, large = build(100), build(30_000)
+
+    def no_frames(df):
+        raise AssertionError("a grade sliced its row out as a frame")
+
+    monkeypatch.setattr(data_store, "frame_records", no_frames)
+    assert grade_time(*large) < 3 * grade_time(*small)
+
+def test_due_queue_follows_grades(data_dir):
+    store = data_store.CsvStore()
+    deck_id = store.add_deck("A1", "")
+    card_id = store.add_card({"deck_id": deck_id, "de": "der Apfel", "en": "apple"})
+    assert [c["id"] for c in store.get_due_cards(deck_id)] == [card_id]
+
+    tomorrow = (date.today() + timedelta(days=1)).isoformat()
+    store.update_card(card_id, {"due_date": tomorrow})
+    assert store.get_due_cards(deck_id) == []
+    assert [c["id"] for c in store.get_due_cards(deck_id, days=1)] == [card_id]
+    assert store.next_due_date(deck_id) == tomorrow
+    assert store.due_counts(2) == {tomorrow: 1}
+
+def test_due_queue_follows_deck_moves(data_dir):
+    store = data_store.CsvStore()
+    a1, a2 = store.add_deck("A1", ""), store.add_deck("A2", "")
+    card_id = store.add_card({"deck_id": a1, "de": "der Apfel", "en": "apple"})
+    store.update_card(card_id, {"deck_id": a2})
+    assert store.get_due_cards(a1) == []
+    assert [c["id"] for c in store.get_due_cards(a2)] == [card_id]
+
+    tomorrow = (date.today() + timedelta(days=1)).isoformat()
+    store.update_card(card_id, {"deck_id": a1, "due_date": tomorrow})
+    assert store.get_due_cards(a2, days=1) == []
+    assert [c["id"] for c in store.get_due_cards(a1, days=1)] == [card_id]
+    assert store.next_due_date(a1) == tomorrow
+
+def test_deletes_update_the_due_queue_in_place(data_dir, monkeypatch):
+    store = data_store.CsvStore()
+    a1, a2 = store.add_deck("A1", ""), store.add_deck("A2", "")
+    first = store.add_card({"deck_id": a1, "de": "der Apfel", "en": "apple"})
+    second = store.add_card({"deck_id": a1, "de": "trinken", "en": "to drink"})
+    store.add_card({"deck_id": a2, "de": "groß", "en": "big"})
+
+    def fail_rebuild(cards_df):
+        raise AssertionError("the due index was rebuilt")
+
+    monkeypatch.setattr(data_store.DueIndex, "from_frame", fail_rebuild)
+    store.delete_card(first)
+    assert [c["id"] for c in store.get_due_cards(a1)] == [second]
+    store.delete_deck(a1)
+    assert store.get_due_cards(a1) == []
+    assert len(store.get_due_cards(a2)) == 1
+
+def test_queues_as_models_match_records(data_dir):
+    store = data_store.CsvStore()
+    deck_id = store.add_deck("A1", "")
+    first = store.add_card({"deck_id": deck_id, "de": "der Apfel", "en": "apple"})
+    store.add_card({"deck_id": deck_id, "de": "trinken", "en": "to drink"})
+    store.update_card(first, {"reps": 1, "ease": 2.65})
+
+    assert [c.to_record() for c in store.due_queue(deck_id)] == store.get_due_cards(deck_id)
+    assert [c.to_record() for c in store.new_queue(deck_id)] == store.get_new_cards(deck_id)
+
+def test_answer_pool_follows_card_edits(data_dir):
+    store = data_store.CsvStore()
+    deck_id = store.add_deck("A1", "")
+    card_id = store.add_card({"deck_id": deck_id, "de": "der Apfel", "en": "apple"})
+    assert store.answer_pool(deck_id).answers["en"] == ["apple"]
+    assert store.answer_pool(deck_id) is store.answer_pool(deck_id)
+
+    store.update_card(card_id, {"box": 2})
+    pool = store.answer_pool(deck_id)
+    store.update_card(card_id, {"en": "the apple"})
+    assert store.answer_pool(deck_id) is not pool
+    pool = store.answer_pool(deck_id)
+    store.add_cards([{"deck_id": deck_id, "de": "trinken", "en": "to drink"}])
+    assert store.answer_pool(deck_id) is pool
+    assert pool.answers["de"] == ["der Apfel", "trinken"]
+    store.delete_card(card_id)
+    assert store.answer_pool(deck_id).card_ids == [store.get_cards(deck_id)[0]["id"]]
+
+def test_search_follows_edits(data_dir):
+    store = data_store.CsvStore()
+    deck_id = store.add_deck("A1", "")
+    card_id = store.add_card({"deck_id": deck_id, "de": "die Straße", "en": "street"})
+    assert [h.id for h in store.search("strasse")] == [card_id]
+    store.add_cards([{"deck_id": deck_id, "de": "die Straßenbahn", "en": "tram"}])
+    store.add_saved_words([{"german": "straff", "english": "tight"}])
+    assert len(store.search("stra")) == 3
+    store.update_card(card_id, {"de": "die Gasse", "en": "alley"})
+    store.delete_saved_words([w["id"] for w in store.get_saved_words(reviewed_only=False)])
+    assert [h.de for h in store.search("stra")] == ["die Straßenbahn"]
+    store.delete_deck(deck_id)
+    assert store.search("gasse") == []
+
+def test_add_cards_in_bulk(data_dir):
+    store = data_store.CsvStore()
+    deck_id = store.add_deck("A1", "")
+    store.save_changes()
+    rows = [{"deck_id": deck_id, "de": f"Wort {i}", "en": f"word {i}"} for i in range(500)]
+    assert store.add_cards(rows) == 500
+    store.save_changes()
+
+    assert len((data_dir / "journal.jsonl").read_text().splitlines()) == 2
+    assert len(store.get_due_cards(deck_id)) == 500
+    _, cards_df, _ = data_store.load_data()
+    assert len(cards_df) == 500
+    assert cards_df["id"].is_unique
+    assert (cards_df["box"] == 1).all()
+    assert (cards_df["example"] == "").all()
+
+def test_add_saved_words_in_bulk(data_dir):
+    store = data_store.CsvStore()
+    store.add_saved_words([{"german": "das Haus", "english": "the house"}, {"german": "der Hund", "english": "the dog", "source": "Quiz"}])
+    assert [w["source"] for w in store.get_saved_words(reviewed_only=False)] == ["Manual", "Quiz"]
+
+def test_bulk_saved_word_actions(data_dir):
+    store = data_store.CsvStore()
+    store.add_saved_words({"german": f"Wort {i}", "english": f"word {i}"} for i in range(4))
+    ids = [w["id"] for w in store.get_saved_words()]
+    store.mark_words_reviewed(ids[:2])
+    store.delete_saved_words(ids[1:3])
+    store.save_changes()
+
+    _, _, saved_words_df = data_store.load_data()
+    assert list(saved_words_df["id"]) == [ids[0], ids[3]]
+    assert list(saved_words_df["reviewed"]) == [True, False]
+
+def test_bulk_rescheduling(data_dir):
+    store = data_store.CsvStore()
+    deck_id = store.add_deck("A1", "")
+    store.add_cards({"deck_id": deck_id, "de": f"Wort {i}", "en": f"word {i}"} for i in range(3))
+    ids = [c["id"] for c in store.get_cards(deck_id)]
+    today = date.today()
+
+    assert store.apply_reviews([ids[0], ids[1], ids[0], "missing"], [3, 1, 4, 3]) == 3
+    assert "review_log" in store.save_changes()
+    [log] = list(store.iter_reviews())
+    assert log[["card_id", "grade", "prev_interval", "new_interval"]].to_numpy().tolist() == [
+        [ids[0], 3, 1, 2], [ids[1], 1, 1, 1], [ids[0], 4, 2, 6]
+    ]
+    assert store.review_summary(since=today.isoformat())["decks"].to_numpy().tolist() == [[deck_id, 3, 2 / 3]]
+    store.update_card(ids[2], {"due_date": (today - timedelta(days=3)).isoformat()})
+    assert store.postpone_overdue(5) == 1
+    store.save_changes()
+
+    cards = {c["id"]: c for c in data_store.CsvStore().get_cards(deck_id)}
+    assert (cards[ids[0]]["box"], cards[ids[0]]["reps"], cards[ids[0]]["interval_days"]) == (3, 2, 6)
+    assert cards[ids[0]]["ease"] == 2.65
+    assert cards[ids[0]]["due_date"] == (today + timedelta(days=6)).isoformat()
+    assert cards[ids[2]]["due_date"] == (today + timedelta(days=2)).isoformat()
+    assert store.get_due_cards(deck_id) == []
+
+    assert store.reset_deck(deck_id) == 3
+    assert sorted(c["id"] for c in store.get_due_cards(deck_id)) == sorted(ids)
+
+def test_review_log_is_read_incrementally(data_dir):
+    store = data_store.CsvStore()
+    store.log_review("c1", "d1", 1, 4, 1, 2500)
+    store.log_review("c2", "d1", 3, 1, 2, None)
+    assert not os.path.exists(data_store.REVIEW_LOG_FILE)
+    assert "review_log" in store.save_changes()
+
+    summary = store.review_summary()
+    assert summary["daily"].to_numpy().tolist() == [[1, 0, 1, 0]]
+    assert summary["decks"].to_numpy().tolist() == [["d1", 2, 0.5]]
+    offset = os.path.getsize(data_store.REVIEW_LOG_FILE)
+
+    # A torn append is left for later; the fresh store resumes from the saved rollups
+    store.log_review("c1", "d1", 1, 1, 1, 900)
+    store.save_changes()
+    with open(data_store.REVIEW_LOG_FILE, "a") as f:
+        f.write("c3,d1,2025-01-01T10:00")
+    assert [len(rows) for rows, _ in data_store.iter_review_log(offset)] == [1]
+
+    summary = data_store.CsvStore().review_summary()
+    assert summary["daily"].to_numpy().sum() == 3
+    assert summary["retention"].loc[4, "retention"] == 0
+
+def test_write_backup(data_dir, tmp_path):
+    store = data_store.CsvStore()
+    deck_id = store.add_deck("A1", "")
+    store.add_cards({"deck_id": deck_id, "de": f"Wort {i}", "en": f"word {i}"} for i in range(3))
+    store.add_saved_word({"german": "die Katze", "english": "cat"})
+
+    backup = tmp_path / "backup.zip"
+    with open(backup, "wb") as out:
+        data_store.write_backup(store, out)
+    with zipfile.ZipFile(backup) as zf:
+        cards = pd.read_csv(zf.open("cards.csv"), encoding="utf-8-sig")
+        saved_words = pd.read_csv(zf.open("saved_words.csv"), encoding="utf-8-sig")
+    assert list(cards.columns) == data_store.table_columns("cards")
+    assert list(cards["de"]) == ["Wort 0", "Wort 1", "Wort 2"]
+    assert (cards["deck_id"] == deck_id).all()
+    assert list(saved_words["german"]) == ["die Katze"]
+
+def test_import_csv_is_all_or_nothing(data_dir, tmp_path):
+    store = data_store.CsvStore()
+    deck_id = store.add_deck("A1", "")
+    store.save_changes()
+    rows = "".join(f"Wort {i},word {i}\n" for i in range(10_005))
+    bad = tmp_path / "bad.csv"
+    bad.write_bytes(b"de,en\n" + rows.encode() + b"kaputt,\xff\xfe\n")  # not UTF-8 past the first batch
+
+    with pytest.raises(UnicodeDecodeError):
+        data_store.import_csv(store, str(bad), deck_id)
+    assert store.get_cards(deck_id) == []
+    assert store.dirty_tables() == set()
+
+    good = tmp_path / "good.csv"
+    good.write_text("de,en\n" + rows, encoding="utf-8")
+    assert data_store.import_csv(store, str(good), deck_id) == (10_005, 0)
+
+def test_load_applies_compact_schema(data_dir):
+    store = data_store.CsvStore()
+    deck_id = store.add_deck("A1", "")
+    store.add_card({"deck_id": deck_id, "de": "der Apfel", "en": "apple"})
+    store.save_changes()
+
+    _, cards_df, _ = data_store.load_data()
+    assert isinstance(cards_df["deck_id"].dtype, data_store.pd.CategoricalDtype)
+    assert cards_df["box"].dtype == "int8"
+    assert cards_df["ease"].dtype == "float32"
+    assert cards_df["due_date"].dtype.kind == "M"
+    card = data_store.get_cards(cards_df)[0]
+    assert card["due_date"] == date.today().isoformat()
+    assert card["ease"] == 2.5
+    assert card["example"] == ""
+
+def test_load_rejects_invalid_tables(data_dir):
+    data_store.load_data()
+    (data_dir / "decks.csv").write_text("id,name\nd1,A1\n")
+    with pytest.raises(ValueError, match="missing columns: description, created_at"):
+        data_store.load_data()
+
+def test_tag_filtered_queues(data_dir):
+    store = data_store.CsvStore()
+    a1, a2 = store.add_deck("A1", ""), store.add_deck("A2", "")
+    store.add_cards([
+        {"deck_id": a1, "de": "laufen", "en": "to run", "tags": "verb, A1"},
+        {"deck_id": a2, "de": "gehen", "en": "to go", "tags": "Verb,A1"},
+        {"deck_id": a2, "de": "das Haus", "en": "house", "tags": "noun, A1"},
+    ])
+    card_id = store.add_card({"deck_id": a1, "de": "schnell", "en": "fast", "tags": "adjective"})
+    assert store.tag_counts() == {"A1": 3, "adjective": 1, "noun": 1, "verb": 2}
+    assert sorted(c.de for c in store.new_queue(None, tags="verb AND A1")) == ["gehen", "laufen"]
+    assert [c.de for c in store.due_queue(a2, tags="A1 AND NOT verb")] == ["das Haus"]
+    assert len(store.due_queue(None)) == 4
+    store.update_card(card_id, {"tags": "verb", "deck_id": a2})
+    assert sorted(c.de for c in store.new_queue(a2, tags="verb")) == ["gehen", "schnell"]
+    store.delete_deck(a2)
+    assert store.tag_counts() == {"A1": 1, "verb": 1}
+
+def test_due_stream(data_dir):
+    store = data_store.CsvStore()
+    deck_id = store.add_deck("A1", "")
+    store.add_cards([{"deck_id": deck_id, "de": f"Wort {i}", "en": f"word {i}", "tags": "odd" if i % 2 else ""} for i in range(150)])
+    today = date.today()
+    for i, card in enumerate(store.get_cards(deck_id)):
+        store.update_card(card["id"], {"due_date": (today - timedelta(days=i % 7)).isoformat()})
+    stream = list(store.due_stream(deck_id))
+    assert len(stream) == 150
+    assert [due for due, _ in stream] == sorted(due for due, _ in stream)
+    assert stream[0][0] == (today - timedelta(days=6)).isoformat()
+    assert len(list(store.due_stream(deck_id, tags="odd"))) == 75
@@ -0,0 +1,69 @@
+from fishki import dedup
+from fishki.dedup import DuplicateIndex, Entry, find_duplicates
+from fishki.sqlite_store import SQLiteStore
+
+def test_exact_and_near_duplicates_are_grouped():
+    entries = [
+        Entry("card", 1, 1, "das Haus", "house"),
+        Entry("card", 2, 2, "Haus", "house", reps=3),
+        Entry("saved_word", 3, None, "das Hauss", "the house"),
+        Entry("card", 4, 1, "die Straße", "street"),
+        Entry("saved_word", 5, None, "Strasse", "street"),
+        Entry("card", 6, 1, "trinken", "to drink"),
+        Entry("card", 7, 1, "der Tisch", "table"),
+    ]
+    groups = find_duplicates(entries, workers=1)
+    assert [sorted(e.id for e in g.entries) for g in groups] == [[1, 2, 3], [4, 5]]
+    assert [g.exact for g in groups] == [False, True]
+
+def test_translations_must_agree():
+    entries = [
+        Entry("card", 1, 1, "bestehen", "to pass"),
+        Entry("card", 2, 1, "bestechen", "to bribe"),
+        Entry("card", 3, 1, "der See", "lake"),
+        Entry("card", 4, 2, "die See", "sea"),
+        Entry("card", 5, 2, "die See", ""),
+    ]
+    assert [sorted(e.id for e in g.entries) for g in find_duplicates(entries, workers=1)] == [[3, 4, 5]]
+
+def test_near_duplicates_need_a_shared_prefix():
+    assert dedup.near_duplicate_keys(["haus", "hauss", "maus"], workers=1) == [("haus", "hauss")]
+
+def test_merge_keeps_the_best_history(tmp_path):
+    store = SQLiteStore(str(tmp_path / "fishki.db"))
+    a1, a2 = store.add_deck("A1", ""), store.add_deck("A2", "")
+    fresh = store.add_card({"deck_id": a1, "de": "das Haus", "en": "house", "example": "Das Haus ist groß."})
+    learned = store.add_card({"deck_id": a2, "de": "Haus", "en": "house"})
+    store.update_card(learned, {"reps": 4, "box": 3})
+    store.add_saved_word({"german": "das Haus", "english": "the house"})
+
+    [group] = find_duplicates(dedup.collection_entries(store), workers=1)
+    kept = dedup.merge_group(store, group)
+    assert kept.id == learned
+    assert store.get_card(fresh) is None
+    assert [c["id"] for c in store.get_cards()] == [learned]
+    assert store.get_card(learned)["example"] == "Das Haus ist groß."
+    assert store.get_saved_words() == []
+
+def test_duplicate_index_splits_incoming_rows():
+    index = DuplicateIndex([("die Miete", "rent"), ("sich beschäftigen", "to be busy with"), ("bestehen", "to pass")])
+    rows = [
+        {"de": "Miete", "en": "the rent"},
+        {"de": "beschaeftigen", "en": "be busy with"},
+        {"de": "trinken", "en": "to drink"},
+        {"de": "trinken", "en": "drink"},
+        {"de": "die Mieten", "en": "rents"},
+        {"de": "bestechen", "en": "to bribe"},
+    ]
+    fresh, duplicates = index.split(rows)
+    assert [row["de"] for row in fresh] == ["trinken", "bestechen"]
+    assert len(duplicates) == 4
+
+def test_import_skips_only_words_already_on_cards(tmp_path):
+    store = SQLiteStore(str(tmp_path / "fishki.db"))
+    deck_id = store.add_deck("A1", "")
+    store.add_card({"deck_id": deck_id, "de": "das Haus", "en": "house"})
+    store.add_saved_word({"german": "der Hund", "english": "dog"})
+    fresh, duplicates = dedup.card_index(store).split([{"de": "Haus", "en": "house"}, {"de": "der Hund", "en": "dog"}])
+    assert [row["de"] for row in fresh] == ["der Hund"]
+    assert [row["de"] for row in duplicates] == ["Haus"]
@@ -0,0 +1,29 @@
+from datetime import date, timedelta
+import numpy as np
+from fishki.forecast import GRADE_PROBS, estimate_grade_probs, simulate_workload
+
+TODAY = date(2025, 1, 1)
+
+def _cards(due_dates):
+    n = len(due_dates)
+    return {"ease": [2.5] * n, "interval_days": [1] * n, "box": [1] * n, "due_date": np.array(due_dates, dtype="datetime64[D]")}
+
+def test_always_good_follows_scheduler():
+    # Overdue cards come up today; intervals then grow 2, 5, 12 days
+    cards = _cards([TODAY - timedelta(days=3), TODAY + timedelta(days=1), None])
+    runs = simulate_workload(cards, 20, grade_probs=(0, 0, 1, 0), runs=3, today=TODAY, seed=1)
+    assert runs.shape == (3, 20)
+    assert (runs == runs[0]).all()
+    assert list(np.flatnonzero(runs[0])) == [0, 1, 2, 3, 7, 8, 19]
+
+def test_new_cards_add_to_the_load():
+    base = simulate_workload(_cards([]), 30, runs=2, today=TODAY, seed=1)
+    with_intake = simulate_workload(_cards([]), 30, runs=2, new_per_day=10, today=TODAY, seed=1)
+    assert base.sum() == 0
+    assert (with_intake >= 10).all()
+
+def test_estimate_grade_probs():
+    assert estimate_grade_probs([0, 0], [0, 0]) == GRADE_PROBS
+    probs = estimate_grade_probs([10, 10], [4, 0])
+    assert probs[0] == 0.2
+    assert abs(sum(probs) - 1) < 1e-9
@@ -0,0 +1,132 @@
+import random
+import pandas as pd
+import pytest
+from fishki.indexes import AnswerPool, AnswerPools, ConfusableIndex, DueIndex, TagIndex, parse_tag_filter
+
+def make_index():
+    cards_df = pd.DataFrame([
+        {"id": "c1", "deck_id": "d1", "due_date": "2025-01-01"},
+        {"id": "c2", "deck_id": "d1", "due_date": "2025-01-03"},
+        {"id": "c3", "deck_id": "d1", "due_date": "2025-01-10"},
+        {"id": "c4", "deck_id": "d2", "due_date": "2025-01-03"},
+        {"id": "c5", "deck_id": "d2", "due_date": None},
+    ])
+    return DueIndex.from_frame(cards_df)
+
+def test_due_ids():
+    index = make_index()
+    assert sorted(index.due_ids("d1", "2025-01-03")) == ["c1", "c2"]
+    assert index.due_ids("d2", "2025-01-02") == []
+    assert index.due_ids("missing", "2025-01-02") == []
+    assert sorted(index.due_ids(None, "2025-01-03")) == ["c1", "c2", "c4"]
+
+def test_move_and_remove():
+    index = make_index()
+    index.move("d1", "c1", "2025-01-01", "2025-01-20")
+    assert index.due_ids("d1", "2025-01-03") == ["c2"]
+    assert index.next_due("d1") == "2025-01-03"
+    index.remove("d1", "c2", "2025-01-03")
+    assert index.next_due("d1") == "2025-01-10"
+    assert index.next_due() == "2025-01-03"
+
+def test_move_to_another_deck_and_drop_deck():
+    index = make_index()
+    index.move("d1", "c3", "2025-01-10", "2025-01-02", to_deck="d2")
+    assert sorted(index.due_ids("d2", "2025-01-03")) == ["c3", "c4"]
+    assert index.next_due("d1") == "2025-01-01"
+    index.drop_deck("d2")
+    assert index.due_ids("d2", "2025-12-31") == []
+    assert index.next_due() == "2025-01-01"
+
+def test_counts_fold_overdue_into_start():
+    index = make_index()
+    assert index.counts("2025-01-02", "2025-01-10") == {"2025-01-02": 1, "2025-01-03": 2}
+    assert index.counts("2025-01-02", "2025-01-11", deck_id="d1") == {
+        "2025-01-02": 1, "2025-01-03": 1, "2025-01-10": 1,
+    }
+
+def test_distractors_exclude_the_correct_answer():
+    pool = AnswerPool(range(6), ["eins", "zwei", "drei", "vier", "fünf", "fünf"], ["one", "two", "three", "four", "five", "five"])
+    rng = random.Random(0)
+    for _ in range(50):
+        picked = pool.distractors("two", "en", 3, rng)
+        assert len(picked) == 3 == len(set(picked))
+        assert "two" not in picked
+    assert sorted(pool.distractors("fünf", "de", 10, rng)) == ["drei", "eins", "vier", "zwei"]
+    assert AnswerPool([], [], []).distractors("one") == []
+
+def test_answer_pools_rebuild_after_invalidation():
+    builds = []
+    pools = AnswerPools(lambda deck_id: builds.append(deck_id) or AnswerPool([], [], []))
+    pools.get("d1"), pools.get("d1"), pools.get("d2")
+    pools.invalidate("d1")
+    pools.get("d1"), pools.get("d2")
+    pools.invalidate()
+    pools.get("d2")
+    assert builds == ["d1", "d2", "d1", "d2"]
+
+WORDS = ["bekommen", "benehmen", "bemerken", "der Tisch", "die Katze", "schwimmen", "laufen", "der Apfel", "grün", "Bekommen"]
+
+def test_confusables_are_look_alikes():
+    index = ConfusableIndex(WORDS)
+    similar = index.similar("bekommen", 2)
+    assert similar == ["benehmen", "bemerken"] or similar == ["bemerken", "benehmen"]
+    assert "Bekommen" not in index.similar("bekommen", 5)
+    assert index.similar("bekommen", 2, exclude=["benehmen"])[0] == "bemerken"
+
+def test_confusable_index_grows_incrementally(monkeypatch):
+    monkeypatch.setattr(ConfusableIndex, "MERGE_AT", 4)
+    index = ConfusableIndex(WORDS[3:])
+    assert "bemerken" not in index.similar("bekommen", 3)
+    index.add(["bemerken"])  # stays in the unsorted tail
+    assert index.similar("bekommen", 1) == ["bemerken"]
+    index.add(["benehmen", "x", "y"])  # merged into the buckets
+    assert len(index._tail_keys) == 0
+    assert sorted(index.similar("bekommen", 2)) == ["bemerken", "benehmen"]
+
+def test_pool_confusables_fall_back_to_random():
+    pool = AnswerPool(range(4), ["bekommen", "bemerken", "der Tisch", "grün"], ["get", "notice", "table", "green"])
+    options = pool.confusables("bekommen", "de", 3)
+    assert options[0] == "bemerken"
+    assert sorted(options) == ["bemerken", "der Tisch", "grün"]
+    pool.add([4], ["benehmen"], ["behave"])
+    assert set(pool.confusables("bekommen", "de", 2)) == {"bemerken", "benehmen"}
+
+def test_parse_tag_filter():
+    assert parse_tag_filter("Verb AND  A1") == [[("verb", False), ("a1", False)]]
+    assert parse_tag_filter("verb, a1 OR NOT noun") == [[("verb", False), ("a1", False)], [("noun", True)]]
+    assert parse_tag_filter("irregular verb") == [[("irregular verb", False)]]
+    assert parse_tag_filter(" ") == []
+    for malformed in ("verb AND", "OR verb", "verb OR", "NOT", "verb NOT a1"):
+        with pytest.raises(ValueError):
+            parse_tag_filter(malformed)
+
+def test_tag_index_selects_by_set_operations():
+    index = TagIndex.from_columns(
+        ["c1", "c2", "c3", "c4"], ["d1", "d1", "d2", "d2"], ["verb, A1", "noun,A1", " Verb , B2", float("nan")]
+    )
+    assert index.select("verb AND A1") == {"c1"}
+    assert index.select("a1 OR b2") == {"c1", "c2", "c3"}
+    assert index.select("verb", "d2") == {"c3"}
+    assert index.select("NOT verb") == {"c2", "c4"}
+    assert index.select("NOT verb", "d1") == {"c2"}
+    assert index.select("missing") == set()
+    assert index.counts() == {"A1": 2, "B2": 1, "noun": 1, "verb": 2}
+    assert index.counts("d2") == {"B2": 1, "verb": 1}
+
+def test_tag_index_follows_edits():
+    index = TagIndex.from_columns(["c1", "c2"], ["d1", "d2"], ["verb", "verb"])
+    index.add("c1", "d2", "noun")
+    assert index.select("verb") == {"c2"}
+    assert index.select("noun", "d2") == {"c1"}
+    index.remove("c2")
+    assert "verb" not in index.counts()
+    index.remove_deck("d2")
+    assert len(index) == 0 and index.select("NOT noun") == set()
+
+def test_iter_due_is_earliest_first():
+    index = make_index()
+    stream = index.iter_due("d1", "2025-01-10")
+    assert next(stream) == ("2025-01-01", "c1")
+    index.move("d1", "c2", "2025-01-03", "2025-02-01")
+    assert list(stream) == [("2025-01-10", "c3")]
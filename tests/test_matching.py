@@ -0,0 +1,38 @@
+import pytest
+from fishki import utils
+from fishki.matching import answer_matcher, fold, variants
+
+def test_fold_spells_out_umlauts_and_eszett():
+    assert fold("  Die Straße, Mädchen! ") == "die strasse maedchen"
+    assert fold("Maedchen") == fold("Mädchen")
+
+def test_variants_cover_alternatives_and_leading_words():
+    assert set(variants("sich beschäftigen (mit)")) >= {"sich beschaeftigen", "beschaeftigen", "beschaeftigen mit"}
+    assert set(variants("to get; to receive")) >= {"get", "receive", "to receive"}
+
+@pytest.mark.parametrize("response, answer", [
+    ("Haus", "das Haus"),
+    ("das Haus", "Haus"),
+    ("Maedchen", "das Mädchen"),
+    ("Strasse", "die Straße"),
+    ("be busy with", "to be busy with"),
+    ("beschäftigen", "sich beschäftigen"),
+    ("receive", "to get, to receive"),
+    ("recieve", "to get, to receive"),
+])
+def test_accepted_answers(response, answer):
+    assert utils.fuzzy_match(response, answer)
+
+@pytest.mark.parametrize("response, answer", [
+    ("Hund", "das Haus"),
+    ("", "das Haus"),
+    ("to give", "to get, to receive"),
+    ("dog, cat, house, tree, car", "house"),
+    ("Hund / Katze / Haus", "das Haus"),
+])
+def test_rejected_answers(response, answer):
+    assert not utils.fuzzy_match(response, answer)
+
+def test_matchers_are_cached():
+    assert answer_matcher("das Haus") is answer_matcher("das Haus")
+    assert answer_matcher("das Haus").score("das Haus") == 100
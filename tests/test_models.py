@@ -0,0 +1,48 @@
+from datetime import date
+import math
+import pandas as pd
+from fishki import data_store
+from fishki.models import Card, Deck, SavedWord
+
+def test_schedule_fields_are_coerced():
+    card = Card(de="der Apfel", en="apple", box="2", ease=None, interval_days=math.nan, reps=3.0, lapses="")
+    assert (card.box, card.ease, card.interval_days, card.reps, card.lapses) == (2, 2.5, 1, 3, 0)
+    assert card.example == ""
+    assert Card.from_record({"id": "c1", "box": 0, "ease": "2.65"}).schedule()["ease"] == 2.65
+    assert Deck.from_record({"id": "d1", "name": "A1"}).id == "d1"
+
+def test_cards_have_no_instance_dict():
+    assert not hasattr(Card(de="groß", en="big"), "__dict__")
+
+def test_record_round_trip():
+    record = {
+        "id": "c1", "deck_id": "d1", "de": "trinken", "en": "to drink", "example": "", "tags": "verb", "notes": "",
+        "box": 3, "ease": 2.65, "interval_days": 6, "reps": 2, "lapses": 0,
+        "due_date": "2024-05-01", "created_at": "2024-04-01T10:00:00.000000", "updated_at": "2024-04-25T10:00:00.000000",
+    }
+    card = Card.from_record(record)
+    assert card.to_record() == record
+    assert Card.from_rows([tuple(record.values())]) == [card]
+
+def test_from_columns_matches_frame_records():
+    df = data_store.apply_schema(pd.DataFrame({
+        "id": ["a", "b"], "deck_id": ["d", "d"], "de": ["eins", "zwei"], "en": ["one", "two"],
+        "example": ["", None], "tags": ["", ""], "notes": ["", ""], "box": [1, 2], "ease": [2.5, 2.35],
+        "interval_days": [1, 3], "reps": [0, 1], "lapses": [0, 0], "due_date": ["2024-05-01", None],
+        "created_at": ["2024-04-01T10:00:00", "2024-04-01T10:00:00"], "updated_at": ["2024-04-01T10:00:00", "2024-04-01T10:00:00"],
+    }), "cards")
+    cards = Card.from_columns(data_store.frame_columns(df))
+    records = data_store.frame_records(df)
+    assert cards == Card.from_records(records)
+    assert cards[1].ease == 2.35
+    assert cards[1].due_date is None
+
+def test_schedule_is_in_stored_form():
+    card = Card(de="groß", en="big")
+    card.due_date = date(2024, 5, 1)
+    assert card.schedule() == {"box": 1, "ease": 2.5, "interval_days": 1, "reps": 0, "lapses": 0, "due_date": "2024-05-01"}
+
+def test_saved_word_defaults():
+    word = SavedWord.from_record({"id": 1, "german": "das Haus", "english": "the house", "source": None, "reviewed": 1})
+    assert word.source == "Manual"
+    assert word.reviewed is True
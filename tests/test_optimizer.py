@@ -0,0 +1,49 @@
+import numpy as np
+import pandas as pd
+from fishki import optimizer
+from fishki.srs import DEFAULT_PARAMS, next_schedule
+
+def _simulated_log(cards=200, reviews=6, memory=0.5, seed=0):
+    # A learner who forgets faster than the default intervals assume
+    rng = np.random.default_rng(seed)
+    rows = []
+    for c in range(cards):
+        t = pd.Timestamp("2025-01-01")
+        ease, interval, box = 2.5, 1, 1
+        for _ in range(reviews):
+            recalled = rng.random() < 0.9 ** (1 / memory)
+            grade = 3 if recalled else 1
+            rows.append((f"c{c}", t.isoformat(), grade, interval))
+            ease, interval, box = next_schedule(ease, interval, box, grade, DEFAULT_PARAMS)
+            t += pd.Timedelta(days=interval)
+    return pd.DataFrame(rows, columns=["card_id", "reviewed_at", "grade", "prev_interval"])
+
+def test_build_history_rounds():
+    log = pd.DataFrame(
+        [("b", "2025-01-03T09:00", 3, 2), ("a", "2025-01-01T09:00", 1, 5), ("a", "2025-01-02T21:00", 3, 1)],
+        columns=["card_id", "reviewed_at", "grade", "prev_interval"],
+    )
+    history = optimizer.build_history(log)
+    assert history.first_interval.tolist() == [5, 2]
+    assert [cards.tolist() for cards, _, _ in history.rounds] == [[0, 1], [0]]
+    assert history.rounds[1][2].tolist() == [1.5]
+    assert history.scored_reviews == 1
+
+def test_fit_improves_recall_error():
+    history = optimizer.build_history(_simulated_log())
+    result = optimizer.fit(history, generations=6, population=16, workers=1)
+    assert result.error < result.default_error
+    assert result.error == optimizer.recall_error(result.params, history)
+    for name, (low, high) in optimizer.BOUNDS.items():
+        assert low <= getattr(result.params, name) <= high
+
+def test_fit_in_process_pool_matches_in_process():
+    history = optimizer.build_history(_simulated_log(cards=50))
+    kwargs = {"generations": 2, "population": 6, "seed": 3}
+    assert optimizer.fit(history, workers=2, **kwargs) == optimizer.fit(history, workers=1, **kwargs)
+
+def test_fit_store_needs_history():
+    class Store:
+        def iter_reviews(self):
+            yield _simulated_log(cards=5, reviews=3).assign(deck_id="d", new_interval=1, latency_ms=None)
+    assert optimizer.fit_store(Store()) is None
@@ -0,0 +1,32 @@
+from fishki.queues import ReviewQueue
+
+def streams():
+    return {
+        "d1": [("2025-01-01", "a1"), ("2025-01-02", "a2"), ("2025-01-05", "a3")],
+        "d2": [("2025-01-03", "b1"), ("2025-01-04", "b2")],
+        "d3": [],
+    }
+
+def test_most_overdue_first():
+    assert list(ReviewQueue(streams())) == ["a1", "a2", "b1", "b2", "a3"]
+
+def test_interleaved_decks_take_turns():
+    assert list(ReviewQueue(streams(), interleave=True)) == ["a1", "b1", "a2", "b2", "a3"]
+
+def test_daily_cap_counts_earlier_reviews():
+    queue = ReviewQueue(streams(), daily_cap=2, reviewed_today={"d2": 1})
+    assert list(queue) == ["a1", "a2", "b1"]
+    assert queue.taken == {"d1": 2, "d2": 2}
+    assert queue.served == 3
+    assert not queue
+
+def test_streams_are_read_on_demand():
+    read = []
+    def stream(deck_id, n):
+        for i in range(n):
+            read.append((deck_id, i))
+            yield f"2025-01-0{i + 1}", f"{deck_id}{i}"
+    queue = ReviewQueue({"d1": stream("d1", 5), "d2": stream("d2", 5)})
+    assert len(read) == 2
+    assert next(queue) == "d10"
+    assert len(read) == 3
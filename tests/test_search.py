@@ -0,0 +1,43 @@
+from fishki.search import SearchIndex, tokenize
+
+def _index():
+    return SearchIndex.build(
+        [
+            {"id": 1, "deck_id": 1, "de": "die Straße", "en": "street", "example": "Die Straße ist lang.", "tags": "A1", "notes": ""},
+            {"id": 2, "deck_id": 1, "de": "laufen", "en": "to run", "example": "Ich laufe in der Straßenbahn.", "tags": "verb", "notes": ""},
+            {"id": 3, "deck_id": 2, "de": "der Lauf", "en": "run, race", "example": "", "tags": "", "notes": ""},
+        ],
+        [{"id": 10, "german": "straff", "english": "tight", "context": "", "notes": "adjective"}],
+    )
+
+def test_tokenize_folds_umlauts():
+    assert tokenize("Die Straße, über!") == ["die", "strasse", "ueber"]
+
+def test_prefix_and_folded_lookups():
+    index = _index()
+    assert [h.id for h in index.search("Strasse")] == [1, 2]
+    assert [h.id for h in index.search("stra")] == [10, 1, 2]
+    assert index.search("Straße")[0].de == "die Straße"
+    assert [h.kind for h in index.search("tight")] == ["saved_word"]
+
+def test_every_term_must_match():
+    index = _index()
+    assert [h.id for h in index.search("lauf run")] == [3, 2]
+    assert index.search("lauf tight") == []
+    assert index.search("") == []
+
+def test_leading_words_are_ignored_unless_alone():
+    index = _index()
+    assert [h.id for h in index.search("to run")] == [2, 3]
+    assert [h.id for h in index.search("die")] == [1]
+
+def test_incremental_updates():
+    index = _index()
+    index.update("card", [{"id": 3, "deck_id": 2, "de": "die Gasse", "en": "alley", "example": "", "tags": "", "notes": ""}])
+    assert [h.id for h in index.search("lauf")] == [2]
+    assert [h.id for h in index.search("gasse")] == [3]
+    index.update("saved_word", removed_ids=[10])
+    assert index.search("tight") == []
+    index.remove_deck(1)
+    assert [h.id for h in index.search("g")] == [3]
+    assert len(index) == 1
@@ -0,0 +1,165 @@
+from datetime import date, timedelta
+import pytest
+from fishki.sqlite_store import SQLiteStore
+
+@pytest.fixture
+def store(tmp_path):
+    return SQLiteStore(str(tmp_path / "fishki.db"))
+
+def test_due_and_new_queues(store):
+    deck_id = store.add_deck("A1", "")
+    due_id = store.add_card({"deck_id": deck_id, "de": "der Apfel", "en": "apple"})
+    later_id = store.add_card({"deck_id": deck_id, "de": "trinken", "en": "to drink"})
+    tomorrow = (date.today() + timedelta(days=1)).isoformat()
+    store.update_card(later_id, {"due_date": tomorrow, "reps": 1, "box": 2})
+
+    assert [c["id"] for c in store.get_due_cards(deck_id)] == [due_id]
+    assert [c["id"] for c in store.get_new_cards(deck_id)] == [due_id]
+    assert store.get_card(later_id)["box"] == 2
+    assert [c.to_record() for c in store.due_queue(deck_id)] == store.get_due_cards(deck_id)
+    assert [c.id for c in store.new_queue(deck_id)] == [due_id]
+
+def test_wal_mode(store):
+    assert store.conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+
+def test_duplicate_deck_name(store):
+    store.add_deck("A1", "")
+    with pytest.raises(ValueError, match="already exists"):
+        store.add_deck("A1", "")
+
+def test_delete_deck_removes_cards(store):
+    deck_id = store.add_deck("A1", "")
+    store.add_card({"deck_id": deck_id, "de": "der Apfel", "en": "apple"})
+    store.delete_deck(deck_id)
+    assert store.get_decks() == []
+    assert store.get_cards() == []
+
+def test_saved_words(store):
+    word_id = store.add_saved_word({"german": "das Haus", "english": "the house"})
+    store.mark_word_reviewed(word_id)
+    assert store.get_saved_words(reviewed_only=True)[0]["german"] == "das Haus"
+    assert store.get_saved_words(reviewed_only=False) == []
+
+def test_due_counts(store):
+    deck_id = store.add_deck("A1", "")
+    store.add_card({"deck_id": deck_id, "de": "der Apfel", "en": "apple"})
+    later_id = store.add_card({"deck_id": deck_id, "de": "trinken", "en": "to drink"})
+    overdue_id = store.add_card({"deck_id": deck_id, "de": "groß", "en": "big"})
+    today = date.today()
+    store.update_card(later_id, {"due_date": (today + timedelta(days=3)).isoformat()})
+    store.update_card(overdue_id, {"due_date": (today - timedelta(days=3)).isoformat()})
+
+    assert store.due_counts(3) == {today.isoformat(): 2}
+    assert store.due_counts(4, deck_id=deck_id)[(today + timedelta(days=3)).isoformat()] == 1
+    assert store.next_due_date(deck_id) == (today - timedelta(days=3)).isoformat()
+
+def test_add_cards_in_bulk(store):
+    deck_id = store.add_deck("A1", "")
+    assert store.add_cards({"deck_id": deck_id, "de": f"Wort {i}", "en": f"word {i}"} for i in range(100)) == 100
+    assert len(store.get_new_cards(deck_id)) == 100
+
+def test_bulk_saved_word_actions(store):
+    ids = [store.add_saved_word({"german": f"Wort {i}", "english": f"word {i}"}) for i in range(4)]
+    store.mark_words_reviewed(ids[:2])
+    store.delete_saved_words(ids[1:3])
+    assert [(w["id"], w["reviewed"]) for w in store.get_saved_words()] == [(ids[0], True), (ids[3], False)]
+
+def test_iter_rows(store):
+    a1 = store.add_deck("A1", "")
+    a2 = store.add_deck("A2", "")
+    store.add_cards({"deck_id": a1, "de": f"Wort {i}", "en": f"word {i}"} for i in range(3))
+    store.add_card({"deck_id": a2, "de": "trinken", "en": "to drink"})
+    assert len(list(store.iter_rows("cards"))) == 4
+    assert [c["de"] for c in store.iter_rows("cards", deck_id=a2)] == ["trinken"]
+    assert [d["name"] for d in store.iter_rows("decks")] == ["A1", "A2"]
+
+def test_bulk_rescheduling(store):
+    deck_id = store.add_deck("A1", "")
+    store.add_cards({"deck_id": deck_id, "de": f"Wort {i}", "en": f"word {i}"} for i in range(3))
+    ids = [c["id"] for c in store.get_cards(deck_id)]
+    today = date.today()
+
+    assert store.apply_reviews([ids[0], ids[1], ids[0], 999], [3, 1, 4, 3]) == 3
+    first = store.get_card(ids[0])
+    assert (first["box"], first["reps"], first["interval_days"]) == (3, 2, 6)
+    assert first["due_date"] == (today + timedelta(days=6)).isoformat()
+
+    store.update_card(ids[2], {"due_date": (today - timedelta(days=3)).isoformat()})
+    assert store.postpone_overdue(5) == 1
+    assert store.get_card(ids[2])["due_date"] == (today + timedelta(days=2)).isoformat()
+
+    assert store.reset_deck(deck_id) == 3
+    assert all(c["reps"] == 0 and c["due_date"] == today.isoformat() for c in store.get_cards(deck_id))
+
+def test_review_log(store):
+    deck_id = store.add_deck("A1", "")
+    card_id = store.add_card({"deck_id": deck_id, "de": "der Apfel", "en": "apple"})
+    for grade in (1, 1, 3):
+        store.log_review(card_id, deck_id, grade, 1, 1, 1000)
+    assert store.review_summary()["daily"].to_numpy().tolist() == [[2, 0, 1, 0]]
+    store.log_review(card_id, deck_id, 4, 1, 3, 1000)
+    summary = store.review_summary()
+    assert summary["daily"].to_numpy().tolist() == [[2, 0, 1, 1]]
+    assert summary["decks"].to_numpy().tolist() == [[str(deck_id), 4, 0.5]]
+
+def test_bulk_reviews_are_logged(store):
+    deck_id = store.add_deck("A1", "")
+    card_id = store.add_card({"deck_id": deck_id, "de": "der Apfel", "en": "apple"})
+    store.apply_reviews([card_id, card_id], [1, 3], days=["2025-01-01", "2025-01-02"])
+    [log] = list(store.iter_reviews())
+    assert log[["grade", "prev_interval", "new_interval"]].to_numpy().tolist() == [[1, 1, 1], [3, 1, 2]]
+    assert log["reviewed_at"].tolist() == ["2025-01-01", "2025-01-02"]
+    assert store.review_summary()["decks"].to_numpy().tolist() == [[str(deck_id), 2, 0.5]]
+
+def test_answer_pool(store):
+    deck_id = store.add_deck("A1", "")
+    assert len(store.answer_pool(deck_id)) == 0
+    card_id = store.add_card({"deck_id": deck_id, "de": "der Apfel", "en": "apple"})
+    assert store.answer_pool(deck_id).card_ids == [card_id]
+    store.update_card(card_id, {"en": "the apple"})
+    assert store.answer_pool(deck_id).answers["en"] == ["the apple"]
+    other = store.add_deck("A2", "")
+    store.add_cards([{"deck_id": deck_id, "de": "trinken", "en": "to drink"}, {"deck_id": other, "de": "laufen", "en": "to run"}])
+    assert store.answer_pool(deck_id).answers["de"] == ["der Apfel", "trinken"]
+
+def test_search_follows_edits(store):
+    deck_id = store.add_deck("A1", "")
+    card_id = store.add_card({"deck_id": deck_id, "de": "die Straße", "en": "street"})
+    assert [h.id for h in store.search("strasse")] == [card_id]
+    store.add_cards([{"deck_id": deck_id, "de": "die Straßenbahn", "en": "tram"}])
+    word_id = store.add_saved_word({"german": "straff", "english": "tight"})
+    assert len(store.search("stra")) == 3
+    store.update_card(card_id, {"de": "die Gasse", "en": "alley"})
+    store.delete_saved_word(word_id)
+    assert [h.de for h in store.search("stra")] == ["die Straßenbahn"]
+    store.delete_deck(deck_id)
+    assert store.search("gasse") == []
+
+def test_tag_filtered_queues(store):
+    a1, a2 = store.add_deck("A1", ""), store.add_deck("A2", "")
+    store.add_cards([
+        {"deck_id": a1, "de": "laufen", "en": "to run", "tags": "verb, A1"},
+        {"deck_id": a2, "de": "gehen", "en": "to go", "tags": "Verb,A1"},
+        {"deck_id": a2, "de": "das Haus", "en": "house", "tags": "noun, A1"},
+    ])
+    card_id = store.add_card({"deck_id": a1, "de": "schnell", "en": "fast", "tags": "adjective"})
+    assert store.tag_counts() == {"A1": 3, "adjective": 1, "noun": 1, "verb": 2}
+    assert sorted(c.de for c in store.new_queue(None, tags="verb AND A1")) == ["gehen", "laufen"]
+    assert [c.de for c in store.due_queue(a2, tags="A1 AND NOT verb")] == ["das Haus"]
+    assert len(store.due_queue(None)) == 4
+    store.update_card(card_id, {"tags": "verb", "deck_id": a2})
+    assert sorted(c.de for c in store.new_queue(a2, tags="verb")) == ["gehen", "schnell"]
+    store.delete_deck(a2)
+    assert store.tag_counts() == {"A1": 1, "verb": 1}
+
+def test_due_stream(store):
+    deck_id = store.add_deck("A1", "")
+    store.add_cards([{"deck_id": deck_id, "de": f"Wort {i}", "en": f"word {i}", "tags": "odd" if i % 2 else ""} for i in range(150)])
+    today = date.today()
+    for i, card in enumerate(store.get_cards(deck_id)):
+        store.update_card(card["id"], {"due_date": (today - timedelta(days=i % 7)).isoformat()})
+    stream = list(store.due_stream(deck_id))
+    assert len(stream) == 150
+    assert [due for due, _ in stream] == sorted(due for due, _ in stream)
+    assert stream[0][0] == (today - timedelta(days=6)).isoformat()
+    assert len(list(store.due_stream(deck_id, tags="odd"))) == 75
@@ -68,3 +68,84 @@ def test_lapses_counter():
     assert c.lapses == 1
     grade_card(c, 1, today) # 'Again' on a card that is now in box 1
     assert c.lapses == 1 # Should not increment again
+
+def test_next_schedule_arrays_matches_scalar():
+    import numpy as np
+    from fishki.srs import next_schedule, next_schedule_arrays
+    rng = np.random.default_rng(0)
+    n = 5000
+    ease = rng.integers(130, 301, n) / 100
+    interval = rng.integers(0, 400, n)
+    box = rng.integers(1, 6, n)
+    grade = rng.integers(1, 5, n)
+
+    arrays = next_schedule_arrays(ease, interval, box, grade)
+    for i in range(n):
+        expected = next_schedule(float(ease[i]), int(interval[i]), int(box[i]), int(grade[i]))
+        assert (arrays[0][i], arrays[1][i], arrays[2][i]) == expected
+
+def test_replay_reviews_matches_grade_card():
+    import numpy as np
+    from fishki.srs import grade_card, replay_reviews
+    cards = [MockCard(box=b, ease=e, interval_days=i, reps=r, lapses=0) for b, e, i, r in
+             [(1, 2.5, 1, 0), (3, 2.1, 12, 4), (5, 1.3, 60, 9)]]
+    positions = [0, 1, 0, 2, 1, 0, 2]
+    grades = [3, 1, 4, 2, 3, 1, 4]
+    days = np.array(["2025-01-01", "2025-01-01", "2025-01-05", "2025-01-02", "2025-01-03", "2025-01-20", "2025-02-01"],
+                    dtype="datetime64[D]")
+    columns = {f: [getattr(c, f) for c in cards] for f in ("ease", "interval_days", "box", "reps", "lapses")}
+    intervals = np.empty((2, len(positions)), dtype=np.int64)
+    state = replay_reviews({**columns, "due_date": days[:3]}, positions, grades, days, intervals)
+
+    for i, (p, g, d) in enumerate(zip(positions, grades, days)):
+        prev = cards[p].interval_days
+        grade_card(cards[p], g, d.astype(date))
+        assert (intervals[0, i], intervals[1, i]) == (prev, cards[p].interval_days)
+    for i, c in enumerate(cards):
+        assert (state["ease"][i], state["interval_days"][i], state["box"][i]) == (c.ease, c.interval_days, c.box)
+        assert (state["reps"][i], state["lapses"][i]) == (c.reps, c.lapses)
+        assert state["due_date"][i].astype(date) == c.due_date
+
+def test_fuzz_range():
+    from fishki.srs import fuzz_range
+    assert fuzz_range(1) == (1, 1)
+    assert fuzz_range(4) == (3, 5)
+    assert fuzz_range(100) == (95, 105)
+
+def test_load_balancing_picks_least_loaded_day():
+    from fishki.srs import grade_card
+    today = date(2025, 1, 1)
+    load = {"2025-01-11": 40, "2025-01-12": 5, "2025-01-13": 30, "2025-01-10": 30}
+    requested = []
+
+    def due_counts(days):
+        requested.append(days)
+        return load
+
+    c = MockCard(box=2, ease=2.5, interval_days=4)  # Good -> 10 days, may move to 9-11
+    grade_card(c, 3, today, load=due_counts)
+    assert requested == [12]
+    assert c.interval_days == 11
+    assert c.due_date == date(2025, 1, 12)
+
+def test_load_balancing_spreads_lockstep_cards():
+    from fishki.srs import grade_card
+    today = date(2025, 1, 1)
+    load = {}
+    for _ in range(9):
+        c = MockCard(box=3, ease=2.5, interval_days=8)  # Good -> 20 days, may move to 19-21
+        grade_card(c, 3, today, load=lambda days: load)
+        load[c.due_date.isoformat()] = load.get(c.due_date.isoformat(), 0) + 1
+    assert sorted(load.values()) == [3, 3, 3]
+
+def test_saved_parameter_profile(tmp_path, monkeypatch):
+    from fishki import srs
+    monkeypatch.setattr(srs, "PARAMS_FILE", str(tmp_path / "scheduler_params.json"))
+    assert srs.current_params() == srs.DEFAULT_PARAMS
+
+    srs.save_params(srs.DEFAULT_PARAMS._replace(hard_factor=1.5, again_ease=-0.3))
+    assert srs.next_schedule(2.5, 10, 3, 2) == (2.35, 15, 3)
+    assert srs.next_schedule(2.5, 10, 3, 1)[0] == 2.2
+
+    srs.save_params(None)
+    assert srs.next_schedule(2.5, 10, 3, 2) == (2.35, 12, 3)